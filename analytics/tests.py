@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from violations.models import Violation, VIOLATION_WINDOWS
+from .views import violations_over_time
+
+User = get_user_model()
+
+def seed_violations(user, days, per_day):
+    """Violations of every type spread over the last `days` days; bulk_create keeps the rollups in step"""
+    # Around midday, so minute offsets never push a violation into the neighbouring day
+    midday = timezone.localtime().replace(hour=12, minute=0, second=0, microsecond=0)
+    types = [value for value, _ in Violation.VIOLATION_TYPES]
+    Violation.objects.bulk_create([
+        Violation(user=user, violation_type=types[i % len(types)], timestamp=midday - timedelta(days=day, minutes=i))
+        for day in range(days)
+        for i in range(per_day)
+    ])
+
+class ViolationsOverTimeQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='candidate', email='candidate@example.com', password='secret')
+
+    def get(self, days):
+        request = RequestFactory().get('/api/analytics/violations/time/', {'days': days})
+        request.user = self.user
+        return violations_over_time(request)
+
+    def test_query_count_independent_of_window(self):
+        seed_violations(self.user, days=100, per_day=3)
+        for days in VIOLATION_WINDOWS:
+            with self.subTest(days=days), self.assertNumQueries(1):
+                response = self.get(days)
+            self.assertEqual(response.status_code, 200)
+
+    def test_query_count_independent_of_volume(self):
+        for per_day in (1, 10, 50):
+            seed_violations(self.user, days=30, per_day=per_day)
+            with self.subTest(per_day=per_day), self.assertNumQueries(1):
+                response = self.get(30)
+            self.assertEqual(response.status_code, 200)
+
+    def test_counts_match_violations(self):
+        seed_violations(self.user, days=7, per_day=4)
+        with self.assertNumQueries(1):
+            response = self.get(7)
+        self.assertEqual(sum(day['count'] for day in response.json()['results']), 28)
+
+    def test_rejects_unknown_window(self):
+        with self.assertNumQueries(0):
+            response = self.get(14)
+        self.assertEqual(response.status_code, 400)
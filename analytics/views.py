@@ -1,16 +1,17 @@
 from django.http import JsonResponse
-from django.db.models import Count
-from violations.models import Violation
-from users.models import User
-from django.utils import timezone
-from datetime import timedelta
+from django.db.models import Sum
+from violations.models import ViolationRollup, VIOLATION_WINDOWS
+
+# Totals are read from the month rollups, so read time depends on the number
+# of buckets rather than the number of violations
 
 # Violations per type
 
 def violations_per_type(request):
     data = (
-        Violation.objects.values('violation_type')
-        .annotate(count=Count('id'))
+        ViolationRollup.objects.filter(granularity='month')
+        .values('violation_type')
+        .annotate(count=Sum('count'))
         .order_by('-count')
     )
     return JsonResponse({'results': list(data)})
@@ -19,19 +20,19 @@ def violations_per_type(request):
 
 def violations_per_user(request):
     data = (
-        Violation.objects.values('user__username')
-        .annotate(count=Count('id'))
+        ViolationRollup.objects.filter(granularity='month')
+        .values('user__username')
+        .annotate(count=Sum('count'))
         .order_by('-count')
     )
     return JsonResponse({'results': list(data)})
 
-# Violations over time (last 7 days)
+# Violations over time (last 7, 30 or 90 days)
 def violations_over_time(request):
-    today = timezone.now().date()
-    results = []
-    for i in range(7):
-        day = today - timedelta(days=i)
-        count = Violation.objects.filter(timestamp__date=day).count()
-        results.append({'date': str(day), 'count': count})
-    results.reverse()
-    return JsonResponse({'results': results}) 
\ No newline at end of file
+    try:
+        days = int(request.GET.get('days', 7))
+    except ValueError:
+        days = None
+    if days not in VIOLATION_WINDOWS:
+        return JsonResponse({'error': f'days must be one of {list(VIOLATION_WINDOWS)}'}, status=400)
+    return JsonResponse({'results': ViolationRollup.objects.daily_counts(days), 'days': days})
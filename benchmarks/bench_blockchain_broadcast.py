@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load-test blockchain WebSocket fan-out with simulated dashboard sockets.
+
+Compares the coalesced broadcaster against one group_send per event, over the
+in-memory channel layer, with a share of deliberately slow clients.
+
+Usage:
+    python -m benchmarks.bench_blockchain_broadcast --clients 500 --events 2000 --output broadcast.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure()
+
+from channels.layers import InMemoryChannelLayer
+from blockchain.consumers import CoalescingBroadcaster, FrameOutbox
+
+class SimulatedDashboard:
+    def __init__(self, channel_layer, channel_name, send_delay):
+        self.channel_layer = channel_layer
+        self.channel_name = channel_name
+        self.send_delay = send_delay
+        self.frames_received = 0
+        self.events_received = 0
+        self.serializations = 0
+        self.last_receive = None
+        self.outbox = FrameOutbox(self.send, max_frames=10 ** 6)
+
+    async def send(self, text):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.frames_received += 1
+        frame = json.loads(text)
+        if frame['type'] == 'batch':
+            self.events_received += sum(1 for update in frame['updates'] if update['type'] == 'event_update')
+        elif frame['type'] == 'event_update':
+            self.events_received += 1
+        self.last_receive = time.perf_counter()
+
+    async def run(self):
+        writer = asyncio.ensure_future(self.outbox.run())
+        try:
+            while True:
+                message = await self.channel_layer.receive(self.channel_name)
+                if message['type'] == 'blockchain.batch':
+                    self.outbox.put_frame(message['text'])
+                elif message['type'] == 'blockchain.snapshot':
+                    self.outbox.put_snapshot(message['snapshot'], message['text'])
+                elif message['type'] == 'blockchain.event_update':
+                    # Uncoalesced path: every subscriber serializes every event itself
+                    self.serializations += 1
+                    self.outbox.put_frame(json.dumps({'type': 'event_update', 'data': message['data']}))
+        finally:
+            writer.cancel()
+
+def make_update(i):
+    return {
+        'event_id': str(uuid.uuid4()),
+        'timestamp': time.time(),
+        'event_type': 'head_misalignment',
+        'severity': 'medium',
+        'description': f'Benchmark event {i}',
+        'confidence_score': 0.8,
+        'session_id': f'candidate-{i % 50}',
+        'user_id': None,
+        'pending_events': i % 10
+    }
+
+async def run_mode(mode, clients, events, burst_rate, slow_share, slow_delay, interval):
+    channel_layer = InMemoryChannelLayer(capacity=events * 4, group_expiry=3600)
+    dashboards = []
+    slow_clients = int(clients * slow_share)
+    for i in range(clients):
+        channel_name = await channel_layer.new_channel()
+        await channel_layer.group_add('event_updates', channel_name)
+        await channel_layer.group_add('blockchain_updates', channel_name)
+        dashboards.append(SimulatedDashboard(channel_layer, channel_name, slow_delay if i < slow_clients else 0))
+    tasks = [asyncio.ensure_future(dashboard.run()) for dashboard in dashboards]
+
+    broadcaster = CoalescingBroadcaster(interval=interval, channel_layer=channel_layer)
+    group_sends = 0
+    start = time.perf_counter()
+    for i in range(events):
+        update = make_update(i)
+        if mode == 'coalesced':
+            broadcaster.publish('event_updates', 'event_update', update)
+            broadcaster.publish_snapshot('blockchain_updates', 'blockchain_stats', {'pending_events': update['pending_events']})
+        else:
+            await channel_layer.group_send('event_updates', {'type': 'blockchain.event_update', 'data': update})
+            group_sends += 1
+        if burst_rate:
+            await asyncio.sleep(1 / burst_rate)
+    if mode == 'coalesced':
+        await broadcaster.flush()
+        group_sends = broadcaster.frames_sent
+    publish_done = time.perf_counter()
+
+    # Wait until every fast client has every event and the slow ones have drained
+    deadline = publish_done + 60
+    while time.perf_counter() < deadline:
+        if all(dashboard.events_received >= events and not dashboard.outbox.frames for dashboard in dashboards):
+            break
+        await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    fast = [dashboard for dashboard in dashboards if not dashboard.send_delay]
+    return {
+        'mode': mode,
+        'clients': clients,
+        'slow_clients': slow_clients,
+        'events': events,
+        'group_sends': group_sends,
+        'per_client_serializations': sum(dashboard.serializations for dashboard in dashboards),
+        'frames_delivered': sum(dashboard.frames_received for dashboard in dashboards),
+        'dropped_snapshots': sum(dashboard.outbox.dropped_snapshots for dashboard in dashboards),
+        'all_events_delivered': all(dashboard.events_received >= events for dashboard in dashboards),
+        'publish_seconds': round(publish_done - start, 4),
+        'fast_client_drain_seconds': round(
+            max((dashboard.last_receive or publish_done) for dashboard in fast) - publish_done, 4) if fast else None,
+        'total_seconds': round(time.perf_counter() - start, 4)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test blockchain WebSocket broadcasting')
+    parser.add_argument('--clients', type=int, default=300, help='simulated dashboard sockets')
+    parser.add_argument('--events', type=int, default=1000, help='events to broadcast')
+    parser.add_argument('--burst-rate', type=float, default=2000, help='events per second (0 = as fast as possible)')
+    parser.add_argument('--slow-share', type=float, default=0.1, help='fraction of clients that send slowly')
+    parser.add_argument('--slow-delay', type=float, default=0.05, help='seconds per frame for slow clients')
+    parser.add_argument('--interval', type=float, default=0.25, help='coalescing interval in seconds')
+    parser.add_argument('--mode', action='append', choices=['coalesced', 'per-event'], help='mode to run (repeatable)')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    results = {
+        'benchmark': 'blockchain_broadcast',
+        'timestamp': time.time(),
+        'results': [
+            asyncio.run(run_mode(mode, args.clients, args.events, args.burst_rate,
+                                 args.slow_share, args.slow_delay, args.interval))
+            for mode in (args.mode or ['coalesced', 'per-event'])
+        ]
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for BlockchainLogger.
+
+Covers, each in its own temporary database:
+
+  log_event   throughput and per-call latency with 1..N concurrent producer threads
+  seal        block seal latency across proof-of-work difficulties and batch sizes
+  history     for each history size (10k, 100k and 1M events by default):
+              verify_chain time, startup (_load_chain) time, get_events_by_type
+              latency and get_statistics latency with a cold and a warm cache
+
+Histories are built through the real sealing path (difficulty 0, ed25519,
+--history-block-size events per block) without per-event journaling, so 1M
+events takes minutes rather than hours. Results are JSON; --history-file
+appends a one-line summary per run so regressions can be tracked over time.
+
+Usage:
+    python -m benchmarks.bench_blockchain_logger --output blockchain.json
+    python -m benchmarks.bench_blockchain_logger --suite history --sizes 10000,100000 --history-file bench-history.ndjson
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from blockchain_logger import BlockchainLogger, CheatingEvent, SealingPolicy
+
+EVENT_TYPES = ('head_misalignment', 'eye_misalignment', 'mobile_detected', 'lip_movement', 'emotion_detection')
+SEVERITIES = ('low', 'medium', 'high', 'critical')
+
+def make_event(i, timestamp=None):
+    return CheatingEvent(
+        event_id=str(uuid.uuid4()),
+        timestamp=timestamp or time.time(),
+        event_type=EVENT_TYPES[i % len(EVENT_TYPES)],
+        severity=SEVERITIES[i % len(SEVERITIES)],
+        description=f'Benchmark event {i}',
+        confidence_score=0.8,
+        metadata={'frame_count': i},
+        session_id=f'benchmark-session-{i % 100}'
+    )
+
+def open_logger(workdir, policy, name='chain'):
+    return BlockchainLogger(
+        db_path=os.path.join(workdir, f'{name}.db'),
+        private_key_path=os.path.join(workdir, 'private_key.pem'),
+        public_key_path=os.path.join(workdir, 'public_key.pem'),
+        ed25519_private_key_path=os.path.join(workdir, 'ed25519_private_key.pem'),
+        ed25519_public_key_path=os.path.join(workdir, 'ed25519_public_key.pem'),
+        sealing_policy=policy
+    )
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return None
+    return sorted_samples[max(1, math.ceil(q / 100 * len(sorted_samples))) - 1]
+
+def latency_summary(samples):
+    ordered = sorted(samples)
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'samples': len(ordered),
+        'mean_ms': to_ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': to_ms(percentile(ordered, 50)),
+        'p95_ms': to_ms(percentile(ordered, 95)),
+        'p99_ms': to_ms(percentile(ordered, 99)),
+        'max_ms': to_ms(ordered[-1]) if ordered else None,
+    }
+
+def bench_log_event(producer_counts, events_per_producer, policy):
+    results = []
+    for producers in producer_counts:
+        with tempfile.TemporaryDirectory() as workdir:
+            logger = open_logger(workdir, policy)
+            latencies = [[] for _ in range(producers)]
+            failures = [0] * producers
+            barrier = threading.Barrier(producers + 1)
+
+            def produce(slot):
+                batch = [make_event(slot * events_per_producer + i) for i in range(events_per_producer)]
+                barrier.wait()
+                for event in batch:
+                    start = time.perf_counter()
+                    if not logger.log_event(event):
+                        failures[slot] += 1
+                    latencies[slot].append(time.perf_counter() - start)
+
+            threads = [threading.Thread(target=produce, args=(slot,)) for slot in range(producers)]
+            for thread in threads:
+                thread.start()
+            barrier.wait()
+            start = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            logger.flush_pending_events()
+            elapsed = time.perf_counter() - start
+            events = producers * events_per_producer
+            results.append({
+                'producers': producers,
+                'events': events,
+                'failures': sum(failures),
+                'blocks': len(logger.chain),
+                'elapsed_seconds': round(elapsed, 4),
+                'events_per_second': round(events / elapsed, 1) if elapsed > 0 else None,
+                'log_event_latency': latency_summary([value for slot in latencies for value in slot]),
+            })
+            logger.journal.close()
+        print(f"log_event  {producers:>3} producers  {results[-1]['events_per_second']:>10} events/s", file=sys.stderr)
+    return results
+
+def seal_blocks(logger, events, block_size):
+    """Seal events in blocks of block_size through _mine_block, returning each seal's duration"""
+    durations = []
+    with logger.lock:
+        for offset in range(0, len(events), block_size):
+            logger.pending_events.extend(events[offset:offset + block_size])
+            start = time.perf_counter()
+            logger._mine_block()
+            durations.append(time.perf_counter() - start)
+    return durations
+
+def bench_seal(difficulties, batch_sizes, blocks, signature_algorithm):
+    results = []
+    for difficulty in difficulties:
+        for batch_size in batch_sizes:
+            with tempfile.TemporaryDirectory() as workdir:
+                policy = SealingPolicy(max_events=10 ** 9, difficulty=difficulty, signature_algorithm=signature_algorithm)
+                logger = open_logger(workdir, policy)
+                durations = seal_blocks(logger, [make_event(i) for i in range(batch_size * blocks)], batch_size)
+                logger.journal.close()
+            summary = latency_summary(durations)
+            results.append({
+                'difficulty': difficulty,
+                'batch_size': batch_size,
+                'signature_algorithm': signature_algorithm,
+                'blocks': blocks,
+                'seal_latency': summary,
+                'events_per_second': round(batch_size * blocks / sum(durations), 1) if sum(durations) else None,
+            })
+            print(f"seal       difficulty {difficulty} batch {batch_size:>5}  p50 {summary['p50_ms']} ms", file=sys.stderr)
+    return results
+
+def bench_history(sizes, block_size, queries, seed):
+    results = []
+    rng = random.Random(seed)
+    policy = SealingPolicy(max_events=10 ** 9, difficulty=0, signature_algorithm='ed25519')
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            logger = open_logger(workdir, policy)
+            # Spread the history over 30 days so the rollups and the 24h window see realistic buckets
+            now = time.time()
+            build_start = time.perf_counter()
+            for offset in range(0, size, block_size * 10):
+                count = min(block_size * 10, size - offset)
+                events = [make_event(offset + i, now - 30 * 86400 * (1 - (offset + i) / size)) for i in range(count)]
+                seal_blocks(logger, events, block_size)
+            build_seconds = time.perf_counter() - build_start
+            logger.journal.close()
+
+            start = time.perf_counter()
+            reopened = open_logger(workdir, policy)
+            startup_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            reopened._load_chain()
+            load_chain_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            verified = reopened.verify_chain()
+            verify_seconds = time.perf_counter() - start
+
+            by_type = []
+            for _ in range(queries):
+                event_type = rng.choice(EVENT_TYPES + ('all',))
+                start = time.perf_counter()
+                reopened.get_events_by_type(event_type, limit=100)
+                by_type.append(time.perf_counter() - start)
+
+            # Cold runs recompute (verifying only blocks sealed since the last run); warm runs are served from the cache
+            cold = []
+            for _ in range(max(1, queries // 10)):
+                reopened.statistics_cache.invalidate()
+                start = time.perf_counter()
+                reopened.get_statistics()
+                cold.append(time.perf_counter() - start)
+            warm = []
+            for _ in range(queries):
+                start = time.perf_counter()
+                reopened.get_statistics()
+                warm.append(time.perf_counter() - start)
+            reopened.journal.close()
+            db_bytes = os.path.getsize(os.path.join(workdir, 'chain.db'))
+
+        results.append({
+            'events': size,
+            'blocks': math.ceil(size / block_size),
+            'block_size': block_size,
+            'db_bytes': db_bytes,
+            'build_seconds': round(build_seconds, 3),
+            'startup_seconds': round(startup_seconds, 4),
+            'load_chain_seconds': round(load_chain_seconds, 4),
+            'verify_chain_seconds': round(verify_seconds, 4),
+            'chain_verified': verified,
+            'get_events_by_type': latency_summary(by_type),
+            'get_statistics_cold': latency_summary(cold),
+            'get_statistics_warm': latency_summary(warm),
+        })
+        print(f"history    {size:>8} events  startup {startup_seconds:.3f}s  verify {verify_seconds:.3f}s", file=sys.stderr)
+    return results
+
+def parse_ints(value):
+    return [int(item) for item in value.split(',') if item.strip()]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite for the blockchain logger')
+    parser.add_argument('--suite', action='append', choices=['log_event', 'seal', 'history'], help='suite to run (repeatable)')
+    parser.add_argument('--producers', default='1,2,4,8', help='concurrent producer thread counts for log_event')
+    parser.add_argument('--events-per-producer', type=int, default=500, help='events each producer logs')
+    parser.add_argument('--max-events', type=int, default=100, help='events per block while producers log')
+    parser.add_argument('--difficulties', default='0,2,3,4', help='proof-of-work difficulties for the seal suite')
+    parser.add_argument('--batch-sizes', default='10,100,1000', help='events per block for the seal suite')
+    parser.add_argument('--blocks', type=int, default=5, help='blocks sealed per difficulty and batch size')
+    parser.add_argument('--signature', default='rsa-pss', choices=['rsa-pss', 'ed25519'], help='signature for the seal suite')
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='history sizes in events')
+    parser.add_argument('--history-block-size', type=int, default=1000, help='events per block in built histories')
+    parser.add_argument('--queries', type=int, default=50, help='query repetitions per history size')
+    parser.add_argument('--seed', type=int, default=0, help='seed for query selection')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    parser.add_argument('--history-file', help='append a one-line JSON record of this run to this file')
+    args = parser.parse_args()
+
+    # Keep per-event INFO logging out of the measurement
+    logging.getLogger('blockchain_logger').setLevel(logging.WARNING)
+
+    suites = args.suite or ['log_event', 'seal', 'history']
+    results = {
+        'benchmark': 'blockchain_logger',
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {}
+    }
+    if 'log_event' in suites:
+        policy = SealingPolicy(max_events=args.max_events, difficulty=0, signature_algorithm='ed25519')
+        results['results']['log_event'] = bench_log_event(parse_ints(args.producers), args.events_per_producer, policy)
+    if 'seal' in suites:
+        results['results']['seal'] = bench_seal(parse_ints(args.difficulties), parse_ints(args.batch_sizes),
+                                                args.blocks, args.signature)
+    if 'history' in suites:
+        results['results']['history'] = bench_history(parse_ints(args.sizes), args.history_block_size,
+                                                      args.queries, args.seed)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    if args.history_file:
+        with open(args.history_file, 'a') as f:
+            f.write(json.dumps(results, separators=(',', ':')) + '\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
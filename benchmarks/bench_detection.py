@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Benchmark the detectors and the combined detection pipeline offline.
+
+Replays every video in --videos (or synthetic frames when there are none)
+at each resolution, first through each detector on its own and then through
+the full pipeline as main.py runs it (mobile and emotion detection every N
+frames). Reports throughput, p50/p95/p99 latency per stage, model load time
+and peak RSS, so changes to the detectors can be compared against a baseline.
+
+Synthetic frames contain a drawn face-like shape but no real face, so the
+detectors mostly take their no-face path; use recorded video for numbers that
+reflect an exam session.
+
+Usage:
+    python -m benchmarks.bench_detection --videos recordings/ --resolutions 640x480,1280x720 --output detection.json
+"""
+
+import argparse
+import importlib
+import json
+import math
+import os
+import resource
+import sys
+import time
+
+import cv2
+import numpy as np
+
+STAGES = ('eye_movement', 'head_pose', 'lip_movement', 'mobile_detection', 'emotion_detection')
+# Registry models each stage loads on first use; shared ones are only loaded (and timed) by the first stage
+STAGE_MODELS = {
+    'eye_movement': ('face_detector', 'shape_predictor'),
+    'head_pose': ('face_detector', 'shape_predictor'),
+    'lip_movement': ('face_detector', 'shape_predictor'),
+    'mobile_detection': ('mobile_yolo',),
+}
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+
+def load_stage(name):
+    """Import a detector module, load its models and return a per-frame callable plus the load time"""
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    if name in STAGE_MODELS:
+        from model_registry import warm_up_models
+        warm_up_models(STAGE_MODELS[name], parallel=False)
+    if name == 'eye_movement':
+        run = module.process_eye_movement
+    elif name == 'head_pose':
+        calibration = {'angles': None}
+        def run(frame):
+            # Calibrate on the first frame with a face, then track against it, as main.py does
+            if calibration['angles'] is None:
+                frame, calibration['angles'] = module.process_head_pose(frame, None)
+                return frame, None
+            return module.process_head_pose(frame, calibration['angles'])
+    elif name == 'lip_movement':
+        run = lambda frame: module.process_lip_movement(frame, 0.0)
+    elif name == 'mobile_detection':
+        run = module.process_mobile_detection
+    elif name == 'emotion_detection':
+        emotion_detector = module.initialize_emotion_detection()
+        run = lambda frame: module.process_emotion_detection(frame, emotion_detector)
+    else:
+        raise ValueError(f"Unknown stage '{name}'")
+    return run, time.perf_counter() - start
+
+def find_videos(directory):
+    if not directory or not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.lower().endswith(VIDEO_EXTENSIONS))
+
+def synthetic_frames(count, seed=0):
+    """Deterministic frames with a moving face-like shape over a noisy background"""
+    rng = np.random.default_rng(seed)
+    height, width = 720, 1280
+    background = np.tile(np.linspace(40, 200, width, dtype=np.uint8), (height, 1))
+    background = cv2.cvtColor(background, cv2.COLOR_GRAY2BGR)
+    for i in range(count):
+        frame = background.copy()
+        frame += rng.integers(0, 16, frame.shape, dtype=np.uint8)
+        cx = width // 2 + int(80 * math.sin(i / 15))
+        cy = height // 2 + int(30 * math.cos(i / 20))
+        cv2.ellipse(frame, (cx, cy), (110, 150), 0, 0, 360, (150, 180, 220), -1)
+        for dx in (-45, 45):
+            cv2.circle(frame, (cx + dx, cy - 40), 14, (40, 40, 40), -1)
+        cv2.ellipse(frame, (cx, cy + 70), (40, 10 + i % 8), 0, 0, 360, (60, 60, 150), -1)
+        yield frame
+
+def iter_frames(videos, limit):
+    """Yield up to limit frames from the videos in turn, or synthetic frames if there are none"""
+    if not videos:
+        yield from synthetic_frames(limit)
+        return
+    produced = 0
+    for path in videos:
+        cap = cv2.VideoCapture(path)
+        try:
+            while produced < limit:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                produced += 1
+                yield frame
+        finally:
+            cap.release()
+        if produced >= limit:
+            return
+
+def resized(frames, resolution):
+    width, height = resolution
+    for frame in frames:
+        if frame.shape[1] != width or frame.shape[0] != height:
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+        yield frame
+
+def percentile(sorted_samples, q):
+    # Nearest-rank, so p99 is an observed latency rather than an interpolation
+    if not sorted_samples:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+def summarize(samples, wall_seconds):
+    ordered = sorted(samples)
+    to_ms = lambda value: round(value * 1000, 3) if value is not None else None
+    return {
+        'frames': len(samples),
+        'throughput_fps': round(len(samples) / wall_seconds, 2) if wall_seconds else None,
+        'mean_ms': to_ms(sum(samples) / len(samples)) if samples else None,
+        'p50_ms': to_ms(percentile(ordered, 50)),
+        'p95_ms': to_ms(percentile(ordered, 95)),
+        'p99_ms': to_ms(percentile(ordered, 99)),
+        'max_ms': to_ms(ordered[-1]) if ordered else None,
+    }
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def run_stage(run, frames, warmup):
+    samples = []
+    wall = 0.0
+    for i, frame in enumerate(frames):
+        start = time.perf_counter()
+        run(frame)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+            wall += elapsed
+    return summarize(samples, wall)
+
+def run_pipeline(stages, frames, warmup, mobile_interval, emotion_interval):
+    per_stage = {name: [] for name in stages}
+    totals = []
+    for i, frame in enumerate(frames, start=1):
+        frame_start = time.perf_counter()
+        timings = {}
+        for name, run in stages.items():
+            if name == 'mobile_detection' and i % mobile_interval:
+                continue
+            if name == 'emotion_detection' and i % emotion_interval:
+                continue
+            start = time.perf_counter()
+            result = run(frame)
+            timings[name] = time.perf_counter() - start
+            if name != 'mobile_detection' and isinstance(result, tuple) and result[0] is not None:
+                # Later stages see the annotated frame, as in main.py
+                frame = result[0]
+        if i > warmup:
+            totals.append(time.perf_counter() - frame_start)
+            for name, elapsed in timings.items():
+                per_stage[name].append(elapsed)
+    wall = sum(totals)
+    report = summarize(totals, wall)
+    report['stages'] = {name: summarize(samples, sum(samples)) for name, samples in per_stage.items()}
+    return report
+
+def parse_resolution(value):
+    width, _, height = value.lower().partition('x')
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the detection pipeline")
+    parser.add_argument('--videos', help='Directory of recorded videos to replay (synthetic frames if empty or missing)')
+    parser.add_argument('--resolutions', default='640x480,1280x720', help='Comma-separated WIDTHxHEIGHT list')
+    parser.add_argument('--frames', type=int, default=200, help='Frames per stage and resolution')
+    parser.add_argument('--warmup', type=int, default=5, help='Leading frames excluded from the statistics')
+    parser.add_argument('--stages', default=','.join(STAGES), help='Comma-separated detectors to run')
+    parser.add_argument('--no-pipeline', action='store_true', help='Only benchmark detectors in isolation')
+    parser.add_argument('--mobile-interval', type=int, default=8, help='Pipeline runs mobile detection every N frames')
+    parser.add_argument('--emotion-interval', type=int, default=4, help='Pipeline runs emotion detection every N frames')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    args = parser.parse_args()
+
+    stage_names = [name.strip() for name in args.stages.split(',') if name.strip()]
+    resolutions = [parse_resolution(value) for value in args.resolutions.split(',') if value.strip()]
+    videos = find_videos(args.videos)
+    total_frames = args.frames + args.warmup
+
+    stages = {}
+    load_seconds = {}
+    for name in stage_names:
+        stages[name], load_seconds[name] = load_stage(name)
+    rss_after_load = peak_rss_mb()
+
+    results = []
+    for resolution in resolutions:
+        label = f"{resolution[0]}x{resolution[1]}"
+        result = {'resolution': label, 'stages': {}}
+        for name, run in stages.items():
+            result['stages'][name] = run_stage(run, resized(iter_frames(videos, total_frames), resolution), args.warmup)
+            print(f"{label:>10} {name:<18} {result['stages'][name]['throughput_fps']:>8} fps "
+                  f"p50 {result['stages'][name]['p50_ms']} ms p99 {result['stages'][name]['p99_ms']} ms")
+        if not args.no_pipeline:
+            result['pipeline'] = run_pipeline(stages, resized(iter_frames(videos, total_frames), resolution),
+                                              args.warmup, args.mobile_interval, args.emotion_interval)
+            print(f"{label:>10} {'pipeline':<18} {result['pipeline']['throughput_fps']:>8} fps "
+                  f"p50 {result['pipeline']['p50_ms']} ms p99 {result['pipeline']['p99_ms']} ms")
+        result['peak_rss_mb'] = peak_rss_mb()
+        results.append(result)
+
+    report = {
+        'benchmark': 'detection',
+        'source': {'videos': videos} if videos else {'synthetic': True},
+        'frames': args.frames,
+        'warmup': args.warmup,
+        'pipeline_intervals': {'mobile_detection': args.mobile_interval, 'emotion_detection': args.emotion_interval},
+        'load_seconds': {name: round(seconds, 3) for name, seconds in load_seconds.items()},
+        'peak_rss_mb_after_load': rss_after_load,
+        'peak_rss_mb': peak_rss_mb(),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Measure process startup cost: import time and peak RSS.
+
+Each scenario runs in a fresh interpreter so nothing is already imported or
+loaded, and is repeated --repeat times; the median is reported:
+
+  django_setup       django.setup() alone, what manage.py commands and Celery workers pay
+  import_detectors   importing the five detector modules
+  import_consumers   django.setup() plus monitoring.consumers (what the ASGI server imports)
+  warm_up_serial     loading every registered model one after another
+  warm_up_parallel   loading every registered model on parallel threads
+
+To compare before and after a change, run it against a checkout of the older
+commit with --cwd (e.g. a git worktree) and pass that report to --compare.
+Scenarios that do not exist in that checkout are reported as errors.
+
+Usage:
+    python -m benchmarks.bench_startup --repeat 5 --output startup.json
+    python -m benchmarks.bench_startup --cwd ../baseline --label before --output before.json
+    python -m benchmarks.bench_startup --label after --compare before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+DJANGO_SETUP = (
+    "import os, django\n"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'surveillance_system.settings')\n"
+    "django.setup()\n"
+)
+
+SCENARIOS = {
+    'django_setup': DJANGO_SETUP,
+    'import_detectors': "import eye_movement, head_pose, lip_movement, mobile_detection, emotion_detection\n",
+    'import_consumers': DJANGO_SETUP + "import monitoring.consumers\n",
+    'warm_up_serial': "from model_registry import warm_up_models\nwarm_up_models(parallel=False)\n",
+    'warm_up_parallel': "from model_registry import warm_up_models\nwarm_up_models(parallel=True)\n",
+}
+
+# Runs in the child: time the scenario body, then report peak RSS (kilobytes on Linux, bytes on macOS)
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+exec(compile({body!r}, '<scenario>', 'exec'))
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+sys.stdout.write('\\n' + json.dumps({{'seconds': elapsed, 'peak_rss_mb': peak / (1048576 if sys.platform == 'darwin' else 1024)}}))
+"""
+
+def run_once(body, cwd, timeout):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [cwd, os.environ.get('PYTHONPATH')])))
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', CHILD.format(body=body)], cwd=cwd, env=env,
+                               capture_output=True, text=True, timeout=timeout)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError((completed.stderr.strip().splitlines() or ['exit code %d' % completed.returncode])[-1])
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['wall_seconds'] = wall
+    return result
+
+def run_scenario(name, body, cwd, repeat, timeout):
+    runs = []
+    try:
+        for _ in range(repeat):
+            runs.append(run_once(body, cwd, timeout))
+    except (RuntimeError, subprocess.TimeoutExpired, ValueError) as e:
+        return {'scenario': name, 'error': str(e)}
+    return {
+        'scenario': name,
+        'runs': repeat,
+        'seconds': round(statistics.median(run['seconds'] for run in runs), 4),
+        'wall_seconds': round(statistics.median(run['wall_seconds'] for run in runs), 4),
+        'peak_rss_mb': round(statistics.median(run['peak_rss_mb'] for run in runs), 1),
+    }
+
+def compare(results, baseline):
+    previous = {result['scenario']: result for result in baseline.get('results', [])}
+    for result in results:
+        before = previous.get(result['scenario'])
+        if not before or 'error' in before or 'error' in result:
+            continue
+        result['seconds_change'] = round(result['seconds'] - before['seconds'], 4)
+        result['peak_rss_mb_change'] = round(result['peak_rss_mb'] - before['peak_rss_mb'], 1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Import time and peak RSS at process startup')
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='scenario to run (repeatable)')
+    parser.add_argument('--repeat', type=int, default=3, help='fresh interpreters per scenario (median reported)')
+    parser.add_argument('--cwd', default=os.getcwd(), help='checkout to measure (default: current directory)')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds before a run is abandoned')
+    parser.add_argument('--label', help='label stored in the report, e.g. before/after')
+    parser.add_argument('--compare', help='earlier report to compute changes against')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    cwd = os.path.abspath(args.cwd)
+    results = []
+    for name in args.scenario or SCENARIOS:
+        result = run_scenario(name, SCENARIOS[name], cwd, args.repeat, args.timeout)
+        results.append(result)
+        if 'error' in result:
+            print(f"{name:<18} error: {result['error']}", file=sys.stderr)
+        else:
+            print(f"{name:<18} {result['seconds']:>8.3f}s  {result['peak_rss_mb']:>8.1f} MB", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    report = {
+        'benchmark': 'startup',
+        'timestamp': time.time(),
+        'label': args.label,
+        'cwd': cwd,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
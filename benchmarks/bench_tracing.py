@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Measure the per-frame cost of detector tracing.
+
+Replays the debug lines one frame produces across the five detectors and the
+monitoring consumer, first as the old `print("[DEBUG] ...")` calls and then
+through the tracer, disabled, sampled and fully enabled. Output goes to
+os.devnull so only formatting and write overhead is measured, not a terminal.
+
+Usage:
+    python -m benchmarks.bench_tracing --frames 20000 --boxes 3 --output tracing.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+from tracing import TracerRegistry
+
+RESULTS = {
+    'gaze_direction': 'Looking at Screen',
+    'head_direction': 'Looking at Screen',
+    'lip_state': 'No Movement',
+    'mobile_detected': False,
+    'emotion': 'Neutral',
+}
+RESPONSE = dict(RESULTS, status='ok', confidence=92.5, fps=9.8, processing_time=41.0,
+                violations_detected=[], session_duration=120, frame_count=1200)
+EMOTION_STATE = {'stress': 0.12, 'fear': 0.03, 'overconfidence': 0.0, 'current_emotion': 'Neutral', 'confidence': 0.81}
+
+def frame_with_prints(boxes):
+    print("[DEBUG] process_eye_movement called")
+    print(f"[DEBUG] Found {1} faces")
+    print(f"[DEBUG] Left pupil: {(12, 8)}, Right pupil: {(13, 8)}")
+    print(f"[DEBUG] Gaze direction determined: {'Looking at Screen'}")
+    print(f"[DEBUG] Final gaze direction: {'Looking at Screen'}")
+    print(f"[DEBUG] process_head_pose called with calibrated_angles: {(1.5, -2.0, 0.4)}")
+    print(f"[DEBUG] Found {1} faces")
+    print(f"[DEBUG] Head pose angles: {(1.7, -1.2, 0.5)}")
+    print(f"[DEBUG] Head direction determined: {'Looking at Screen'}")
+    print("[DEBUG] process_mobile_detection called")
+    print(f"[DEBUG] Frame size: {1280}x{720}")
+    print(f"[DEBUG] Resized frame to: {640}x{360}")
+    print("[DEBUG] Running YOLO inference...")
+    print(f"[DEBUG] YOLO results: {1} detections")
+    for i in range(boxes):
+        conf = 0.3 + 0.1 * i
+        print(f"[DEBUG] Detection - class: {0}, confidence: {conf}")
+        print(f"[DEBUG] Confidence {conf} below threshold 0.5, skipping")
+    print(f"[DEBUG] Mobile detection result: {False}")
+    print(f"[DEBUG] process_lip_movement called with audio_level: {0}")
+    print(f"[DEBUG] Found {1} faces")
+    print(f"[DEBUG] Current lip distance: {0.231}")
+    print(f"[DEBUG] Lip movement: {0.004}")
+    print(f"[DEBUG] Smoothed lip movement: {0.006}")
+    print(f"[DEBUG] Lip state determined: {'No Movement'}, is_whispering: {False}")
+    print("[DEBUG] process_emotion_detection called")
+    print(f"[DEBUG] Found {1} faces")
+    print(f"[DEBUG] Processing face at ({310},{120}) with size {220}x{220}")
+    print(f"[DEBUG] Detected emotion: {'Neutral'} with confidence: {0.81}")
+    print(f"[DEBUG] Emotion state: {EMOTION_STATE}")
+    print(f"[DEBUG] Emotion alerts: {[]}")
+    print(f"[DEBUG] Final results - emotion: {'Neutral'}, stress: {False}, fear: {False}, overconfidence: {False}")
+    print(f"[REAL-TIME DEBUG] Detection results: {RESULTS}")
+    print(f"[REAL-TIME MONITORING] Frame {1200}: {RESPONSE}")
+
+def frame_with_tracers(tracers, boxes):
+    eye, head, mobile, lip, emotion, consumer = tracers
+    eye.trace("process_eye_movement called")
+    eye.debug("faces found", count=1)
+    eye.debug("pupils", left=(12, 8), right=(13, 8))
+    eye.debug("gaze direction determined", gaze='Looking at Screen')
+    eye.debug("final gaze direction", gaze='Looking at Screen')
+    head.trace("process_head_pose called", calibrated_angles=(1.5, -2.0, 0.4))
+    head.debug("faces found", count=1)
+    head.debug("head pose angles", angles=(1.7, -1.2, 0.5))
+    head.debug("head direction determined", direction='Looking at Screen')
+    mobile.trace("process_mobile_detection called")
+    mobile.trace("frame size", width=1280, height=720)
+    mobile.trace("resized frame", width=640, height=360)
+    mobile.trace("running YOLO inference")
+    mobile.debug("YOLO results", detections=1)
+    for i in range(boxes):
+        conf = 0.3 + 0.1 * i
+        if mobile.debug_enabled:
+            mobile.debug("detection", cls=0, confidence=conf)
+        if mobile.debug_enabled:
+            mobile.debug("below confidence threshold", confidence=conf, threshold=0.5)
+    mobile.debug("mobile detection result", detected=False)
+    lip.trace("process_lip_movement called", audio_level=0)
+    lip.debug("faces found", count=1)
+    lip.debug("lip distance", distance=0.231)
+    lip.debug("lip movement", movement=0.004)
+    lip.debug("smoothed lip movement", movement=0.006)
+    lip.debug("lip state determined", state='No Movement', whispering=False)
+    emotion.trace("process_emotion_detection called")
+    emotion.debug("faces found", count=1)
+    emotion.debug("processing face", x=310, y=120, width=220, height=220)
+    emotion.debug("emotion detected", emotion='Neutral', confidence=0.81)
+    emotion.debug("emotion state", state=EMOTION_STATE)
+    emotion.debug("emotion alerts", alerts=[])
+    emotion.debug("final results", emotion='Neutral', stress=False, fear=False, overconfidence=False)
+    consumer.debug("detection results", frame=1200, results=RESULTS)
+    consumer.debug("frame processed", frame=1200, response=RESPONSE)
+
+def time_frames(run_frame, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        run_frame()
+    return time.perf_counter() - start
+
+def run_benchmark(frames, boxes, sample_every):
+    results = []
+    with open(os.devnull, 'w') as devnull:
+        with contextlib.redirect_stdout(devnull):
+            elapsed = time_frames(lambda: frame_with_prints(boxes), frames)
+        results.append({'mode': 'print', 'spec': None, 'elapsed_seconds': round(elapsed, 4)})
+
+        modules = ('eye_movement', 'head_pose', 'mobile_detection', 'lip_movement', 'emotion_detection', 'monitoring.consumers')
+        for spec, output_format in (('*=info', 'text'),
+                                    (f'*=debug:{sample_every}', 'text'),
+                                    ('*=debug', 'text'),
+                                    ('*=debug', 'json')):
+            registry = TracerRegistry(spec, output_format, stream=devnull)
+            tracers = [registry.get(name) for name in modules]
+            elapsed = time_frames(lambda: frame_with_tracers(tracers, boxes), frames)
+            if spec == '*=info':
+                mode = 'tracer_disabled'
+            elif ':' in spec:
+                mode = 'tracer_sampled'
+            else:
+                mode = f'tracer_{output_format}'
+            results.append({'mode': mode, 'spec': spec, 'elapsed_seconds': round(elapsed, 4)})
+
+    baseline = results[0]['elapsed_seconds']
+    for result in results:
+        result['us_per_frame'] = round(result['elapsed_seconds'] / frames * 1e6, 2)
+        result['saving_us_per_frame'] = round((baseline - result['elapsed_seconds']) / frames * 1e6, 2)
+        result['speedup'] = round(baseline / result['elapsed_seconds'], 1) if result['elapsed_seconds'] else None
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-frame cost of detector tracing")
+    parser.add_argument('--frames', type=int, default=20000, help='Frames to replay per mode')
+    parser.add_argument('--boxes', type=int, default=3, help='YOLO boxes per frame (two debug lines each)')
+    parser.add_argument('--sample-every', type=int, default=10, help='Sampling rate for the sampled mode')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.frames, args.boxes, args.sample_every)
+    report = {
+        'benchmark': 'tracing',
+        'frames': args.frames,
+        'boxes': args.boxes,
+        'results': results,
+    }
+    for result in results:
+        print(f"{result['mode']:<16} {result['spec'] or '':<14} {result['us_per_frame']:>9.2f} us/frame "
+              f"saving {result['saving_us_per_frame']:>8.2f} us/frame")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+if __name__ == '__main__':
+    main()
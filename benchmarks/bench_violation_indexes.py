@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark the dashboard and analytics endpoints with and without the composite
+Violation/SessionEvent/ExamSession indexes.
+
+Seeds a dedicated database (a few million rows by default), then times each
+endpoint with the indexes added by violations 0002 and exam_sessions 0003
+dropped ("before") and recreated ("after"). Only those indexes are touched, so
+later migrations (e.g. the rollup table the endpoints read) stay applied.
+
+Usage:
+    python -m benchmarks.bench_violation_indexes --violations 2000000 --output indexes.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+# (app_label, model_name, index name) for the indexes under test
+BENCHMARKED_INDEXES = [
+    ('violations', 'violation', 'violation_user_ts_idx'),
+    ('violations', 'violation', 'violation_type_ts_idx'),
+    ('exam_sessions', 'examsession', 'exam_session_active_user_idx'),
+    ('exam_sessions', 'sessionevent', 'session_event_session_ts_idx'),
+]
+PHASES = (('before', False), ('after', True))
+
+def setup_django(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'surveillance_system.settings')
+    import django
+    django.setup()
+
+def seed(users, violations, events, batch_size=10000):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from exam_sessions.models import ExamSession, SessionEvent
+    from violations.models import Violation
+
+    User = get_user_model()
+    if Violation.objects.count() >= violations:
+        return
+    random.seed(42)
+    now = timezone.now()
+    User.objects.bulk_create([User(username=f'bench_user_{i}') for i in range(users)])
+    accounts = list(User.objects.filter(username__startswith='bench_user_'))
+    ExamSession.objects.bulk_create([
+        ExamSession(user=user, session_id=f'bench-{user.pk}-{i}', is_active=(i == 0),
+                    start_time=now - timedelta(days=random.randint(0, 90)))
+        for user in accounts for i in range(5)
+    ])
+    sessions = list(ExamSession.objects.filter(session_id__startswith='bench-'))
+    violation_types = [choice for choice, _ in Violation.VIOLATION_TYPES]
+    event_types = [choice for choice, _ in SessionEvent.EVENT_TYPES]
+    for start in range(0, violations, batch_size):
+        Violation.objects.bulk_create([
+            Violation(user=random.choice(accounts), violation_type=random.choice(violation_types),
+                      timestamp=now - timedelta(seconds=random.randint(0, 120 * 86400)),
+                      confidence=random.random())
+            for _ in range(min(batch_size, violations - start))
+        ])
+    for start in range(0, events, batch_size):
+        SessionEvent.objects.bulk_create([
+            SessionEvent(session=random.choice(sessions), event_type=random.choice(event_types),
+                         timestamp=now - timedelta(seconds=random.randint(0, 120 * 86400)),
+                         confidence=random.random())
+            for _ in range(min(batch_size, events - start))
+        ])
+
+def endpoints():
+    from analytics.views import violations_over_time, violations_per_type, violations_per_user
+    from dashboard.views import dashboard_data, real_time_stats, dashboard_home
+    return [
+        ('analytics.violations_over_time?days=7', violations_over_time, {'days': 7}),
+        ('analytics.violations_over_time?days=90', violations_over_time, {'days': 90}),
+        ('analytics.violations_per_type', violations_per_type, {}),
+        ('analytics.violations_per_user', violations_per_user, {}),
+        ('dashboard.dashboard_data?days=30', dashboard_data, {'days': 30}),
+        ('dashboard.real_time_stats', real_time_stats, {}),
+        ('dashboard.dashboard_home', dashboard_home, {}),
+    ]
+
+def set_indexes(present):
+    """Create or drop the benchmarked indexes without touching the migration state"""
+    from django.apps import apps
+    from django.db import connection
+
+    with connection.schema_editor() as editor:
+        for app_label, model_name, index_name in BENCHMARKED_INDEXES:
+            model = apps.get_model(app_label, model_name)
+            index = next(index for index in model._meta.indexes if index.name == index_name)
+            if present:
+                editor.add_index(model, index)
+            else:
+                editor.remove_index(model, index)
+
+def time_endpoints(repeat):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+
+    factory = RequestFactory()
+    user = get_user_model().objects.filter(username__startswith='bench_user_').first()
+    results = []
+    for name, view, params in endpoints():
+        durations = []
+        for _ in range(repeat):
+            request = factory.get('/', params)
+            request.user = user
+            request.session = {}
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                view(request)
+                durations.append(time.perf_counter() - start)
+        results.append({
+            'endpoint': name,
+            'queries': len(queries.captured_queries),
+            'median_ms': round(statistics.median(durations) * 1000, 3),
+            'max_ms': round(max(durations) * 1000, 3),
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark composite indexes on dashboard/analytics endpoints')
+    parser.add_argument('--database-url', default='sqlite:///bench_indexes.sqlite3', help='database to seed and query')
+    parser.add_argument('--users', type=int, default=200, help='users to seed')
+    parser.add_argument('--violations', type=int, default=2000000, help='violations to seed')
+    parser.add_argument('--events', type=int, default=1000000, help='session events to seed')
+    parser.add_argument('--repeat', type=int, default=20, help='requests per endpoint')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    setup_django(args.database_url)
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command('migrate', verbosity=0)
+    seed_start = time.perf_counter()
+    seed(args.users, args.violations, args.events)
+    seed_seconds = time.perf_counter() - seed_start
+
+    results = {'benchmark': 'violation_indexes', 'timestamp': time.time(), 'seed_seconds': round(seed_seconds, 1),
+               'violations': args.violations, 'events': args.events, 'phases': {}}
+    indexed = True
+    try:
+        for phase, present in PHASES:
+            if present != indexed:
+                set_indexes(present)
+                indexed = present
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            results['phases'][phase] = time_endpoints(args.repeat)
+    finally:
+        # Leave the database matching its applied migrations even if a phase fails
+        if not indexed:
+            set_indexes(True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
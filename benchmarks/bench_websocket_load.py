@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Find how many concurrent candidates one server process can monitor.
+
+Each simulated client opens /ws/monitoring/, waits for 'connected' and then
+streams JPEG frames open-loop at --fps, as the monitoring page does. Every
+frame gets exactly one status reply, so replies are matched to frames in
+order to measure round-trip latency. The run is repeated for each client
+count in --clients, giving a saturation curve of delivered frame rate,
+latency percentiles, error rate and drop rate (frames never answered).
+
+--mode inprocess drives the ASGI application through Channels'
+WebsocketCommunicator in this process, detectors included, so the curve is
+the capacity of one event loop. --mode socket connects to a running server
+(daphne surveillance_system.asgi:application) over real sockets and needs
+the `websockets` package. Clients are anonymous unless --cookie carries a
+logged-in session, so violations are only persisted in that case.
+
+Usage:
+    python -m benchmarks.bench_websocket_load --clients 1,2,4,8,16 --fps 10 --duration 20 --output load.json
+    python -m benchmarks.bench_websocket_load --mode socket --url ws://127.0.0.1:8000/ws/monitoring/ --clients 1,4,16
+"""
+
+import argparse
+import asyncio
+import base64
+import collections
+import json
+import math
+import os
+import sys
+import time
+
+import cv2
+
+from benchmarks.bench_detection import iter_frames, percentile, resized
+
+# Replies carry 'status'; pushed stats ('type': 'session_stats'/'stats_delta') are not frame replies
+REPLY_STATUSES = ('ok', 'calibrating', 'calibration_failed', 'error')
+
+def encode_frames(video, count, resolution, quality):
+    """Pre-encode frames as data URLs like canvas.toDataURL('image/jpeg') so encoding is not measured"""
+    videos = [video] if video else []
+    payloads = []
+    for frame in resized(iter_frames(videos, count), resolution):
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if ok:
+            payloads.append(json.dumps({'image': 'data:image/jpeg;base64,' + base64.b64encode(buffer).decode('ascii')}))
+    if not payloads:
+        raise RuntimeError("No frames could be read or encoded")
+    return payloads
+
+class InProcessConnection:
+    application = None
+
+    def __init__(self, path):
+        from channels.testing import WebsocketCommunicator
+        if InProcessConnection.application is None:
+            os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'surveillance_system.settings')
+            from surveillance_system.asgi import application
+            InProcessConnection.application = application
+        self.communicator = WebsocketCommunicator(InProcessConnection.application, path)
+
+    async def connect(self, timeout):
+        connected, _ = await self.communicator.connect(timeout=timeout)
+        if not connected:
+            raise ConnectionError("WebSocket connection rejected")
+
+    async def send(self, text):
+        await self.communicator.send_to(text_data=text)
+
+    async def recv(self, timeout):
+        return await self.communicator.receive_from(timeout=timeout)
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+class SocketConnection:
+    def __init__(self, url, cookie=None):
+        self.url = url
+        self.cookie = cookie
+        self.socket = None
+
+    async def connect(self, timeout):
+        try:
+            import websockets
+        except ImportError:
+            raise RuntimeError("--mode socket requires the 'websockets' package")
+        headers = {'Cookie': self.cookie} if self.cookie else None
+        try:
+            connection = websockets.connect(self.url, additional_headers=headers, max_size=None)
+        except TypeError:
+            # websockets < 14
+            connection = websockets.connect(self.url, extra_headers=headers, max_size=None)
+        self.socket = await asyncio.wait_for(connection, timeout)
+
+    async def send(self, text):
+        await self.socket.send(text)
+
+    async def recv(self, timeout):
+        return await asyncio.wait_for(self.socket.recv(), timeout)
+
+    async def close(self):
+        if self.socket is not None:
+            await self.socket.close()
+
+class SimulatedCandidate:
+    def __init__(self, connection, payloads, fps, offset):
+        self.connection = connection
+        self.payloads = payloads
+        self.interval = 1 / fps
+        self.offset = offset
+        self.in_flight = collections.deque()
+        self.latencies = []
+        self.sent = 0
+        self.replies = 0
+        self.errors = 0
+        self.calibrating = 0
+        self.server_fps = None
+        self.failure = None
+
+    async def run(self, duration, warmup, connect_timeout, drain_timeout):
+        try:
+            await self.connection.connect(connect_timeout)
+            while True:
+                message = json.loads(await self.connection.recv(connect_timeout))
+                if message.get('status') == 'connected':
+                    break
+        except Exception as e:
+            self.failure = f"connect: {e}"
+            return
+        receiver = asyncio.ensure_future(self.receive(warmup))
+        try:
+            start = time.perf_counter()
+            # Spread clients across the frame interval instead of sending in lockstep
+            await asyncio.sleep(self.offset * self.interval)
+            frame = 0
+            while time.perf_counter() - start < duration:
+                self.in_flight.append((time.perf_counter(), time.perf_counter() - start >= warmup))
+                await self.connection.send(self.payloads[frame % len(self.payloads)])
+                self.sent += 1
+                frame += 1
+                next_send = start + self.offset * self.interval + frame * self.interval
+                await asyncio.sleep(max(0, next_send - time.perf_counter()))
+            # Replies still outstanding after the drain timeout count as dropped
+            deadline = time.perf_counter() + drain_timeout
+            while self.in_flight and time.perf_counter() < deadline and not receiver.done():
+                await asyncio.sleep(0.01)
+        except Exception as e:
+            self.failure = f"send: {e}"
+        finally:
+            receiver.cancel()
+            await asyncio.gather(receiver, return_exceptions=True)
+            try:
+                await self.connection.close()
+            except Exception:
+                pass
+
+    async def receive(self, warmup):
+        while True:
+            try:
+                message = json.loads(await self.connection.recv(3600))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failure = self.failure or f"receive: {e}"
+                return
+            if message.get('status') not in REPLY_STATUSES or not self.in_flight:
+                continue
+            sent_at, measured = self.in_flight.popleft()
+            self.replies += 1
+            if message['status'] == 'error':
+                self.errors += 1
+            elif message['status'] == 'calibrating':
+                self.calibrating += 1
+            elif measured:
+                self.latencies.append(time.perf_counter() - sent_at)
+                self.server_fps = message.get('fps', self.server_fps)
+
+def make_connection(args):
+    if args.mode == 'socket':
+        return SocketConnection(args.url, args.cookie)
+    return InProcessConnection(args.path)
+
+async def run_level(clients, payloads, args):
+    candidates = [SimulatedCandidate(make_connection(args), payloads, args.fps, i / clients) for i in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(candidate.run(args.duration, args.warmup, args.connect_timeout, args.drain_timeout)
+                           for candidate in candidates))
+    elapsed = time.perf_counter() - start
+
+    connected = [candidate for candidate in candidates if not (candidate.failure or '').startswith('connect')]
+    latencies = sorted(latency for candidate in candidates for latency in candidate.latencies)
+    sent = sum(candidate.sent for candidate in candidates)
+    replies = sum(candidate.replies for candidate in candidates)
+    errors = sum(candidate.errors for candidate in candidates)
+    dropped = sum(len(candidate.in_flight) for candidate in candidates)
+    measured_seconds = max(args.duration - args.warmup, 1e-9)
+    delivered_fps = len(latencies) / measured_seconds
+    server_fps = [candidate.server_fps for candidate in candidates if candidate.server_fps is not None]
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    result = {
+        'clients': clients,
+        'connected': len(connected),
+        'connect_failures': clients - len(connected),
+        'failures': sorted({candidate.failure for candidate in candidates if candidate.failure}),
+        'target_fps_per_client': args.fps,
+        'frames_sent': sent,
+        'replies': replies,
+        'delivered_fps_total': round(delivered_fps, 2),
+        'delivered_fps_per_client': round(delivered_fps / len(connected), 2) if connected else 0,
+        'server_fps_mean': round(sum(server_fps) / len(server_fps), 2) if server_fps else None,
+        'rtt_p50_ms': to_ms(percentile(latencies, 50)),
+        'rtt_p95_ms': to_ms(percentile(latencies, 95)),
+        'rtt_p99_ms': to_ms(percentile(latencies, 99)),
+        'rtt_max_ms': to_ms(latencies[-1]) if latencies else None,
+        'error_rate': round(errors / replies, 4) if replies else 0,
+        'drop_rate': round(dropped / sent, 4) if sent else 0,
+        'elapsed_seconds': round(elapsed, 2),
+    }
+    # Saturated once clients no longer get their frame rate back, or frames go unanswered
+    result['saturated'] = (
+        result['connect_failures'] > 0
+        or result['delivered_fps_per_client'] < 0.9 * args.fps
+        or result['drop_rate'] > args.max_drop_rate
+        or (args.rtt_budget_ms is not None and (result['rtt_p95_ms'] or math.inf) > args.rtt_budget_ms)
+    )
+    return result
+
+def parse_resolution(value):
+    width, _, height = value.lower().partition('x')
+    return int(width), int(height)
+
+def main():
+    parser = argparse.ArgumentParser(description='Capacity test for the monitoring WebSocket')
+    parser.add_argument('--mode', choices=['inprocess', 'socket'], default='inprocess',
+                        help='drive the ASGI app in this process, or a running server over sockets')
+    parser.add_argument('--url', default='ws://127.0.0.1:8000/ws/monitoring/', help='server URL for --mode socket')
+    parser.add_argument('--path', default='/ws/monitoring/', help='route for --mode inprocess')
+    parser.add_argument('--cookie', help='Cookie header for --mode socket, e.g. "sessionid=..."')
+    parser.add_argument('--clients', default='1,2,4,8,16', help='comma-separated client counts, one run each')
+    parser.add_argument('--fps', type=float, default=10, help='frames per second per client (the monitoring page sends 10)')
+    parser.add_argument('--duration', type=float, default=20, help='seconds of streaming per run')
+    parser.add_argument('--warmup', type=float, default=4, help='leading seconds excluded from latency (covers calibration)')
+    parser.add_argument('--video', help='recorded video to stream (synthetic frames if omitted)')
+    parser.add_argument('--frame-pool', type=int, default=50, help='distinct frames to pre-encode and cycle through')
+    parser.add_argument('--resolution', default='640x480', help='WIDTHxHEIGHT of streamed frames')
+    parser.add_argument('--quality', type=int, default=50, help='JPEG quality (the monitoring page uses 50)')
+    parser.add_argument('--connect-timeout', type=float, default=30, help='seconds to wait for a connection')
+    parser.add_argument('--drain-timeout', type=float, default=5, help='seconds to wait for outstanding replies')
+    parser.add_argument('--max-drop-rate', type=float, default=0.01, help='drop rate above which a run counts as saturated')
+    parser.add_argument('--rtt-budget-ms', type=float, help='p95 round trip above which a run counts as saturated')
+    parser.add_argument('--stop-at-saturation', action='store_true', help='skip larger client counts once saturated')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args()
+
+    payloads = encode_frames(args.video, args.frame_pool, parse_resolution(args.resolution), args.quality)
+    results = []
+    for clients in (int(value) for value in args.clients.split(',') if value.strip()):
+        result = asyncio.run(run_level(clients, payloads, args))
+        results.append(result)
+        print(f"{clients:>5} clients  {result['delivered_fps_per_client']:>6} fps/client  "
+              f"p95 {result['rtt_p95_ms']} ms  drop {result['drop_rate']:.2%}  errors {result['error_rate']:.2%}"
+              f"{'  SATURATED' if result['saturated'] else ''}", file=sys.stderr)
+        if result['saturated'] and args.stop_at_saturation:
+            break
+
+    sustained = [result['clients'] for result in results if not result['saturated']]
+    report = {
+        'benchmark': 'websocket_load',
+        'timestamp': time.time(),
+        'mode': args.mode,
+        'source': args.video or 'synthetic',
+        'resolution': args.resolution,
+        'frame_bytes_mean': round(sum(len(payload) for payload in payloads) / len(payloads)),
+        'max_sustained_clients': max(sustained) if sustained else 0,
+        'saturated_at': next((result['clients'] for result in results if result['saturated']), None),
+        'results': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,5 +6,18 @@ class BlockchainConfig(AppConfig):
     name = 'blockchain'
 
     def ready(self):
-        from blockchain_logger import initialize_blockchain_logger
-        initialize_blockchain_logger() 
\ No newline at end of file
+        from django.conf import settings
+        from django.core.cache import caches
+        from blockchain_logger import initialize_blockchain_logger, SealingPolicy, StatisticsCache
+        from .consumers import blockchain_publisher
+        cache_alias = getattr(settings, 'BLOCKCHAIN_STATS_CACHE', None)
+        logger = initialize_blockchain_logger(
+            sealing_policy=SealingPolicy(**getattr(settings, 'BLOCKCHAIN_SEALING_POLICY', {})),
+            journal_fsync_interval=getattr(settings, 'BLOCKCHAIN_JOURNAL_FSYNC_INTERVAL', 0.05),
+            statistics_cache=StatisticsCache(
+                backend=caches[cache_alias] if cache_alias else None,
+                ttl=getattr(settings, 'BLOCKCHAIN_STATS_CACHE_TTL', 60)
+            )
+        )
+        # Push event and block notifications to connected dashboards
+        logger.add_listener(blockchain_publisher)
@@ -1,15 +1,27 @@
 import json
 import asyncio
+import threading
+from collections import deque
+from django.conf import settings
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
 from blockchain_logger import get_blockchain_logger
 from datetime import datetime, timedelta
 
+# Batch frames a client may fall behind by before it is disconnected to resync
+MAX_PENDING_FRAMES = 100
+
 class BlockchainConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         await self.accept()
         print("Blockchain WebSocket connection accepted.")
         
+        # Logger notifications are delivered on the server's event loop
+        blockchain_publisher.bind(asyncio.get_running_loop())
+        self.outbox = FrameOutbox(lambda text: self.send(text_data=text))
+        self.outbox_task = asyncio.ensure_future(self.outbox.run())
+        
         # Add to blockchain group for broadcasting
         await self.channel_layer.group_add("blockchain_updates", self.channel_name)
         
@@ -19,6 +31,9 @@ class BlockchainConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         # Remove from blockchain group
         await self.channel_layer.group_discard("blockchain_updates", self.channel_name)
+        await self.channel_layer.group_discard("event_updates", self.channel_name)
+        if hasattr(self, 'outbox_task'):
+            self.outbox_task.cancel()
         print(f"Blockchain WebSocket disconnected with code: {close_code}")
 
     async def receive(self, text_data):
@@ -100,6 +115,16 @@ class BlockchainConsumer(AsyncWebsocketConsumer):
             'data': event['data']
         }))
 
+    async def blockchain_batch(self, event):
+        """Queue a coalesced, pre-serialized batch frame (called by group)"""
+        if not self.outbox.put_frame(event['text']):
+            # Too far behind to catch up; the client resyncs from initial_stats on reconnect
+            await self.close(code=4008)
+
+    async def blockchain_snapshot(self, event):
+        """Queue a pre-serialized snapshot, replacing one the client has not received yet"""
+        self.outbox.put_snapshot(event['snapshot'], event['text'])
+
     @database_sync_to_async
     def get_blockchain_stats(self):
         """Get blockchain statistics"""
@@ -111,19 +136,11 @@ class BlockchainConsumer(AsyncWebsocketConsumer):
             chain_length = len(logger.chain)
             pending_events = len(logger.pending_events)
             
-            # Get events by severity for last 7 days
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=7)
-            
-            all_events = logger.get_events_by_type('all', limit=1000)
-            events_by_severity = {}
-            events_by_type = {}
-            
-            for event in all_events:
-                event_date = datetime.fromtimestamp(event.timestamp)
-                if start_date <= event_date <= end_date:
-                    events_by_severity[event.severity] = events_by_severity.get(event.severity, 0) + 1
-                    events_by_type[event.event_type] = events_by_type.get(event.event_type, 0) + 1
+            # Get events by severity for last 7 days from the daily rollups
+            start_date = datetime.now() - timedelta(days=6)
+            weekly = logger.get_rollup_statistics(since=start_date.timestamp(), granularity='day')
+            events_by_severity = weekly['events_by_severity']
+            events_by_type = weekly['events_by_type']
             
             return {
                 'total_blocks': stats.get('total_blocks', 0),
@@ -215,4 +232,158 @@ async def broadcast_block_mined(channel_layer, block_data):
     await channel_layer.group_send("blockchain_updates", {
         'type': 'blockchain_block_mined',
         'data': block_data
-    }) 
\ No newline at end of file
+    })
+
+def format_event_update(event_data):
+    """Shape a logged event like the events returned by get_recent_events"""
+    return {
+        'event_id': event_data['event_id'],
+        'timestamp': event_data['timestamp'],
+        'event_type': event_data['event_type'],
+        'severity': event_data['severity'],
+        'description': event_data['description'],
+        'confidence_score': event_data['confidence_score'],
+        'session_id': event_data['session_id'],
+        'user_id': event_data['user_id'],
+        'formatted_time': datetime.fromtimestamp(event_data['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+class FrameOutbox:
+    """Per-client send queue for broadcast frames.
+    
+    Batch frames are delivered in order. Snapshots are state, not deltas, so
+    while the client is still busy receiving only the newest snapshot of each
+    kind is kept and intermediate ones are dropped.
+    """
+    def __init__(self, send, max_frames=MAX_PENDING_FRAMES):
+        self.send = send
+        self.max_frames = max_frames
+        self.frames = deque()
+        self.snapshots = {}
+        self.dropped_snapshots = 0
+        self.ready = asyncio.Event()
+
+    def put_frame(self, text):
+        if len(self.frames) >= self.max_frames:
+            return False
+        self.frames.append(text)
+        self.ready.set()
+        return True
+
+    def put_snapshot(self, kind, text):
+        if kind in self.snapshots:
+            self.dropped_snapshots += 1
+        self.snapshots[kind] = text
+        self.ready.set()
+
+    async def run(self):
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.frames or self.snapshots:
+                if self.frames:
+                    await self.send(self.frames.popleft())
+                else:
+                    kind = next(iter(self.snapshots))
+                    await self.send(self.snapshots.pop(kind))
+
+class CoalescingBroadcaster:
+    """Coalesce blockchain updates into one frame per group per interval.
+    
+    Each frame is serialized once and the same text is fanned out to every
+    subscriber, instead of one group_send and one json.dumps per event.
+    Must be called on the event loop the consumers run on.
+    """
+    def __init__(self, interval=0.25, channel_layer=None):
+        self.interval = interval
+        self.channel_layer = channel_layer
+        self.pending = {}
+        self.flush_handle = None
+        self.frames_sent = 0
+
+    def publish(self, group, update_type, data):
+        """Buffer an update; every buffered update is delivered in order"""
+        self._buffer(group)['updates'].append({'type': update_type, 'data': data})
+
+    def publish_snapshot(self, group, snapshot_type, data):
+        """Buffer a state snapshot; only the latest one per interval is sent"""
+        self._buffer(group)['snapshots'][snapshot_type] = data
+
+    def _buffer(self, group):
+        if self.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self.flush_handle = loop.call_later(self.interval, lambda: asyncio.ensure_future(self.flush()))
+        return self.pending.setdefault(group, {'updates': [], 'snapshots': {}})
+
+    async def flush(self):
+        pending, self.pending = self.pending, {}
+        self.flush_handle = None
+        channel_layer = self.channel_layer or get_channel_layer()
+        for group, buffered in pending.items():
+            if buffered['updates']:
+                text = json.dumps({'type': 'batch', 'updates': buffered['updates']})
+                await channel_layer.group_send(group, {'type': 'blockchain.batch', 'text': text})
+                self.frames_sent += 1
+            for snapshot_type, data in buffered['snapshots'].items():
+                text = json.dumps({'type': snapshot_type, 'data': data})
+                await channel_layer.group_send(group, {
+                    'type': 'blockchain.snapshot',
+                    'snapshot': snapshot_type,
+                    'text': text
+                })
+                self.frames_sent += 1
+
+class ChannelLayerPublisher:
+    """Thread-safe bridge from BlockchainLogger notifications to the channel layer.
+    
+    The logger calls this from whichever thread logged the event (video loop,
+    request thread, sealing timer), so updates are handed to the broadcaster
+    on the event loop the consumers run on instead of being sent here.
+    """
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.loop = None
+        self.stats = {}
+
+    def bind(self, loop):
+        self.loop = loop
+
+    def __call__(self, notification_type, data):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            # No dashboard has connected to this process yet
+            return
+        if notification_type == 'event_logged':
+            update = dict(format_event_update(data['event']), pending_events=data['pending_events'])
+            self.stats['pending_events'] = data['pending_events']
+            loop.call_soon_threadsafe(self.broadcaster.publish, 'event_updates', 'event_update', update)
+        elif notification_type == 'block_sealed':
+            self.stats.update({
+                'chain_length': data['index'] + 1,
+                'total_blocks': data['index'] + 1,
+                'pending_events': data['pending_events'],
+                'average_mining_time': data['average_mining_time'],
+                'last_mining_time': data['mining_time']
+            })
+            loop.call_soon_threadsafe(self.broadcaster.publish, 'blockchain_updates', 'block_mined', data)
+        else:
+            return
+        loop.call_soon_threadsafe(self.broadcaster.publish_snapshot, 'blockchain_updates',
+                                  'blockchain_stats', dict(self.stats))
+
+blockchain_broadcaster = CoalescingBroadcaster(interval=getattr(settings, 'BLOCKCHAIN_BROADCAST_INTERVAL', 0.25))
+blockchain_publisher = ChannelLayerPublisher(blockchain_broadcaster)
+
+def start_process_publisher():
+    """Publisher for a logger running outside the ASGI server, such as main.py.
+    
+    No consumer ever binds a loop in that process, so the broadcaster runs on
+    a private event loop on a daemon thread and sends through the shared
+    channel layer. Dashboards only receive these updates when the layer
+    crosses processes (CHANNEL_REDIS_URL).
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='blockchain-publisher', daemon=True).start()
+    publisher = ChannelLayerPublisher(CoalescingBroadcaster(interval=blockchain_broadcaster.interval))
+    publisher.bind(loop)
+    return publisher
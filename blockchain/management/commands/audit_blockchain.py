@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from blockchain_logger import get_blockchain_logger
+
+
+class Command(BaseCommand):
+    help = 'Verify every block of the blockchain from SQLite, sharding block ranges across worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (defaults to CPU count)')
+        parser.add_argument('--shard-size', type=int, default=500, help='Blocks verified per worker task')
+
+    def handle(self, *args, **options):
+        logger = get_blockchain_logger()
+
+        def progress(checked_blocks, total_blocks):
+            self.stdout.write(f'Verified {checked_blocks}/{total_blocks} blocks')
+
+        report = logger.audit_chain(workers=options['workers'], shard_size=options['shard_size'], progress=progress)
+        if report['verified']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Blockchain verified: {report['total_blocks']} blocks in {report['elapsed_seconds']}s "
+                f"using {report['workers']} workers"
+            ))
+        else:
+            failure = report['first_failure']
+            self.stdout.write(self.style.ERROR(f"Blockchain audit failed at block {failure['index']}: {failure['reason']}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from blockchain_logger import get_blockchain_logger
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hourly and daily blockchain event rollup tables from the events table'
+
+    def handle(self, *args, **options):
+        logger = get_blockchain_logger()
+        buckets = logger.rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {buckets} rollup buckets in {logger.db_path}'))
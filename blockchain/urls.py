@@ -5,7 +5,10 @@ from .views import (
     BlockchainAddEventView,
     BlockchainDashboardView,
     BlockchainAPIView,
-    BlockExplorerView
+    BlockExplorerView,
+    BlockchainExportView,
+    EventInclusionProofView,
+    BlockchainAuditView
 )
 
 app_name = 'blockchain'
@@ -17,4 +20,7 @@ urlpatterns = [
     path('add/', BlockchainAddEventView.as_view(), name='blockchain-add-event'),
     path('api/', BlockchainAPIView.as_view(), name='blockchain-api'),
     path('blocks/', BlockExplorerView.as_view(), name='block-explorer'),
+    path('export/', BlockchainExportView.as_view(), name='blockchain-export'),
+    path('proof/<str:event_id>/', EventInclusionProofView.as_view(), name='event-inclusion-proof'),
+    path('audit/', BlockchainAuditView.as_view(), name='blockchain-audit'),
 ] 
\ No newline at end of file
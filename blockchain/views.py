@@ -1,16 +1,39 @@
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views import View
-from blockchain_logger import get_blockchain_logger, CheatingEvent
+from blockchain_logger import (
+    get_blockchain_logger, CheatingEvent, compress_chunks, EXPORT_FORMATS, EXPORT_COMPRESSIONS
+)
 from django.shortcuts import render
 from django.urls import reverse
 from django.http import HttpResponseRedirect
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.utils.decorators import method_decorator
 from .forms import BlockchainEventForm
 import uuid
 import time
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+def streaming_content(request, chunks):
+    """Iterator for a StreamingHttpResponse that streams under either server.
+
+    Under ASGI Django buffers a synchronous iterator in full before sending
+    it, so each chunk is pulled with sync_to_async instead. Thread-sensitive
+    calls keep every next() on the request's thread, which the generators'
+    open SQLite connections require. Under WSGI the iterator is returned as is.
+    """
+    if not isinstance(request, ASGIRequest):
+        return chunks
+    async def stream():
+        while True:
+            chunk = await sync_to_async(next)(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    return stream()
 
 @method_decorator(login_required, name='dispatch')
 class BlockchainLogsAPIView(View):
@@ -79,32 +102,24 @@ class BlockchainDashboardView(View):
         # Get recent events
         recent_events = logger.get_events_by_type('all', limit=10)
         
-        # Get events by severity for the last 7 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        
-        # Get events by type
-        events_by_type = {}
-        events_by_severity = {}
-        
-        all_events = logger.get_events_by_type('all', limit=1000)
-        for event in all_events:
-            event_date = datetime.fromtimestamp(event.timestamp)
-            if start_date <= event_date <= end_date:
-                # Count by type
-                events_by_type[event.event_type] = events_by_type.get(event.event_type, 0) + 1
-                # Count by severity
-                events_by_severity[event.severity] = events_by_severity.get(event.severity, 0) + 1
+        # Get events by type and severity for the last 7 days from the daily rollups
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=6)
+        weekly = logger.get_rollup_statistics(since=start_date.timestamp(), granularity='day')
+        events_by_type = weekly['events_by_type']
+        events_by_severity = weekly['events_by_severity']
         
         # Get daily event counts for the last 7 days
+        daily_counts = {
+            datetime.fromtimestamp(bucket['bucket_start'], timezone.utc).date(): bucket['count']
+            for bucket in weekly['buckets']
+        }
         daily_events = []
         for i in range(7):
             date = start_date + timedelta(days=i)
-            count = sum(1 for event in all_events 
-                       if datetime.fromtimestamp(event.timestamp).date() == date.date())
             daily_events.append({
                 'date': date.strftime('%Y-%m-%d'),
-                'count': count
+                'count': daily_counts.get(date.date(), 0)
             })
         
         context = {
@@ -188,4 +203,97 @@ class BlockExplorerView(View):
         return render(request, 'blockchain/block_explorer.html', {
             'blocks': blocks,
             'total_blocks': len(blocks)
-        }) 
\ No newline at end of file
+        }) 
+
+@method_decorator(login_required, name='dispatch')
+class BlockchainExportView(View):
+    content_types = {
+        'json': 'application/json',
+        'ndjson': 'application/x-ndjson',
+    }
+    file_suffixes = {
+        'gzip': '.gz',
+        'zstd': '.zst',
+    }
+
+    def get(self, request):
+        return self.stream_export(request, request.GET)
+
+    def post(self, request):
+        return self.stream_export(request, request.POST)
+
+    def stream_export(self, request, params):
+        fmt = params.get('format', 'ndjson')
+        compression = params.get('compression') or None
+        if fmt not in EXPORT_FORMATS:
+            return JsonResponse({'error': f'Unsupported format: {fmt}'}, status=400)
+        if compression is not None and compression not in EXPORT_COMPRESSIONS:
+            return JsonResponse({'error': f'Unsupported compression: {compression}'}, status=400)
+        
+        try:
+            block_range = {
+                'start_index': int(params['start_block']) if params.get('start_block') else None,
+                'end_index': int(params['end_block']) if params.get('end_block') else None,
+                'start_time': float(params['start_time']) if params.get('start_time') else None,
+                'end_time': float(params['end_time']) if params.get('end_time') else None,
+            }
+            # Build the first compressed chunk eagerly so configuration errors
+            # (e.g. zstd requested but not installed) surface as a 400
+            stream = compress_chunks(get_blockchain_logger().iter_export_chunks(fmt, **block_range), compression)
+            first_chunk = next(stream)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        
+        def chunks():
+            yield first_chunk
+            yield from stream
+        
+        content = streaming_content(request, chunks())
+        if compression is None:
+            response = StreamingHttpResponse(content, content_type=self.content_types[fmt])
+        else:
+            response = StreamingHttpResponse(content, content_type='application/octet-stream')
+        filename = f"blockchain_export_{int(time.time())}.{fmt}{self.file_suffixes.get(compression, '')}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+@method_decorator(login_required, name='dispatch')
+class EventInclusionProofView(View):
+    def get(self, request, event_id):
+        logger = get_blockchain_logger()
+        proof = logger.get_inclusion_proof(event_id)
+        if proof is None:
+            return JsonResponse({'error': 'Event not found in a sealed block'}, status=404)
+        return JsonResponse({
+            'proof': proof,
+            'verified': logger.verify_event_inclusion(proof)
+        })
+
+    def post(self, request, event_id):
+        # Verify a proof previously handed out to a reviewer
+        try:
+            proof = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'Invalid JSON format'}, status=400)
+        if not isinstance(proof, dict) or proof.get('event_id') != event_id:
+            return JsonResponse({'error': 'Proof does not belong to this event'}, status=400)
+        return JsonResponse({'verified': get_blockchain_logger().verify_event_inclusion(proof)})
+
+
+# An audit occupies a process per core until it finishes, so only staff may start one
+@method_decorator(staff_member_required, name='dispatch')
+class BlockchainAuditView(View):
+    def post(self, request):
+        try:
+            workers = int(request.POST['workers']) if request.POST.get('workers') else None
+            shard_size = int(request.POST.get('shard_size', 500))
+            if shard_size < 1 or (workers is not None and workers < 1):
+                raise ValueError('workers and shard_size must be positive')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        
+        # One NDJSON line per finished shard, then the final report
+        updates = get_blockchain_logger().iter_audit(workers=workers, shard_size=shard_size)
+        lines = (json.dumps(update) + '\n' for update in updates)
+        return StreamingHttpResponse(streaming_content(request, lines), content_type='application/x-ndjson')
@@ -95,7 +95,11 @@ class BlockchainDashboard(tk.Tk):
             self.status_var.set(f"Error verifying chain: {e}")
 
     def export_chain(self):
-        filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        filepath = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[
+            ("JSON Files", "*.json"),
+            ("NDJSON Files", "*.ndjson"),
+            ("Gzipped NDJSON Files", "*.ndjson.gz"),
+            ("Zstandard NDJSON Files", "*.ndjson.zst")])
         if not filepath:
             return
         try:
@@ -1,7 +1,15 @@
+import json
+import threading
 import time
 import uuid
+from concurrent.futures import Future
 from typing import Dict, Any, Optional
 from blockchain_logger import CheatingEvent, initialize_blockchain_logger, get_blockchain_logger
+import evidence_writer
+
+def _resolved(evidence):
+    # A Future from the evidence writer resolves to the stored path, or None if it could not be written
+    return evidence.result() if isinstance(evidence, Future) else evidence
 
 class BlockchainIntegration:
     """Integration layer for blockchain logging in the cheating surveillance system"""
@@ -27,11 +35,11 @@ class BlockchainIntegration:
             description=description,
             confidence_score=confidence,
             screenshot_path=screenshot_path,
-            metadata=metadata or {},
+            metadata=dict(metadata or {}),
             session_id=self.session_id
         )
         
-        return self.logger.log_event(event)
+        return self._log_with_evidence(event)
     
     def log_eye_misalignment(self, direction: str, confidence: float,
                             screenshot_path: Optional[str] = None,
@@ -48,11 +56,11 @@ class BlockchainIntegration:
             description=description,
             confidence_score=confidence,
             screenshot_path=screenshot_path,
-            metadata=metadata or {},
+            metadata=dict(metadata or {}),
             session_id=self.session_id
         )
         
-        return self.logger.log_event(event)
+        return self._log_with_evidence(event)
     
     def log_mobile_detection(self, confidence: float,
                            screenshot_path: Optional[str] = None,
@@ -69,11 +77,11 @@ class BlockchainIntegration:
             description=description,
             confidence_score=confidence,
             screenshot_path=screenshot_path,
-            metadata=metadata or {},
+            metadata=dict(metadata or {}),
             session_id=self.session_id
         )
         
-        return self.logger.log_event(event)
+        return self._log_with_evidence(event)
     
     def log_lip_movement(self, lip_state: str, is_whispering: bool, confidence: float,
                         screenshot_path: Optional[str] = None,
@@ -90,11 +98,11 @@ class BlockchainIntegration:
             description=description,
             confidence_score=confidence,
             screenshot_path=screenshot_path,
-            metadata=metadata or {},
+            metadata=dict(metadata or {}),
             session_id=self.session_id
         )
         
-        return self.logger.log_event(event)
+        return self._log_with_evidence(event)
     
     def log_emotion_detection(self, emotion: str, stress_detected: bool, 
                             fear_detected: bool, overconfidence_detected: bool,
@@ -124,11 +132,11 @@ class BlockchainIntegration:
             description=description,
             confidence_score=confidence,
             screenshot_path=screenshot_path,
-            metadata=metadata or {},
+            metadata=dict(metadata or {}),
             session_id=self.session_id
         )
         
-        return self.logger.log_event(event)
+        return self._log_with_evidence(event)
     
     def log_custom_event(self, event_type: str, description: str, severity: str,
                         confidence: float, screenshot_path: Optional[str] = None,
@@ -142,11 +150,52 @@ class BlockchainIntegration:
             description=description,
             confidence_score=confidence,
             screenshot_path=screenshot_path,
-            metadata=metadata or {},
+            metadata=dict(metadata or {}),
             session_id=self.session_id
         )
         
-        return self.logger.log_event(event)
+        return self._log_with_evidence(event)
+    
+    def _log_with_evidence(self, event: CheatingEvent) -> bool:
+        """Log the event, waiting (without blocking the caller) for evidence still being written.
+
+        The evidence store names files by the hash of their encoded bytes,
+        which a writer thread only knows once it has encoded them, so a
+        screenshot or clip may arrive as a Future. The event is logged from
+        the writer's callback once every one has resolved; True then means
+        it was queued rather than logged.
+        """
+        pending = [evidence for evidence in (event.screenshot_path, event.metadata.get('clip_path'))
+                   if isinstance(evidence, Future)]
+        if not pending:
+            return self.logger.log_event(self._with_evidence_hashes(event))
+        remaining = [len(pending)]
+        lock = threading.Lock()
+        def written(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self.logger.log_event(self._with_evidence_hashes(event))
+        for evidence in pending:
+            evidence.add_done_callback(written)
+        return True
+    
+    def _with_evidence_hashes(self, event: CheatingEvent) -> CheatingEvent:
+        """Reference content-addressed evidence by hash so the chain commits to the files themselves"""
+        screenshot = _resolved(event.screenshot_path)
+        clip = _resolved(event.metadata.get('clip_path'))
+        event.screenshot_path = str(screenshot) if screenshot is not None else None
+        if 'clip_path' in event.metadata:
+            event.metadata['clip_path'] = str(clip) if clip is not None else None
+        for kind, path in (('screenshot', screenshot), ('clip', clip)):
+            sha256 = getattr(path, 'sha256', None)
+            if sha256:
+                event.metadata[f'{kind}_sha256'] = sha256
+            # The stored file is an earlier, similar capture rather than this one
+            if getattr(path, 'near_duplicate', False):
+                event.metadata[f'{kind}_near_duplicate'] = True
+        return event
     
     def _determine_severity(self, confidence: float) -> str:
         """Determine severity based on confidence score"""
@@ -162,29 +211,19 @@ class BlockchainIntegration:
     def get_session_statistics(self) -> Dict[str, Any]:
         """Get statistics for current session"""
         try:
-            stats = self.logger.get_statistics()
-            # Filter for current session
-            session_events = self.logger.get_events_by_type("all", limit=1000)  # Get all events
-            session_events = [e for e in session_events if e.session_id == self.session_id]
+            stats = self.logger.get_session_statistics(self.session_id)
+            if not stats:
+                return {}
             
-            session_stats = {
+            return {
                 'session_id': self.session_id,
-                'total_session_events': len(session_events),
-                'events_by_type': {},
-                'events_by_severity': {},
-                'session_start_time': min([e.timestamp for e in session_events]) if session_events else None,
-                'session_end_time': max([e.timestamp for e in session_events]) if session_events else None
+                'total_session_events': stats['total_events'],
+                'events_by_type': stats['events_by_type'],
+                'events_by_severity': stats['events_by_severity'],
+                'session_start_time': stats['first_timestamp'],
+                'session_end_time': stats['last_timestamp']
             }
             
-            # Count events by type and severity for this session
-            for event in session_events:
-                session_stats['events_by_type'][event.event_type] = \
-                    session_stats['events_by_type'].get(event.event_type, 0) + 1
-                session_stats['events_by_severity'][event.severity] = \
-                    session_stats['events_by_severity'].get(event.severity, 0) + 1
-            
-            return session_stats
-            
         except Exception as e:
             print(f"Error getting session statistics: {e}")
             return {}
@@ -192,32 +231,31 @@ class BlockchainIntegration:
     def export_session_logs(self, filepath: str) -> bool:
         """Export session logs to JSON file"""
         try:
-            session_events = self.logger.get_events_by_type("all", limit=1000)
-            session_events = [e for e in session_events if e.session_id == self.session_id]
-            
-            export_data = {
+            total_events = self.logger.get_session_statistics(self.session_id).get('total_events', 0)
+            header = {
                 'session_id': self.session_id,
                 'export_timestamp': time.time(),
-                'total_events': len(session_events),
-                'events': []
+                'total_events': total_events
             }
             
-            for event in session_events:
-                event_data = {
-                    'event_id': event.event_id,
-                    'timestamp': event.timestamp,
-                    'event_type': event.event_type,
-                    'severity': event.severity,
-                    'description': event.description,
-                    'confidence_score': event.confidence_score,
-                    'screenshot_path': event.screenshot_path,
-                    'metadata': event.metadata
-                }
-                export_data['events'].append(event_data)
-            
-            import json
+            # Stream events straight from the session index instead of building the export in memory
             with open(filepath, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+                f.write(json.dumps(header, default=str)[:-1] + ', "events": [')
+                separator = ''
+                for event in self.logger.iter_events_by_session(self.session_id):
+                    event_data = {
+                        'event_id': event.event_id,
+                        'timestamp': event.timestamp,
+                        'event_type': event.event_type,
+                        'severity': event.severity,
+                        'description': event.description,
+                        'confidence_score': event.confidence_score,
+                        'screenshot_path': event.screenshot_path,
+                        'metadata': event.metadata
+                    }
+                    f.write(separator + json.dumps(event_data, default=str))
+                    separator = ', '
+                f.write(']}\n')
             
             print(f"Session logs exported to {filepath}")
             return True
@@ -228,6 +266,10 @@ class BlockchainIntegration:
     
     def flush_pending_events(self):
         """Force mining of pending events"""
+        # Events waiting on evidence are logged by the writer's callbacks, so let queued writes finish first
+        writer = evidence_writer.evidence_writer
+        if writer is not None:
+            writer.flush()
         self.logger.flush_pending_events()
     
     def verify_chain_integrity(self) -> bool:
@@ -236,7 +278,12 @@ class BlockchainIntegration:
     
     def cleanup_old_data(self, max_age_days: int = 30):
         """Clean up old screenshot files"""
-        self.logger.cleanup_old_screenshots(max_age_days)
+        writer = evidence_writer.evidence_writer
+        if writer is not None and writer.store is not None:
+            # Retention runs off the evidence index instead of scanning the events table
+            writer.store.cleanup(max_age_days)
+        else:
+            self.logger.cleanup_old_screenshots(max_age_days)
 
 # Global blockchain integration instance
 blockchain_integration = None
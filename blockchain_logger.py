@@ -4,20 +4,95 @@ import time
 import os
 import threading
 import sqlite3
+import glob
+import re
+import zlib
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Tuple
 from dataclasses import dataclass, asdict, field
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, ed25519
 from cryptography.hazmat.primitives import serialization
+from cryptography.exceptions import InvalidSignature
 import base64
 import uuid
 import logging
+import multiprocessing
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import metrics
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+ROLLUP_GRANULARITIES = {
+    'hour': 3600,
+    'day': 86400
+}
+
+SIGNATURE_ALGORITHMS = ('rsa-pss', 'ed25519')
+# Blocks sealed before the difficulty column existed were all mined at this difficulty
+LEGACY_DIFFICULTY = 4
+
+@dataclass
+class SealingPolicy:
+    max_events: int = 10
+    max_latency: Optional[float] = None
+    difficulty: int = 4
+    signature_algorithm: str = 'rsa-pss'
+    def __post_init__(self):
+        if self.max_events < 1:
+            raise ValueError("max_events must be at least 1")
+        if self.max_latency is not None and self.max_latency <= 0:
+            raise ValueError("max_latency must be positive")
+        if self.difficulty < 0:
+            raise ValueError("difficulty must not be negative")
+        if self.signature_algorithm not in SIGNATURE_ALGORITHMS:
+            raise ValueError(f"Unknown signature algorithm: {self.signature_algorithm}")
+    def should_seal(self, pending_count: int, pending_since: Optional[float], now: float) -> bool:
+        if pending_count >= self.max_events:
+            return True
+        return (self.max_latency is not None and pending_since is not None
+                and now - pending_since >= self.max_latency)
+
+EXPORT_FORMATS = ('json', 'ndjson')
+EXPORT_COMPRESSIONS = ('gzip', 'zstd')
+
+def infer_export_options(filepath: str) -> Tuple[str, Optional[str]]:
+    suffixes = Path(filepath).suffixes
+    compression = {'.gz': 'gzip', '.zst': 'zstd'}.get(suffixes[-1] if suffixes else '')
+    fmt = 'ndjson' if '.ndjson' in suffixes or '.jsonl' in suffixes else 'json'
+    return fmt, compression
+
+def compress_chunks(chunks: Iterable[str], compression: Optional[str] = None) -> Iterator[bytes]:
+    if compression is None:
+        for chunk in chunks:
+            yield chunk.encode()
+        return
+    if compression == 'gzip':
+        compressor = zlib.compressobj(wbits=31)
+    elif compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        raise ValueError(f"Unknown export compression: {compression}")
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
 @dataclass
 class CheatingEvent:
     event_id: str
@@ -42,6 +117,9 @@ class Block:
     previous_hash: str
     merkle_root: str
     nonce: int = 0
+    difficulty: int = 4
+    signature: Optional[str] = None
+    signature_algorithm: Optional[str] = None
     def calculate_hash(self) -> str:
         block_string = json.dumps({
             'index': self.index,
@@ -52,42 +130,375 @@ class Block:
             'nonce': self.nonce
         }, sort_keys=True, default=str)
         return hashlib.sha256(block_string.encode()).hexdigest()
+    def signing_payload(self) -> bytes:
+        block_data = {
+            'index': self.index,
+            'timestamp': self.timestamp,
+            'merkle_root': self.merkle_root,
+            'previous_hash': self.previous_hash,
+            'nonce': self.nonce
+        }
+        # Blocks sealed before sealing policies existed were signed without these fields
+        if self.signature_algorithm is not None:
+            block_data['difficulty'] = self.difficulty
+            block_data['signature_algorithm'] = self.signature_algorithm
+        return json.dumps(block_data, sort_keys=True).encode()
+
+def _event_from_row(event_data) -> CheatingEvent:
+    return CheatingEvent(
+        event_id=event_data[0],
+        timestamp=event_data[2],
+        event_type=event_data[3],
+        severity=event_data[4],
+        description=event_data[5],
+        confidence_score=event_data[6],
+        screenshot_path=event_data[7],
+        metadata=json.loads(event_data[8]) if event_data[8] else {},
+        session_id=event_data[9],
+        user_id=event_data[10]
+    )
 
 class MerkleTree:
-    def __init__(self, events: List[CheatingEvent]):
+    def __init__(self, events: List[CheatingEvent], levels: Optional[List[List[str]]] = None):
         self.events = events
-        self.root = self._build_tree()
+        self.levels = levels if levels is not None else self._build_levels()
+        self.root = self.levels[-1][0]
     def _build_tree(self) -> str:
+        return self._build_levels()[-1][0]
+    def _build_levels(self) -> List[List[str]]:
         if not self.events:
-            return hashlib.sha256("empty".encode()).hexdigest()
+            return [[hashlib.sha256("empty".encode()).hexdigest()]]
         event_hashes = [self._hash_event(event) for event in self.events]
+        levels = [event_hashes]
         while len(event_hashes) > 1:
             if len(event_hashes) % 2 == 1:
-                event_hashes.append(event_hashes[-1])
+                event_hashes = event_hashes + [event_hashes[-1]]
             new_level = []
             for i in range(0, len(event_hashes), 2):
                 combined = event_hashes[i] + event_hashes[i + 1]
                 new_level.append(hashlib.sha256(combined.encode()).hexdigest())
             event_hashes = new_level
-        return event_hashes[0] if event_hashes else hashlib.sha256("empty".encode()).hexdigest()
+            levels.append(event_hashes)
+        return levels
     def _hash_event(self, event: CheatingEvent) -> str:
-        event_string = json.dumps(asdict(event), sort_keys=True, default=str)
-        return hashlib.sha256(event_string.encode()).hexdigest()
+        return hash_event(asdict(event))
+    def get_proof(self, leaf_index: int) -> List[Dict[str, str]]:
+        proof = []
+        for level in self.levels[:-1]:
+            sibling_index = leaf_index ^ 1
+            sibling = level[sibling_index] if sibling_index < len(level) else level[leaf_index]
+            proof.append({'hash': sibling, 'position': 'left' if leaf_index % 2 else 'right'})
+            leaf_index //= 2
+        return proof
+
+def hash_event(event_data: Dict[str, Any]) -> str:
+    event_string = json.dumps(event_data, sort_keys=True, default=str)
+    return hashlib.sha256(event_string.encode()).hexdigest()
+
+def verify_merkle_proof(leaf_hash: str, proof: List[Dict[str, str]], merkle_root: str) -> bool:
+    current = leaf_hash
+    for step in proof:
+        if step['position'] == 'left':
+            combined = step['hash'] + current
+        else:
+            combined = current + step['hash']
+        current = hashlib.sha256(combined.encode()).hexdigest()
+    return current == merkle_root
+
+def verify_inclusion_proof(inclusion_proof: Dict[str, Any]) -> bool:
+    # Otherwise a valid proof for one event could be presented under another event's id
+    if inclusion_proof['event'].get('event_id') != inclusion_proof['event_id']:
+        return False
+    leaf_hash = hash_event(inclusion_proof['event'])
+    if leaf_hash != inclusion_proof['leaf_hash']:
+        return False
+    # The sibling positions spell out the leaf's index bit by bit, lowest level first
+    leaf_index, proof = inclusion_proof['leaf_index'], inclusion_proof['proof']
+    if not isinstance(leaf_index, int) or isinstance(leaf_index, bool) or not 0 <= leaf_index < 2 ** len(proof):
+        return False
+    for level, step in enumerate(proof):
+        if step['position'] != ('left' if (leaf_index >> level) & 1 else 'right'):
+            return False
+    return verify_merkle_proof(leaf_hash, proof, inclusion_proof['merkle_root'])
+
+def verify_block_signature(block: Block, public_key, ed25519_public_key=None) -> bool:
+    if not block.signature:
+        return False
+    try:
+        signature = base64.b64decode(block.signature)
+        if block.signature_algorithm == 'ed25519':
+            if ed25519_public_key is None:
+                logger.error(f"No Ed25519 public key available to verify block {block.index}")
+                return False
+            ed25519_public_key.verify(signature, block.signing_payload())
+        else:
+            public_key.verify(
+                signature,
+                block.signing_payload(),
+                padding.PSS(
+                    mgf=padding.MGF1(hashes.SHA256()),
+                    salt_length=padding.PSS.MAX_LENGTH
+                ),
+                hashes.SHA256()
+            )
+        return True
+    except (InvalidSignature, ValueError):
+        return False
+
+def _audit_block(block: Block, stored_hash: str, public_key, ed25519_public_key) -> Optional[str]:
+    block_hash = block.calculate_hash()
+    if block_hash != stored_hash:
+        return "stored hash does not match block contents"
+    if block.index > 0 and not block_hash.startswith("0" * block.difficulty):
+        return "invalid proof-of-work"
+    if block.merkle_root != MerkleTree(block.events).root:
+        return "invalid Merkle root"
+    # Blocks sealed without proof-of-work rely on their signature alone
+    if (block.difficulty == 0 or block.signature_algorithm is not None) \
+            and not verify_block_signature(block, public_key, ed25519_public_key):
+        return "invalid signature"
+    return None
+
+def _load_public_key(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return serialization.load_pem_public_key(f.read())
+
+def _audit_block_range(db_path: str, start_index: int, end_index: int, public_key_path: str,
+                       ed25519_public_key_path: str) -> Dict[str, Any]:
+    # Runs in a worker process: streams its shard straight from SQLite
+    public_key = _load_public_key(public_key_path)
+    ed25519_public_key = _load_public_key(ed25519_public_key_path)
+    result = {'start_index': start_index, 'end_index': end_index, 'checked_blocks': 0, 'failure': None}
+    with sqlite3.connect(db_path) as conn:
+        blocks_cursor = conn.cursor()
+        events_cursor = conn.cursor()
+        blocks_cursor.execute('''SELECT block_index, timestamp, previous_hash, merkle_root, nonce, hash,
+            signature, difficulty, signature_algorithm FROM blocks
+            WHERE block_index BETWEEN ? AND ? ORDER BY block_index''', (start_index, end_index))
+        for (index, timestamp, previous_hash, merkle_root, nonce, block_hash,
+             signature, difficulty, signature_algorithm) in blocks_cursor:
+            events_cursor.execute('SELECT * FROM events WHERE block_index = ? ORDER BY timestamp', (index,))
+            block = Block(
+                index=index,
+                timestamp=timestamp,
+                events=[_event_from_row(event_data) for event_data in events_cursor.fetchall()],
+                previous_hash=previous_hash,
+                merkle_root=merkle_root,
+                nonce=nonce,
+                difficulty=LEGACY_DIFFICULTY if difficulty is None else difficulty,
+                signature=signature,
+                signature_algorithm=signature_algorithm
+            )
+            result['checked_blocks'] += 1
+            reason = _audit_block(block, block_hash, public_key, ed25519_public_key)
+            if reason is not None:
+                result['failure'] = {'index': index, 'reason': reason}
+                break
+    return result
+
+class StatisticsCache:
+    def __init__(self, backend=None, ttl: float = 60.0, key_prefix: str = 'blockchain_stats'):
+        # backend is optional and only needs get/set/incr, e.g. a Django cache shared between workers
+        self.backend = backend
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self.generation = 0
+        self.entries = {}
+        self.key_locks = {}
+        self.lock = threading.Lock()
+    def get_or_compute(self, key: str, compute):
+        generation = self._current_generation()
+        value = self._get(key, generation)
+        if value is not None:
+            return value
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        # Single flight: concurrent misses for the same key wait for one computation
+        with key_lock:
+            value = self._get(key, generation)
+            if value is None:
+                value = compute()
+                self._set(key, value, generation)
+            return value
+    def invalidate(self):
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+        if self.backend is not None:
+            generation_key = f"{self.key_prefix}:generation"
+            try:
+                self.backend.incr(generation_key)
+            except ValueError:
+                self.backend.set(generation_key, 1, None)
+    def _current_generation(self) -> int:
+        if self.backend is not None:
+            return self.backend.get(f"{self.key_prefix}:generation", 0)
+        return self.generation
+    def _get(self, key: str, generation: int):
+        if self.backend is not None:
+            return self.backend.get(f"{self.key_prefix}:{generation}:{key}")
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None and entry[0] > time.time():
+            return entry[1]
+        return None
+    def _set(self, key: str, value, generation: int):
+        if self.backend is not None:
+            self.backend.set(f"{self.key_prefix}:{generation}:{key}", value, self.ttl)
+            return
+        now = time.time()
+        with self.lock:
+            # A block sealed while computing makes the value stale before it is stored
+            if generation != self.generation:
+                return
+            self.entries = {k: entry for k, entry in self.entries.items() if entry[0] > now}
+            self.entries[key] = (now + self.ttl, value)
+
+class PendingEventJournal:
+    def __init__(self, base_path: str, fsync_interval: Optional[float] = 0.05):
+        if fsync_interval is not None and fsync_interval < 0:
+            raise ValueError("fsync_interval must not be negative")
+        # Several processes (ASGI workers, Celery, main.py) may open a logger on the same database; each
+        # journals to its own file, so none truncates or replays events another live process has not sealed
+        self.base_path = base_path
+        self.path = f"{base_path}.{os.getpid()}"
+        self.fsync_interval = fsync_interval
+        self.lock = threading.Lock()
+        self._file = open(self.path, 'ab')
+        if not _lock_exclusive(self._file):
+            self._file.close()
+            raise RuntimeError(f"Pending event journal {self.path} is locked by another process")
+        self._dirty = False
+        self._closed = threading.Event()
+        self._flusher = None
+        if fsync_interval:
+            # Group commit: one fsync covers every record appended since the last one
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+    def recover(self) -> List[CheatingEvent]:
+        with self.lock:
+            with open(self.path, 'rb') as f:
+                events, valid_length = _read_journal(f)
+            if valid_length < os.path.getsize(self.path):
+                self._file.truncate(valid_length)
+                os.fsync(self._file.fileno())
+        return events
+    def adopt_orphans(self) -> List[CheatingEvent]:
+        # Without flock a live writer's journal cannot be told apart from one left by a dead process
+        if fcntl is None:
+            return []
+        pattern = re.compile(re.escape(self.base_path) + r'(\.\d+)?')
+        adopted = []
+        for path in sorted(glob.glob(glob.escape(self.base_path) + '*')):
+            if path == self.path or not pattern.fullmatch(path):
+                continue
+            try:
+                f = open(path, 'rb')
+            except FileNotFoundError:
+                continue
+            with f:
+                # A live writer holds its lock; a journal another process adopted meanwhile is already unlinked
+                if not _lock_exclusive(f) or os.fstat(f.fileno()).st_nlink == 0:
+                    continue
+                events, _ = _read_journal(f)
+                if events:
+                    # Durable in this process's journal before the orphan is removed
+                    self._append_records(events, fsync=True)
+                    logger.info(f"Adopted {len(events)} pending events from orphaned journal {path}")
+                os.unlink(path)
+            adopted.extend(events)
+        return adopted
+    def append(self, event: CheatingEvent):
+        self._append_records([event], fsync=self.fsync_interval == 0)
+    def _append_records(self, events: List[CheatingEvent], fsync: bool):
+        records = b''.join(json.dumps(asdict(event), default=str).encode() + b'\n' for event in events)
+        with self.lock:
+            self._file.write(records)
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+            else:
+                self._dirty = True
+    def sync(self):
+        with self.lock:
+            if self._dirty and not self._file.closed:
+                os.fsync(self._file.fileno())
+                self._dirty = False
+    def _flush_loop(self):
+        while not self._closed.wait(self.fsync_interval):
+            try:
+                self.sync()
+            except OSError as e:
+                logger.error(f"Failed to sync pending event journal: {e}")
+    def reset(self):
+        with self.lock:
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._dirty = False
+    def close(self):
+        self._closed.set()
+        self.sync()
+        with self.lock:
+            if self._file.closed:
+                return
+            # Nothing left to recover; the file is removed while still locked so no process adopts it
+            if os.fstat(self._file.fileno()).st_size == 0:
+                os.unlink(self.path)
+            self._file.close()
+
+def _lock_exclusive(f) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def _read_journal(f) -> Tuple[List[CheatingEvent], int]:
+    events = []
+    valid_length = 0
+    for line in f:
+        try:
+            if not line.endswith(b'\n'):
+                raise ValueError("incomplete record")
+            events.append(CheatingEvent(**json.loads(line)))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Discarding torn journal tail at offset {valid_length}: {e}")
+            break
+        valid_length += len(line)
+    return events, valid_length
 
 class BlockchainLogger:
     def __init__(self, db_path: str = "blockchain_logs.db", 
                  private_key_path: str = "private_key.pem",
                  public_key_path: str = "public_key.pem",
-                 difficulty: int = 4):
+                 difficulty: int = 4,
+                 sealing_policy: Optional[SealingPolicy] = None,
+                 ed25519_private_key_path: str = "ed25519_private_key.pem",
+                 ed25519_public_key_path: str = "ed25519_public_key.pem",
+                 journal_path: Optional[str] = None,
+                 journal_fsync_interval: Optional[float] = 0.05,
+                 statistics_cache: Optional[StatisticsCache] = None):
         self.db_path = db_path
         self.private_key_path = private_key_path
         self.public_key_path = public_key_path
-        self.difficulty = difficulty
-        self.target = "0" * difficulty
+        self.ed25519_private_key_path = ed25519_private_key_path
+        self.ed25519_public_key_path = ed25519_public_key_path
+        self.sealing_policy = sealing_policy or SealingPolicy(difficulty=difficulty)
+        self.difficulty = self.sealing_policy.difficulty
+        self.target = "0" * self.difficulty
         self._init_database()
         self._init_cryptographic_keys()
         self.chain = self._load_chain()
+        self._verified_blocks = 0
         self.pending_events = []
+        self.pending_since = None
+        self._seal_timer = None
+        self.listeners = []
+        self.statistics_cache = statistics_cache or StatisticsCache()
         self.lock = threading.RLock()
         self.metrics = {
             'total_events': 0,
@@ -95,6 +506,9 @@ class BlockchainLogger:
             'average_mining_time': 0.0,
             'last_mining_time': 0.0
         }
+        self.journal = PendingEventJournal(journal_path or os.path.splitext(db_path)[0] + '_pending.journal',
+                                           journal_fsync_interval)
+        self._replay_journal()
         logger.info("Blockchain Logger initialized successfully")
     def _init_database(self):
         try:
@@ -107,7 +521,14 @@ class BlockchainLogger:
                         merkle_root TEXT,
                         nonce INTEGER,
                         hash TEXT UNIQUE,
-                        signature TEXT)''')
+                        signature TEXT,
+                        difficulty INTEGER,
+                        signature_algorithm TEXT)''')
+                cursor.execute('PRAGMA table_info(blocks)')
+                block_columns = {column[1] for column in cursor.fetchall()}
+                for column, column_type in (('difficulty', 'INTEGER'), ('signature_algorithm', 'TEXT')):
+                    if column not in block_columns:
+                        cursor.execute(f'ALTER TABLE blocks ADD COLUMN {column} {column_type}')
                 cursor.execute('''CREATE TABLE IF NOT EXISTS events (
                         event_id TEXT PRIMARY KEY,
                         block_index INTEGER,
@@ -125,6 +546,23 @@ class BlockchainLogger:
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_type ON events (event_type)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_severity ON events (severity)')
                 cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_session ON events (session_id)')
+                cursor.execute('''CREATE TABLE IF NOT EXISTS event_rollups (
+                        granularity TEXT,
+                        bucket_start INTEGER,
+                        event_type TEXT,
+                        severity TEXT,
+                        session_id TEXT,
+                        count INTEGER,
+                        PRIMARY KEY (granularity, bucket_start, event_type, severity, session_id))''')
+                cursor.execute('''CREATE TABLE IF NOT EXISTS merkle_levels (
+                        block_index INTEGER PRIMARY KEY,
+                        levels TEXT,
+                        FOREIGN KEY (block_index) REFERENCES blocks (block_index))''')
+                cursor.execute('SELECT EXISTS (SELECT 1 FROM event_rollups)')
+                has_rollups = cursor.fetchone()[0]
+                cursor.execute('SELECT EXISTS (SELECT 1 FROM events)')
+                if cursor.fetchone()[0] and not has_rollups:
+                    self._rebuild_rollups(cursor)
                 conn.commit()
                 logger.info("Database initialized successfully")
         except Exception as e:
@@ -141,44 +579,50 @@ class BlockchainLogger:
             else:
                 self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
                 self.public_key = self.private_key.public_key()
-                with open(self.private_key_path, 'wb') as f:
-                    f.write(self.private_key.private_bytes(
-                        encoding=serialization.Encoding.PEM,
-                        format=serialization.PrivateFormat.PKCS8,
-                        encryption_algorithm=serialization.NoEncryption()))
-                with open(self.public_key_path, 'wb') as f:
-                    f.write(self.public_key.public_bytes(
-                        encoding=serialization.Encoding.PEM,
-                        format=serialization.PublicFormat.SubjectPublicKeyInfo))
+                self._save_key_pair(self.private_key, self.private_key_path, self.public_key_path)
                 logger.info("New cryptographic keys generated and saved")
+            self.ed25519_private_key = None
+            self.ed25519_public_key = None
+            if os.path.exists(self.ed25519_private_key_path) and os.path.exists(self.ed25519_public_key_path):
+                with open(self.ed25519_private_key_path, 'rb') as f:
+                    self.ed25519_private_key = serialization.load_pem_private_key(f.read(), password=None)
+                with open(self.ed25519_public_key_path, 'rb') as f:
+                    self.ed25519_public_key = serialization.load_pem_public_key(f.read())
+                logger.info("Ed25519 keys loaded successfully")
+            elif self.sealing_policy.signature_algorithm == 'ed25519':
+                self.ed25519_private_key = ed25519.Ed25519PrivateKey.generate()
+                self.ed25519_public_key = self.ed25519_private_key.public_key()
+                self._save_key_pair(self.ed25519_private_key, self.ed25519_private_key_path, self.ed25519_public_key_path)
+                logger.info("New Ed25519 keys generated and saved")
         except Exception as e:
             logger.error(f"Cryptographic key initialization failed: {e}")
             raise
+    def _save_key_pair(self, private_key, private_key_path: str, public_key_path: str):
+        with open(private_key_path, 'wb') as f:
+            f.write(private_key.private_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PrivateFormat.PKCS8,
+                encryption_algorithm=serialization.NoEncryption()))
+        with open(public_key_path, 'wb') as f:
+            f.write(private_key.public_key().public_bytes(
+                encoding=serialization.Encoding.PEM,
+                format=serialization.PublicFormat.SubjectPublicKeyInfo))
     def _load_chain(self) -> List[Block]:
         chain = []
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT block_index, timestamp, previous_hash, merkle_root, nonce, hash FROM blocks ORDER BY block_index')
+                cursor.execute('''SELECT block_index, timestamp, previous_hash, merkle_root, nonce, hash,
+                    signature, difficulty, signature_algorithm FROM blocks ORDER BY block_index''')
                 blocks_data = cursor.fetchall()
                 for block_data in blocks_data:
-                    index, timestamp, previous_hash, merkle_root, nonce, block_hash = block_data
+                    (index, timestamp, previous_hash, merkle_root, nonce, block_hash,
+                     signature, difficulty, signature_algorithm) = block_data
                     cursor.execute('SELECT * FROM events WHERE block_index = ? ORDER BY timestamp', (index,))
                     events_data = cursor.fetchall()
                     events = []
                     for event_data in events_data:
-                        event = CheatingEvent(
-                            event_id=event_data[0],
-                            timestamp=event_data[2],
-                            event_type=event_data[3],
-                            severity=event_data[4],
-                            description=event_data[5],
-                            confidence_score=event_data[6],
-                            screenshot_path=event_data[7],
-                            metadata=json.loads(event_data[8]) if event_data[8] else {},
-                            session_id=event_data[9],
-                            user_id=event_data[10]
-                        )
+                        event = _event_from_row(event_data)
                         events.append(event)
                     block = Block(
                         index=index,
@@ -186,7 +630,10 @@ class BlockchainLogger:
                         events=events,
                         previous_hash=previous_hash,
                         merkle_root=merkle_root,
-                        nonce=nonce
+                        nonce=nonce,
+                        difficulty=LEGACY_DIFFICULTY if difficulty is None else difficulty,
+                        signature=signature,
+                        signature_algorithm=signature_algorithm
                     )
                     chain.append(block)
                 logger.info(f"Loaded {len(chain)} blocks from database")
@@ -194,22 +641,95 @@ class BlockchainLogger:
         except Exception as e:
             logger.error(f"Failed to load chain from database: {e}")
             return []
+    def _replay_journal(self):
+        with self.lock:
+            try:
+                journaled = self.journal.recover() + self.journal.adopt_orphans()
+                if not journaled:
+                    return
+                # A crash between saving a block and resetting the journal leaves that block's events behind,
+                # and an adopted journal may hold events its writer sealed into any earlier block
+                sealed = self._sealed_event_ids([event.event_id for event in journaled])
+                self.pending_events = []
+                for event in journaled:
+                    if event.event_id not in sealed:
+                        sealed.add(event.event_id)
+                        self.pending_events.append(event)
+                if not self.pending_events:
+                    self.journal.reset()
+                    return
+                self.pending_since = time.time()
+                self._schedule_latency_seal()
+                logger.info(f"Replayed {len(self.pending_events)} pending events from journal")
+                if self.sealing_policy.should_seal(len(self.pending_events), self.pending_since, time.time()):
+                    self._mine_block()
+            except Exception as e:
+                logger.error(f"Failed to replay pending event journal: {e}")
+    def _sealed_event_ids(self, event_ids: List[str]) -> set:
+        sealed = set()
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            # Chunked to stay under SQLite's bound parameter limit
+            for offset in range(0, len(event_ids), 500):
+                chunk = event_ids[offset:offset + 500]
+                cursor.execute(f'SELECT event_id FROM events WHERE event_id IN ({",".join("?" * len(chunk))})', chunk)
+                sealed.update(row[0] for row in cursor.fetchall())
+        return sealed
     def log_event(self, event: CheatingEvent) -> bool:
         with self.lock:
             try:
+                with metrics.DB_WRITE_LATENCY.time(operation='journal'):
+                    self.journal.append(event)
                 self.pending_events.append(event)
                 self.metrics['total_events'] += 1
-                if len(self.pending_events) >= 10:
+                if self.pending_since is None:
+                    self.pending_since = time.time()
+                    self._schedule_latency_seal()
+                self._notify('event_logged', {
+                    'event': asdict(event),
+                    'pending_events': len(self.pending_events)
+                })
+                if self.sealing_policy.should_seal(len(self.pending_events), self.pending_since, time.time()):
                     self._mine_block()
                 logger.info(f"Event logged: {event.event_type} - {event.description}")
                 return True
             except Exception as e:
                 logger.error(f"Failed to log event: {e}")
                 return False
+    def _schedule_latency_seal(self):
+        if self.sealing_policy.max_latency is None:
+            return
+        self._seal_timer = threading.Timer(self.sealing_policy.max_latency, self._seal_if_due, args=(self.pending_since,))
+        self._seal_timer.daemon = True
+        self._seal_timer.start()
+    def _seal_if_due(self, pending_since: float):
+        with self.lock:
+            try:
+                # Only seal the batch this timer was scheduled for
+                if self.pending_events and self.pending_since == pending_since:
+                    self._mine_block()
+            except Exception as e:
+                logger.error(f"Failed to seal block on latency deadline: {e}")
+    def _sign_block(self, block: Block) -> str:
+        if block.signature_algorithm == 'ed25519':
+            signature = self.ed25519_private_key.sign(block.signing_payload())
+        else:
+            signature = self.private_key.sign(
+                block.signing_payload(),
+                padding.PSS(
+                    mgf=padding.MGF1(hashes.SHA256()),
+                    salt_length=padding.PSS.MAX_LENGTH
+                ),
+                hashes.SHA256()
+            )
+        return base64.b64encode(signature).decode()
+    def _verify_block_signature(self, block: Block) -> bool:
+        return verify_block_signature(block, self.public_key, self.ed25519_public_key)
     def _mine_block(self):
         if not self.pending_events:
             return None
         start_time = time.time()
+        policy = self.sealing_policy
         merkle_tree = MerkleTree(self.pending_events)
         previous_hash = self.chain[-1].calculate_hash() if self.chain else "0" * 64
         new_block = Block(
@@ -217,37 +737,35 @@ class BlockchainLogger:
             timestamp=time.time(),
             events=self.pending_events.copy(),
             previous_hash=previous_hash,
-            merkle_root=merkle_tree.root
+            merkle_root=merkle_tree.root,
+            difficulty=policy.difficulty,
+            signature_algorithm=policy.signature_algorithm
         )
+        target = "0" * policy.difficulty
         nonce = 0
         while True:
             new_block.nonce = nonce
             block_hash = new_block.calculate_hash()
-            if block_hash.startswith(self.target):
+            if block_hash.startswith(target):
                 break
             nonce += 1
             if nonce > 1000000:
                 logger.warning("Mining timeout reached, using current nonce")
                 break
-        block_data = json.dumps({
-            'index': new_block.index,
-            'timestamp': new_block.timestamp,
-            'merkle_root': new_block.merkle_root,
-            'previous_hash': new_block.previous_hash,
-            'nonce': new_block.nonce
-        }, sort_keys=True)
-        signature = self.private_key.sign(
-            block_data.encode(),
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
+        new_block.signature = self._sign_block(new_block)
         self.chain.append(new_block)
-        self._save_block_to_db(new_block, block_hash, base64.b64encode(signature).decode())
+        with metrics.DB_WRITE_LATENCY.time(operation='block'):
+            self._save_block_to_db(new_block, block_hash, new_block.signature, merkle_tree.levels)
+        self.statistics_cache.invalidate()
+        self.journal.reset()
         self.pending_events.clear()
+        self.pending_since = None
+        if self._seal_timer is not None:
+            self._seal_timer.cancel()
+            self._seal_timer = None
         mining_time = time.time() - start_time
+        metrics.BLOCK_MINING_LATENCY.observe(mining_time)
+        metrics.BLOCKS_SEALED.inc()
         self.metrics['total_blocks'] += 1
         self.metrics['last_mining_time'] = mining_time
         self.metrics['average_mining_time'] = (
@@ -255,14 +773,46 @@ class BlockchainLogger:
             / self.metrics['total_blocks']
         )
         logger.info(f"Block {new_block.index} mined successfully in {mining_time:.2f}s")
+        self._notify('block_sealed', {
+            'index': new_block.index,
+            'timestamp': new_block.timestamp,
+            'hash': block_hash,
+            'previous_hash': new_block.previous_hash,
+            'merkle_root': new_block.merkle_root,
+            'nonce': new_block.nonce,
+            'difficulty': new_block.difficulty,
+            'signature_algorithm': new_block.signature_algorithm,
+            'events_count': len(new_block.events),
+            'mining_time': mining_time,
+            'average_mining_time': self.metrics['average_mining_time'],
+            'pending_events': len(self.pending_events)
+        })
         return new_block
-    def _save_block_to_db(self, block: Block, block_hash: str, signature: str):
+    def add_listener(self, listener):
+        # Listeners are called as listener(notification_type, data) on the logging thread while
+        # the logger lock is held, so they must hand work off rather than block
+        with self.lock:
+            if listener not in self.listeners:
+                self.listeners.append(listener)
+    def remove_listener(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+    def _notify(self, notification_type: str, data: Dict[str, Any]):
+        for listener in list(self.listeners):
+            try:
+                listener(notification_type, data)
+            except Exception as e:
+                logger.error(f"Blockchain listener failed on {notification_type}: {e}")
+    def _save_block_to_db(self, block: Block, block_hash: str, signature: str,
+                          merkle_levels: Optional[List[List[str]]] = None):
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('''INSERT INTO blocks (block_index, timestamp, previous_hash, merkle_root, nonce, hash, signature)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)''', (block.index, block.timestamp, block.previous_hash, 
-                     block.merkle_root, block.nonce, block_hash, signature))
+                cursor.execute('''INSERT INTO blocks (block_index, timestamp, previous_hash, merkle_root, nonce, hash, signature,
+                                          difficulty, signature_algorithm)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', (block.index, block.timestamp, block.previous_hash, 
+                     block.merkle_root, block.nonce, block_hash, signature, block.difficulty, block.signature_algorithm))
                 for event in block.events:
                     cursor.execute('''INSERT INTO events (event_id, block_index, timestamp, event_type, severity, 
                                           description, confidence_score, screenshot_path, metadata, session_id, user_id)
@@ -270,30 +820,142 @@ class BlockchainLogger:
                          event.severity, event.description, event.confidence_score, 
                          event.screenshot_path, json.dumps(event.metadata), 
                          event.session_id, event.user_id))
+                self._update_rollups(cursor, block.events)
+                if merkle_levels is not None:
+                    cursor.execute('INSERT OR REPLACE INTO merkle_levels (block_index, levels) VALUES (?, ?)',
+                                   (block.index, json.dumps(merkle_levels)))
                 conn.commit()
         except Exception as e:
             logger.error(f"Failed to save block to database: {e}")
             raise
-    def verify_chain(self) -> bool:
+    def _update_rollups(self, cursor, events: List[CheatingEvent]):
+        counts = {}
+        for event in events:
+            for granularity, size in ROLLUP_GRANULARITIES.items():
+                key = (granularity, int(event.timestamp // size) * size,
+                       event.event_type, event.severity, event.session_id or '')
+                counts[key] = counts.get(key, 0) + 1
+        cursor.executemany('''INSERT INTO event_rollups (granularity, bucket_start, event_type, severity, session_id, count)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (granularity, bucket_start, event_type, severity, session_id)
+            DO UPDATE SET count = count + excluded.count''', [key + (count,) for key, count in counts.items()])
+    def _rebuild_rollups(self, cursor):
+        cursor.execute('DELETE FROM event_rollups')
+        for granularity, size in ROLLUP_GRANULARITIES.items():
+            cursor.execute('''INSERT INTO event_rollups (granularity, bucket_start, event_type, severity, session_id, count)
+                SELECT ?, CAST(timestamp / ? AS INTEGER) * ? AS bucket, event_type, severity, COALESCE(session_id, ''), COUNT(*)
+                FROM events GROUP BY bucket, event_type, severity, COALESCE(session_id, '')''', (granularity, size, size))
+    def rebuild_rollups(self) -> int:
+        with self.lock:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                self._rebuild_rollups(cursor)
+                conn.commit()
+                cursor.execute('SELECT COUNT(*) FROM event_rollups')
+                buckets = cursor.fetchone()[0]
+            self.statistics_cache.invalidate()
+        logger.info(f"Rebuilt event rollups: {buckets} buckets")
+        return buckets
+    def verify_chain(self, start_index: int = 0) -> bool:
         try:
-            for i in range(1, len(self.chain)):
+            for i in range(start_index, len(self.chain)):
                 current_block = self.chain[i]
-                previous_block = self.chain[i - 1]
-                if current_block.previous_hash != previous_block.calculate_hash():
+                if i > 0 and current_block.previous_hash != self.chain[i - 1].calculate_hash():
                     logger.error(f"Invalid previous hash at block {i}")
                     return False
-                if not current_block.calculate_hash().startswith(self.target):
+                if i > 0 and not current_block.calculate_hash().startswith("0" * current_block.difficulty):
                     logger.error(f"Invalid proof-of-work at block {i}")
                     return False
                 merkle_tree = MerkleTree(current_block.events)
                 if current_block.merkle_root != merkle_tree.root:
                     logger.error(f"Invalid Merkle root at block {i}")
                     return False
+                # Blocks sealed without proof-of-work rely on their signature alone
+                if (current_block.difficulty == 0 or current_block.signature_algorithm is not None) \
+                        and not self._verify_block_signature(current_block):
+                    logger.error(f"Invalid signature at block {i}")
+                    return False
             logger.info("Blockchain verification completed successfully")
             return True
         except Exception as e:
             logger.error(f"Blockchain verification failed: {e}")
             return False
+    def _verify_new_blocks(self) -> bool:
+        # Sealed blocks are only ever appended, so blocks verified by an earlier pass need not be checked again
+        chain_length = len(self.chain)
+        if self._verified_blocks < chain_length:
+            if not self.verify_chain(self._verified_blocks):
+                return False
+            self._verified_blocks = chain_length
+        return True
+    def iter_audit(self, workers: Optional[int] = None, shard_size: int = 500) -> Iterator[Dict[str, Any]]:
+        if shard_size < 1:
+            raise ValueError("shard_size must be at least 1")
+        start_time = time.time()
+        # More processes than cores only adds contention; callers such as the audit view pass user input
+        workers = min(workers or os.cpu_count() or 1, os.cpu_count() or 1)
+        failures = []
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT MAX(block_index) FROM blocks')
+            last_index = cursor.fetchone()[0]
+            last_index = -1 if last_index is None else last_index
+            # Linear link pass over stored hashes; each shard proves its stored hashes match the block contents
+            cursor.execute('SELECT block_index, previous_hash, hash FROM blocks WHERE block_index <= ? ORDER BY block_index',
+                           (last_index,))
+            expected_index, previous_block_hash = 0, None
+            for index, previous_hash, block_hash in cursor:
+                if index != expected_index:
+                    failures.append({'index': expected_index, 'reason': "missing block"})
+                    break
+                if index > 0 and previous_hash != previous_block_hash:
+                    failures.append({'index': index, 'reason': "invalid previous hash"})
+                    break
+                expected_index, previous_block_hash = index + 1, block_hash
+        total_blocks = last_index + 1
+        checked_blocks = 0
+        yield {'event': 'progress', 'checked_blocks': 0, 'total_blocks': total_blocks}
+        # Spawned workers start clean instead of forking a server process with its threads, locks and sockets
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = {
+                executor.submit(_audit_block_range, self.db_path, start, min(start + shard_size - 1, last_index),
+                                self.public_key_path, self.ed25519_public_key_path): start
+                for start in range(0, total_blocks, shard_size)
+            }
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                result = future.result()
+                checked_blocks += result['checked_blocks']
+                if result['failure'] is not None:
+                    failures.append(result['failure'])
+                    # Shards past the earliest known failure cannot change the answer
+                    first_failing_index = min(failure['index'] for failure in failures)
+                    for pending, start in futures.items():
+                        if start > first_failing_index:
+                            pending.cancel()
+                yield {'event': 'progress', 'checked_blocks': checked_blocks, 'total_blocks': total_blocks}
+        first_failure = min(failures, key=lambda failure: failure['index']) if failures else None
+        if first_failure is not None:
+            logger.error(f"Blockchain audit failed at block {first_failure['index']}: {first_failure['reason']}")
+        else:
+            logger.info(f"Blockchain audit of {total_blocks} blocks completed successfully")
+        yield {
+            'event': 'result',
+            'verified': first_failure is None,
+            'total_blocks': total_blocks,
+            'checked_blocks': checked_blocks,
+            'first_failure': first_failure,
+            'workers': workers,
+            'shard_size': shard_size,
+            'elapsed_seconds': round(time.time() - start_time, 3)
+        }
+    def audit_chain(self, workers: Optional[int] = None, shard_size: int = 500, progress=None) -> Dict[str, Any]:
+        for update in self.iter_audit(workers, shard_size):
+            if update['event'] == 'result':
+                return update
+            if progress is not None:
+                progress(update['checked_blocks'], update['total_blocks'])
     def get_events_by_type(self, event_type: str, limit: int = 100) -> List[CheatingEvent]:
         events = []
         try:
@@ -304,18 +966,7 @@ class BlockchainLogger:
                 else:
                     cursor.execute('SELECT * FROM events WHERE event_type = ? ORDER BY timestamp DESC LIMIT ?', (event_type, limit))
                 for event_data in cursor.fetchall():
-                    event = CheatingEvent(
-                        event_id=event_data[0],
-                        timestamp=event_data[2],
-                        event_type=event_data[3],
-                        severity=event_data[4],
-                        description=event_data[5],
-                        confidence_score=event_data[6],
-                        screenshot_path=event_data[7],
-                        metadata=json.loads(event_data[8]) if event_data[8] else {},
-                        session_id=event_data[9],
-                        user_id=event_data[10]
-                    )
+                    event = _event_from_row(event_data)
                     events.append(event)
         except Exception as e:
             logger.error(f"Failed to retrieve events by type: {e}")
@@ -327,75 +978,245 @@ class BlockchainLogger:
                 cursor = conn.cursor()
                 cursor.execute('SELECT * FROM events WHERE severity = ? ORDER BY timestamp DESC LIMIT ?', (severity, limit))
                 for event_data in cursor.fetchall():
-                    event = CheatingEvent(
-                        event_id=event_data[0],
-                        timestamp=event_data[2],
-                        event_type=event_data[3],
-                        severity=event_data[4],
-                        description=event_data[5],
-                        confidence_score=event_data[6],
-                        screenshot_path=event_data[7],
-                        metadata=json.loads(event_data[8]) if event_data[8] else {},
-                        session_id=event_data[9],
-                        user_id=event_data[10]
-                    )
+                    event = _event_from_row(event_data)
                     events.append(event)
         except Exception as e:
             logger.error(f"Failed to retrieve events by severity: {e}")
         return events
-    def get_statistics(self) -> Dict[str, Any]:
+    def iter_events_by_session(self, session_id: str) -> Iterator[CheatingEvent]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM events INDEXED BY idx_events_session WHERE session_id = ? ORDER BY timestamp',
+                           (session_id,))
+            for event_data in cursor:
+                yield _event_from_row(event_data)
+    def get_events_by_session(self, session_id: str) -> List[CheatingEvent]:
+        try:
+            return list(self.iter_events_by_session(session_id))
+        except Exception as e:
+            logger.error(f"Failed to retrieve events by session: {e}")
+            return []
+    def get_session_statistics(self, session_id: str) -> Dict[str, Any]:
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) FROM events')
-                total_events = cursor.fetchone()[0]
-                cursor.execute('SELECT event_type, COUNT(*) FROM events GROUP BY event_type')
+                cursor.execute('''SELECT COUNT(*), MIN(timestamp), MAX(timestamp) FROM events INDEXED BY idx_events_session
+                    WHERE session_id = ?''', (session_id,))
+                total_events, first_timestamp, last_timestamp = cursor.fetchone()
+                cursor.execute('''SELECT event_type, COUNT(*) FROM events INDEXED BY idx_events_session
+                    WHERE session_id = ? GROUP BY event_type''', (session_id,))
                 events_by_type = dict(cursor.fetchall())
-                cursor.execute('SELECT severity, COUNT(*) FROM events GROUP BY severity')
+                cursor.execute('''SELECT severity, COUNT(*) FROM events INDEXED BY idx_events_session
+                    WHERE session_id = ? GROUP BY severity''', (session_id,))
                 events_by_severity = dict(cursor.fetchall())
-                cursor.execute('SELECT COUNT(*) FROM events WHERE timestamp > ?', (time.time() - 86400,))
-                recent_events = cursor.fetchone()[0]
                 return {
+                    'session_id': session_id,
                     'total_events': total_events,
-                    'total_blocks': len(self.chain),
                     'events_by_type': events_by_type,
                     'events_by_severity': events_by_severity,
-                    'recent_events_24h': recent_events,
-                    'metrics': self.metrics,
-                    'chain_verified': self.verify_chain()
+                    'first_timestamp': first_timestamp,
+                    'last_timestamp': last_timestamp
                 }
         except Exception as e:
-            logger.error(f"Failed to get statistics: {e}")
+            logger.error(f"Failed to get session statistics: {e}")
             return {}
-    def export_chain(self, filepath: str) -> bool:
+    def _get_merkle_levels(self, cursor, block_index: int, merkle_root: str) -> Optional[List[List[str]]]:
+        cursor.execute('SELECT levels FROM merkle_levels WHERE block_index = ?', (block_index,))
+        row = cursor.fetchone()
+        if row:
+            return json.loads(row[0])
+        cursor.execute('SELECT * FROM events WHERE block_index = ? ORDER BY timestamp', (block_index,))
+        merkle_tree = MerkleTree([_event_from_row(event_data) for event_data in cursor.fetchall()])
+        if merkle_tree.root != merkle_root:
+            logger.error(f"Stored events of block {block_index} do not match its Merkle root")
+            return None
+        cursor.execute('INSERT OR REPLACE INTO merkle_levels (block_index, levels) VALUES (?, ?)',
+                       (block_index, json.dumps(merkle_tree.levels)))
+        return merkle_tree.levels
+    def get_inclusion_proof(self, event_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT * FROM events WHERE event_id = ?', (event_id,))
+                event_data = cursor.fetchone()
+                if event_data is None:
+                    return None
+                block_index = event_data[1]
+                cursor.execute('SELECT merkle_root, hash FROM blocks WHERE block_index = ?', (block_index,))
+                merkle_root, block_hash = cursor.fetchone()
+                levels = self._get_merkle_levels(cursor, block_index, merkle_root)
+                conn.commit()
+                if levels is None:
+                    return None
+                event = asdict(_event_from_row(event_data))
+                leaf_hash = hash_event(event)
+                leaf_index = levels[0].index(leaf_hash)
+                return {
+                    'event_id': event_id,
+                    'event': event,
+                    'block_index': block_index,
+                    'block_hash': block_hash,
+                    'merkle_root': merkle_root,
+                    'leaf_index': leaf_index,
+                    'leaf_hash': leaf_hash,
+                    'proof': MerkleTree([], levels).get_proof(leaf_index)
+                }
+        except Exception as e:
+            logger.error(f"Failed to build inclusion proof for event {event_id}: {e}")
+            return None
+    def verify_event_inclusion(self, inclusion_proof: Dict[str, Any]) -> bool:
         try:
-            export_data = {
-                'metadata': {
-                    'export_timestamp': time.time(),
-                    'total_blocks': len(self.chain),
-                    'total_events': self.metrics['total_events'],
-                    'difficulty': self.difficulty
-                },
-                'blocks': []
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('SELECT merkle_root FROM blocks WHERE block_index = ?', (inclusion_proof['block_index'],))
+                row = cursor.fetchone()
+                # The event must also have been sealed into the block the proof names
+                cursor.execute('SELECT block_index FROM events WHERE event_id = ?', (inclusion_proof['event_id'],))
+                event_row = cursor.fetchone()
+            return (row is not None and row[0] == inclusion_proof['merkle_root']
+                    and event_row is not None and event_row[0] == inclusion_proof['block_index']
+                    and verify_inclusion_proof(inclusion_proof))
+        except Exception as e:
+            logger.error(f"Failed to verify inclusion proof: {e}")
+            return False
+    def get_statistics(self) -> Dict[str, Any]:
+        try:
+            stats = self.statistics_cache.get_or_compute('statistics', self._compute_statistics)
+            # Metrics move with every logged event, so they are never served from the cache
+            return dict(stats, metrics=self.metrics)
+        except Exception as e:
+            logger.error(f"Failed to get statistics: {e}")
+            return {}
+    def _compute_statistics(self) -> Dict[str, Any]:
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT event_type, SUM(count) FROM event_rollups WHERE granularity = 'day' GROUP BY event_type")
+            events_by_type = dict(cursor.fetchall())
+            cursor.execute("SELECT severity, SUM(count) FROM event_rollups WHERE granularity = 'day' GROUP BY severity")
+            events_by_severity = dict(cursor.fetchall())
+            return {
+                'total_events': sum(events_by_type.values()),
+                'total_blocks': len(self.chain),
+                'events_by_type': events_by_type,
+                'events_by_severity': events_by_severity,
+                'recent_events_24h': self._count_events_since(cursor, time.time() - 86400),
+                'chain_verified': self._verify_new_blocks()
             }
-            for block in self.chain:
-                block_data = {
-                    'index': block.index,
-                    'timestamp': block.timestamp,
-                    'previous_hash': block.previous_hash,
-                    'merkle_root': block.merkle_root,
-                    'nonce': block.nonce,
-                    'hash': block.calculate_hash(),
-                    'events': [asdict(event) for event in block.events]
+    def _count_events_since(self, cursor, since: float) -> int:
+        hour = ROLLUP_GRANULARITIES['hour']
+        first_full_bucket = (int(since // hour) + 1) * hour
+        cursor.execute("SELECT COALESCE(SUM(count), 0) FROM event_rollups WHERE granularity = 'hour' AND bucket_start >= ?",
+                       (first_full_bucket,))
+        full_buckets = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM events WHERE timestamp > ? AND timestamp < ?', (since, first_full_bucket))
+        return full_buckets + cursor.fetchone()[0]
+    def get_rollup_statistics(self, since: Optional[float] = None, granularity: str = 'day') -> Dict[str, Any]:
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Unknown rollup granularity: {granularity}")
+        size = ROLLUP_GRANULARITIES[granularity]
+        bucket_since = int((since or 0) // size) * size
+        try:
+            # Windows are aligned to rollup buckets, so every caller in the same bucket shares an entry
+            return self.statistics_cache.get_or_compute(
+                f'rollups:{granularity}:{bucket_since}',
+                lambda: self._compute_rollup_statistics(granularity, bucket_since)
+            )
+        except Exception as e:
+            logger.error(f"Failed to get rollup statistics: {e}")
+            return {'granularity': granularity, 'since': bucket_since,
+                    'events_by_type': {}, 'events_by_severity': {}, 'buckets': []}
+    def _compute_rollup_statistics(self, granularity: str, bucket_since: int) -> Dict[str, Any]:
+        result = {'granularity': granularity, 'since': bucket_since}
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            params = (granularity, bucket_since)
+            cursor.execute('''SELECT event_type, SUM(count) FROM event_rollups
+                WHERE granularity = ? AND bucket_start >= ? GROUP BY event_type''', params)
+            result['events_by_type'] = dict(cursor.fetchall())
+            cursor.execute('''SELECT severity, SUM(count) FROM event_rollups
+                WHERE granularity = ? AND bucket_start >= ? GROUP BY severity''', params)
+            result['events_by_severity'] = dict(cursor.fetchall())
+            cursor.execute('''SELECT bucket_start, SUM(count) FROM event_rollups
+                WHERE granularity = ? AND bucket_start >= ? GROUP BY bucket_start ORDER BY bucket_start''', params)
+            result['buckets'] = [{'bucket_start': bucket_start, 'count': count}
+                                 for bucket_start, count in cursor.fetchall()]
+        return result
+    def iter_blocks(self, start_index: Optional[int] = None, end_index: Optional[int] = None,
+                    start_time: Optional[float] = None, end_time: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        conditions, params = [], []
+        for column, operator, value in (('block_index', '>=', start_index), ('block_index', '<=', end_index),
+                                        ('timestamp', '>=', start_time), ('timestamp', '<=', end_time)):
+            if value is not None:
+                conditions.append(f'{column} {operator} ?')
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with sqlite3.connect(self.db_path) as conn:
+            blocks_cursor = conn.cursor()
+            events_cursor = conn.cursor()
+            blocks_cursor.execute(f'''SELECT block_index, timestamp, previous_hash, merkle_root, nonce, hash, signature,
+                difficulty, signature_algorithm FROM blocks {where} ORDER BY block_index''', params)
+            for (index, timestamp, previous_hash, merkle_root, nonce, block_hash, signature,
+                 difficulty, signature_algorithm) in blocks_cursor:
+                events_cursor.execute('SELECT * FROM events WHERE block_index = ? ORDER BY timestamp', (index,))
+                yield {
+                    'index': index,
+                    'timestamp': timestamp,
+                    'previous_hash': previous_hash,
+                    'merkle_root': merkle_root,
+                    'nonce': nonce,
+                    'difficulty': LEGACY_DIFFICULTY if difficulty is None else difficulty,
+                    'hash': block_hash,
+                    'signature': signature,
+                    'signature_algorithm': signature_algorithm,
+                    'events': [asdict(_event_from_row(event_data)) for event_data in events_cursor.fetchall()]
                 }
-                export_data['blocks'].append(block_data)
-            with open(filepath, 'w') as f:
-                json.dump(export_data, f, indent=2, default=str)
+    def iter_export_chunks(self, fmt: str = 'ndjson', **block_range) -> Iterator[str]:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        metadata = {
+            'export_timestamp': time.time(),
+            'range': {key: value for key, value in block_range.items() if value is not None}
+        }
+        # Counted while streaming, so they describe exactly the blocks written even if the chain grows meanwhile
+        summary = {'exported_blocks': 0, 'exported_events': 0}
+        if fmt == 'ndjson':
+            yield json.dumps({'metadata': metadata}, default=str) + '\n'
+            for block_data in self.iter_blocks(**block_range):
+                summary['exported_blocks'] += 1
+                summary['exported_events'] += len(block_data['events'])
+                yield json.dumps(block_data, default=str) + '\n'
+            yield json.dumps({'summary': summary}) + '\n'
+        else:
+            yield '{"metadata": ' + json.dumps(metadata, default=str) + ', "blocks": ['
+            separator = ''
+            for block_data in self.iter_blocks(**block_range):
+                summary['exported_blocks'] += 1
+                summary['exported_events'] += len(block_data['events'])
+                yield separator + json.dumps(block_data, default=str)
+                separator = ', '
+            yield '], "summary": ' + json.dumps(summary) + '}\n'
+    def export_chain(self, filepath: str, fmt: Optional[str] = None, compression: Optional[str] = None,
+                     **block_range) -> bool:
+        inferred_fmt, inferred_compression = infer_export_options(filepath)
+        try:
+            chunks = self.iter_export_chunks(fmt or inferred_fmt, **block_range)
+            with open(filepath, 'wb') as f:
+                for data in compress_chunks(chunks, compression or inferred_compression):
+                    f.write(data)
             logger.info(f"Blockchain exported to {filepath}")
             return True
         except Exception as e:
             logger.error(f"Failed to export blockchain: {e}")
             return False
+    def set_sealing_policy(self, sealing_policy: SealingPolicy):
+        with self.lock:
+            if sealing_policy.signature_algorithm == 'ed25519' and self.ed25519_private_key is None:
+                self.ed25519_private_key = ed25519.Ed25519PrivateKey.generate()
+                self.ed25519_public_key = self.ed25519_private_key.public_key()
+                self._save_key_pair(self.ed25519_private_key, self.ed25519_private_key_path, self.ed25519_public_key_path)
+            self.sealing_policy = sealing_policy
+            self.difficulty = sealing_policy.difficulty
+            self.target = "0" * sealing_policy.difficulty
     def flush_pending_events(self):
         with self.lock:
             if self.pending_events:
@@ -420,10 +1241,15 @@ class BlockchainLogger:
 
 blockchain_logger = None
 
-def initialize_blockchain_logger(db_path: str = "blockchain_logs.db") -> BlockchainLogger:
+def initialize_blockchain_logger(db_path: str = "blockchain_logs.db",
+                                 sealing_policy: Optional[SealingPolicy] = None,
+                                 journal_fsync_interval: Optional[float] = 0.05,
+                                 statistics_cache: Optional[StatisticsCache] = None) -> BlockchainLogger:
     global blockchain_logger
     if blockchain_logger is None:
-        blockchain_logger = BlockchainLogger(db_path)
+        blockchain_logger = BlockchainLogger(db_path, sealing_policy=sealing_policy,
+                                             journal_fsync_interval=journal_fsync_interval,
+                                             statistics_cache=statistics_cache)
     return blockchain_logger
 
 def get_blockchain_logger() -> BlockchainLogger:
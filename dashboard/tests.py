@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+
+from analytics.tests import seed_violations
+from exam_sessions.models import ExamSession, SessionEvent
+from violations.models import VIOLATION_WINDOWS
+from .views import dashboard_data, real_time_stats
+
+User = get_user_model()
+
+class DashboardDataQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='candidate', email='candidate@example.com', password='secret')
+
+    def get(self, days):
+        request = RequestFactory().get('/data/', {'days': days})
+        request.user = self.user
+        return dashboard_data(request)
+
+    def test_query_count_independent_of_window(self):
+        seed_violations(self.user, days=100, per_day=3)
+        for days in VIOLATION_WINDOWS:
+            # Daily counts and counts by type, one grouped query each
+            with self.subTest(days=days), self.assertNumQueries(2):
+                response = self.get(days)
+            self.assertEqual(len(response.json()['daily_violations']), days)
+
+    def test_query_count_independent_of_volume(self):
+        for per_day in (1, 10, 50):
+            seed_violations(self.user, days=30, per_day=per_day)
+            with self.subTest(per_day=per_day), self.assertNumQueries(2):
+                response = self.get(90)
+            self.assertEqual(response.status_code, 200)
+
+@override_settings(MONITORING_STATS_CACHE=None)
+class RealTimeStatsQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='candidate', email='candidate@example.com', password='secret')
+        cls.session = ExamSession.objects.create(user=cls.user, session_id='query-count-session')
+
+    def get(self):
+        request = RequestFactory().get('/real-time-stats/')
+        request.user = self.user
+        return real_time_stats(request)
+
+    def test_query_count_independent_of_volume(self):
+        for per_day in (1, 10, 50):
+            seed_violations(self.user, days=7, per_day=per_day)
+            SessionEvent.objects.bulk_create([
+                SessionEvent(session=self.session, event_type='head_misalignment') for _ in range(per_day)
+            ])
+            # Active session, recent violations, session events and today's counts by type
+            with self.subTest(per_day=per_day), self.assertNumQueries(4):
+                response = self.get()
+            self.assertTrue(response.json()['success'])
+
+    def test_counts_today_only(self):
+        seed_violations(self.user, days=7, per_day=5)
+        with self.assertNumQueries(4):
+            response = self.get()
+        self.assertEqual(response.json()['stats']['total_violations_today'], 5)
@@ -2,7 +2,9 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from exam_sessions.models import ExamSession, SessionEvent
-from violations.models import Violation
+from violations.models import Violation, VIOLATION_WINDOWS
+from monitoring.stats import get_cached_stats, format_violation, format_session_event
+from django.utils import timezone
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
@@ -40,33 +42,22 @@ def dashboard_home(request):
 @login_required
 def dashboard_data(request):
     """API endpoint for dashboard data"""
-    # Get statistics for the last 7 days
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=7)
-    
-    # Daily violation counts
-    daily_violations = []
-    for i in range(7):
-        date = start_date + timedelta(days=i)
-        count = Violation.objects.filter(
-            user=request.user,
-            timestamp__date=date
-        ).count()
-        daily_violations.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'count': count
-        })
+    # Statistics for the last 7, 30 or 90 days
+    try:
+        days = int(request.GET.get('days', 7))
+    except ValueError:
+        days = None
+    if days not in VIOLATION_WINDOWS:
+        return JsonResponse({'error': f'days must be one of {list(VIOLATION_WINDOWS)}'}, status=400)
     
-    # Violation types
-    violation_types = {}
     violations = Violation.objects.filter(user=request.user)
-    for violation in violations:
-        v_type = violation.violation_type
-        violation_types[v_type] = violation_types.get(v_type, 0) + 1
     
     return JsonResponse({
-        'daily_violations': daily_violations,
-        'violation_types': violation_types,
+        # Daily violation counts (one grouped query)
+        'daily_violations': violations.daily_counts(days),
+        # Violation types (one grouped query)
+        'violation_types': violations.counts_by_type(),
+        'days': days,
     })
 
 @login_required
@@ -76,53 +67,34 @@ def real_time_stats(request):
         # Get current session
         active_session = ExamSession.objects.filter(user=request.user, is_active=True).first()
         
-        # Get recent violations (last 10 minutes)
-        ten_minutes_ago = datetime.now() - timedelta(minutes=10)
-        recent_violations = Violation.objects.filter(
-            user=request.user,
-            timestamp__gte=ten_minutes_ago
-        ).order_by('-timestamp')[:10]
-        
-        # Get session events
-        session_events = []
-        if active_session:
-            session_events = SessionEvent.objects.filter(
-                session=active_session
-            ).order_by('-timestamp')[:20]
-        
-        # Calculate real-time statistics
-        total_violations_today = Violation.objects.filter(
-            user=request.user,
-            timestamp__date=datetime.now().date()
-        ).count()
-        
-        violations_by_type = {}
-        for violation in Violation.objects.filter(user=request.user, timestamp__date=datetime.now().date()):
-            v_type = violation.violation_type
-            violations_by_type[v_type] = violations_by_type.get(v_type, 0) + 1
-        
-        # Format violations for frontend
-        formatted_violations = []
-        for violation in recent_violations:
-            formatted_violations.append({
-                'id': violation.id,
-                'type': violation.violation_type,
-                'description': violation.description,
-                'confidence': violation.confidence,
-                'timestamp': violation.timestamp.strftime('%H:%M:%S'),
-                'is_resolved': violation.is_resolved
-            })
-        
-        # Format session events
-        formatted_events = []
-        for event in session_events:
-            formatted_events.append({
-                'id': event.id,
-                'type': event.event_type,
-                'confidence': event.confidence,
-                'timestamp': event.timestamp.strftime('%H:%M:%S'),
-                'metadata': event.metadata
-            })
+        # Served from the monitoring WebSocket's shared snapshot when one is cached;
+        # this endpoint is only a fallback for clients without a live connection
+        snapshot = get_cached_stats(request.user.id)
+        if snapshot is None:
+            # Get recent violations (last 10 minutes)
+            ten_minutes_ago = timezone.now() - timedelta(minutes=10)
+            recent_violations = Violation.objects.filter(
+                user=request.user,
+                timestamp__gte=ten_minutes_ago
+            ).order_by('-timestamp')[:10]
+            
+            # Get session events
+            session_events = []
+            if active_session:
+                session_events = SessionEvent.objects.filter(
+                    session=active_session
+                ).order_by('-timestamp')[:20]
+            
+            # Calculate real-time statistics from one grouped query
+            violations_by_type = Violation.objects.filter(user=request.user).since_day(timezone.localdate()).counts_by_type()
+            snapshot = {
+                'recent_violations': [format_violation(v) for v in recent_violations],
+                'session_events': [format_session_event(e) for e in session_events],
+                'stats': {
+                    'total_violations_today': sum(violations_by_type.values()),
+                    'violations_by_type': violations_by_type
+                }
+            }
         
         return JsonResponse({
             'success': True,
@@ -130,14 +102,13 @@ def real_time_stats(request):
                 'id': active_session.id if active_session else None,
                 'session_id': active_session.session_id if active_session else None,
                 'start_time': active_session.start_time.strftime('%H:%M:%S') if active_session else None,
-                'duration_minutes': int((datetime.now() - active_session.start_time).total_seconds() / 60) if active_session else 0
+                'duration_minutes': int((timezone.now() - active_session.start_time).total_seconds() / 60) if active_session else 0
             },
-            'recent_violations': formatted_violations,
-            'session_events': formatted_events,
+            'recent_violations': snapshot['recent_violations'],
+            'session_events': snapshot['session_events'],
             'stats': {
-                'total_violations_today': total_violations_today,
-                'violations_by_type': violations_by_type,
-                'session_duration_minutes': int((datetime.now() - active_session.start_time).total_seconds() / 60) if active_session else 0
+                **snapshot['stats'],
+                'session_duration_minutes': int((timezone.now() - active_session.start_time).total_seconds() / 60) if active_session else 0
             }
         })
         
@@ -2,6 +2,10 @@ import cv2
 import numpy as np
 import time
 import os
+from evidence_writer import get_evidence_writer
+from tracing import get_tracer
+
+tracer = get_tracer(__name__)
 
 class EmotionDetector:
     def __init__(self, model_path=None):
@@ -287,13 +291,13 @@ def process_emotion_detection(frame, emotion_detector):
     """
     Process emotion detection on the given frame
     """
-    print("[DEBUG] process_emotion_detection called")
+    tracer.trace("process_emotion_detection called")
     
     current_time = time.time()
     
     # Check if enough time has passed since last detection
     if current_time - emotion_detector.last_emotion_time < emotion_detector.emotion_interval:
-        print("[DEBUG] Too soon for emotion detection, returning 'Processing...'")
+        tracer.trace("skipped, within emotion interval")
         return frame, "Processing...", False, False, False
     
     emotion_detector.last_emotion_time = current_time
@@ -309,7 +313,7 @@ def process_emotion_detection(frame, emotion_detector):
         minSize=(30, 30)
     )
     
-    print(f"[DEBUG] Found {len(faces)} faces")
+    tracer.debug("faces found", count=len(faces))
     
     emotion_state = {
         'stress': 0.0,
@@ -322,7 +326,7 @@ def process_emotion_detection(frame, emotion_detector):
     if len(faces) > 0:
         # Process the largest face
         (x, y, w, h) = max(faces, key=lambda rect: rect[2] * rect[3])
-        print(f"[DEBUG] Processing face at ({x},{y}) with size {w}x{h}")
+        tracer.debug("processing face", x=x, y=y, width=w, height=h)
         
         # Ensure coordinates are within frame bounds
         x = max(0, x)
@@ -336,11 +340,11 @@ def process_emotion_detection(frame, emotion_detector):
             
             # Detect emotion
             emotion, confidence, emotion_probs = emotion_detector.detect_emotion(face_img)
-            print(f"[DEBUG] Detected emotion: {emotion} with confidence: {confidence}")
+            tracer.debug("emotion detected", emotion=emotion, confidence=confidence)
             
             # Analyze emotion state
             emotion_state = emotion_detector.analyze_emotion_state(emotion, confidence, emotion_probs)
-            print(f"[DEBUG] Emotion state: {emotion_state}")
+            tracer.debug("emotion state", state=emotion_state)
             
             # Draw rectangle around face
             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
@@ -349,20 +353,21 @@ def process_emotion_detection(frame, emotion_detector):
             cv2.putText(frame, f"{emotion}: {confidence:.2f}", 
                        (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         else:
-            print("[DEBUG] Invalid face dimensions")
+            tracer.debug("invalid face dimensions")
     else:
-        print("[DEBUG] No faces detected")
+        tracer.debug("no face detected")
     
     # Get alerts
     alerts = emotion_detector.get_emotion_alert(emotion_state)
-    print(f"[DEBUG] Emotion alerts: {alerts}")
+    tracer.debug("emotion alerts", alerts=alerts)
     
     # Determine if any concerning emotions are detected
     stress_detected = emotion_state['stress'] > emotion_detector.stress_threshold
     fear_detected = emotion_state['fear'] > emotion_detector.fear_threshold
     overconfidence_detected = emotion_state['overconfidence'] > emotion_detector.overconfidence_threshold
     
-    print(f"[DEBUG] Final results - emotion: {emotion_state['current_emotion']}, stress: {stress_detected}, fear: {fear_detected}, overconfidence: {overconfidence_detected}")
+    tracer.debug("final results", emotion=emotion_state['current_emotion'], stress=stress_detected,
+                 fear=fear_detected, overconfidence=overconfidence_detected)
     
     return frame, emotion_state['current_emotion'], stress_detected, fear_detected, overconfidence_detected
 
@@ -371,9 +376,9 @@ def save_emotion_screenshot(frame, emotion_type, log_dir):
     Save screenshot when concerning emotion is detected
     """
     timestamp = int(time.time())
-    filename = os.path.join(log_dir, f"emotion_{emotion_type}_{timestamp}.png")
-    cv2.imwrite(filename, frame)
-    print(f"Emotion screenshot saved: {filename}")
+    name = f"emotion_{emotion_type}_{timestamp}"
+    filename = get_evidence_writer().submit(frame, name, log_dir)
+    print(f"Emotion screenshot queued: {name}")
     return filename
 
 # Global emotion detector instance
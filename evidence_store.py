@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+def difference_hash(frame, hash_size: int = 8) -> int:
+    """64-bit dHash of a frame: stable across re-encoding and small changes, unlike a content hash"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    value = 0
+    for bit in (small[:, 1:] > small[:, :-1]).flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+class EvidencePath(str):
+    """Path of a stored blob that also carries the content hash it is stored under.
+
+    Being a str, it can be passed anywhere a screenshot path was expected.
+    near_duplicate marks a perceptually similar older blob reused in place of
+    the capture itself, whose own bytes were never stored.
+    """
+    def __new__(cls, path: str, sha256: str, duplicate: bool = False, near_duplicate: bool = False):
+        evidence_path = super().__new__(cls, path)
+        evidence_path.sha256 = sha256
+        evidence_path.duplicate = duplicate
+        evidence_path.near_duplicate = near_duplicate
+        return evidence_path
+
+    def __getnewargs__(self):
+        # Lets copy and pickle rebuild it (dataclasses.asdict deep-copies event metadata)
+        return str(self), self.sha256, self.duplicate, self.near_duplicate
+
+class EvidenceStore:
+    """Content-addressed evidence blobs under root/ab/cd/<sha256><ext>.
+
+    Identical content is stored once and only gains a reference. With
+    perceptual_dedup, a screenshot whose dHash is within phash_threshold bits
+    of a recently stored one reuses that blob. A SQLite index next to the blobs
+    records references and last use, so retention never scans the events table.
+    """
+
+    def __init__(self, root: str = "evidence", perceptual_dedup: bool = False, phash_threshold: int = 5,
+                 recent_hashes: int = 256, shard_depth: int = 2):
+        self.root = root
+        self.perceptual_dedup = perceptual_dedup
+        self.phash_threshold = phash_threshold
+        self.shard_depth = shard_depth
+        self.index_path = os.path.join(root, 'index.db')
+        self.lock = threading.Lock()
+        # Near-duplicates come from repeated violations close together, so only recent blobs are compared
+        self.recent = deque(maxlen=recent_hashes)
+        os.makedirs(root, exist_ok=True)
+        self._init_index()
+
+    def _init_index(self):
+        with sqlite3.connect(self.index_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('''CREATE TABLE IF NOT EXISTS blobs (
+                    sha256 TEXT PRIMARY KEY,
+                    path TEXT,
+                    kind TEXT,
+                    size INTEGER,
+                    file_sha256 TEXT,
+                    phash INTEGER,
+                    created_at REAL,
+                    last_referenced_at REAL,
+                    reference_count INTEGER)''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_blobs_last_referenced ON blobs (last_referenced_at)')
+            cursor.execute('SELECT phash, sha256, path FROM blobs WHERE phash IS NOT NULL ORDER BY created_at DESC LIMIT ?',
+                           (self.recent.maxlen,))
+            for phash, sha256, path in reversed(cursor.fetchall()):
+                self.recent.append((phash, EvidencePath(path, sha256, duplicate=True)))
+            conn.commit()
+
+    def path_for(self, sha256: str, extension: str) -> str:
+        shards = [sha256[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+        return os.path.join(self.root, *shards, sha256 + extension)
+
+    def find_near_duplicate(self, phash: int) -> Optional[EvidencePath]:
+        with self.lock:
+            for recent_phash, path in reversed(self.recent):
+                if bin(recent_phash ^ phash).count('1') <= self.phash_threshold:
+                    return path
+        return None
+
+    def reserve(self, sha256: str, extension: str, kind: str, phash: Optional[int] = None) -> Tuple[EvidencePath, bool]:
+        """Reference the blob for sha256, registering it if it is new.
+
+        Returns the blob's path and whether the caller still has to write it.
+        """
+        now = time.time()
+        with self.lock, sqlite3.connect(self.index_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT path FROM blobs WHERE sha256 = ?', (sha256,))
+            row = cursor.fetchone()
+            if row:
+                cursor.execute('UPDATE blobs SET last_referenced_at = ?, reference_count = reference_count + 1 WHERE sha256 = ?',
+                               (now, sha256))
+                return EvidencePath(row[0], sha256, duplicate=True), False
+            path = self.path_for(sha256, extension)
+            cursor.execute('''INSERT INTO blobs (sha256, path, kind, phash, created_at, last_referenced_at, reference_count)
+                              VALUES (?, ?, ?, ?, ?, ?, 1)''', (sha256, path, kind, phash, now, now))
+            if phash is not None:
+                self.recent.append((phash, EvidencePath(path, sha256, duplicate=True)))
+            return EvidencePath(path, sha256), True
+
+    def touch(self, sha256: str):
+        with self.lock, sqlite3.connect(self.index_path) as conn:
+            conn.execute('UPDATE blobs SET last_referenced_at = ?, reference_count = reference_count + 1 WHERE sha256 = ?',
+                         (time.time(), sha256))
+
+    def release(self, sha256: str):
+        """Forget a reservation whose blob was never written"""
+        with self.lock, sqlite3.connect(self.index_path) as conn:
+            conn.execute('DELETE FROM blobs WHERE sha256 = ? AND size IS NULL', (sha256,))
+            self.recent = deque(((h, p) for h, p in self.recent if p.sha256 != sha256), maxlen=self.recent.maxlen)
+
+    def record_file(self, sha256: str, path: str):
+        """Record the size and file hash once the blob is on disk"""
+        with open(path, 'rb') as f:
+            file_sha256 = hashlib.sha256(f.read()).hexdigest()
+        with self.lock, sqlite3.connect(self.index_path) as conn:
+            conn.execute('UPDATE blobs SET size = ?, file_sha256 = ? WHERE sha256 = ?',
+                         (os.path.getsize(path), file_sha256, sha256))
+
+    def verify(self, sha256: str) -> bool:
+        """Check that the stored blob still hashes to what was recorded when it was written"""
+        with sqlite3.connect(self.index_path) as conn:
+            row = conn.execute('SELECT path, file_sha256 FROM blobs WHERE sha256 = ?', (sha256,)).fetchone()
+        if not row or not row[1] or not os.path.exists(row[0]):
+            return False
+        with open(row[0], 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() == row[1]
+
+    def cleanup(self, max_age_days: int = 30) -> int:
+        """Delete blobs not referenced for max_age_days, found through the last-referenced index"""
+        cutoff_time = time.time() - (max_age_days * 86400)
+        removed = 0
+        with self.lock, sqlite3.connect(self.index_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT sha256, path FROM blobs WHERE last_referenced_at < ?', (cutoff_time,))
+            expired = cursor.fetchall()
+            for sha256, path in expired:
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Failed to remove evidence {path}: {e}")
+                    continue
+                cursor.execute('DELETE FROM blobs WHERE sha256 = ?', (sha256,))
+            expired_hashes = {sha256 for sha256, _ in expired}
+            self.recent = deque(((h, p) for h, p in self.recent if p.sha256 not in expired_hashes), maxlen=self.recent.maxlen)
+        logger.info(f"Evidence cleanup completed: {removed} blobs removed")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with sqlite3.connect(self.index_path) as conn:
+            blobs, references, total_bytes = conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(reference_count), 0), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+        return {
+            'blobs': blobs,
+            'references': references,
+            'deduplicated': references - blobs,
+            'bytes': total_bytes,
+        }
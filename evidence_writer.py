@@ -0,0 +1,425 @@
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+
+import metrics
+from evidence_store import EvidencePath, EvidenceStore, difference_hash
+
+logger = logging.getLogger(__name__)
+
+# codec -> (file extension, OpenCV quality flag, default quality)
+EVIDENCE_CODECS = {
+    'jpeg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY, 90),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY, 85),
+    'png': ('.png', cv2.IMWRITE_PNG_COMPRESSION, 3),
+}
+
+# Clips are stored as Motion-JPEG in AVI, so buffered JPEG frames need no other codec
+CLIP_EXTENSION = '.avi'
+CLIP_FOURCC = 'MJPG'
+
+_SHUTDOWN = object()
+
+class ClipBuffer:
+    """Rolling window of the last few seconds of frames, kept as JPEG bytes.
+
+    Slots are preallocated for seconds * fps frames and frames arriving faster
+    than fps are skipped. Memory is bounded twice: by the slot count and by
+    max_bytes, past which the oldest frames are evicted early.
+    """
+
+    def __init__(self, seconds: float = 5.0, fps: float = 10.0, quality: int = 70,
+                 max_bytes: int = 8 * 1024 * 1024):
+        self.fps = fps
+        self.capacity = max(1, int(seconds * fps))
+        self.max_bytes = max_bytes
+        self.encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)]
+        self.frames: List[Optional[bytes]] = [None] * self.capacity
+        self.timestamps = [0.0] * self.capacity
+        self.start = 0
+        self.count = 0
+        self.memory_bytes = 0
+        self.last_timestamp = None
+        self.lock = threading.Lock()
+
+    def _due(self, timestamp: float) -> bool:
+        # 10% slack so a source running at exactly fps is not halved by timing jitter
+        return self.last_timestamp is None or timestamp - self.last_timestamp >= 0.9 / self.fps
+
+    def add(self, frame, timestamp: Optional[float] = None) -> bool:
+        """Encode and buffer a raw frame; returns False if it was skipped by the frame-rate cap"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self._due(timestamp):
+            return False
+        ok, buffer = cv2.imencode('.jpg', frame, self.encode_params)
+        if not ok:
+            return False
+        return self.add_encoded(buffer.tobytes(), timestamp)
+
+    def add_encoded(self, data: bytes, timestamp: Optional[float] = None) -> bool:
+        """Buffer a frame that is already JPEG-encoded (e.g. straight from a browser)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.lock:
+            if not self._due(timestamp) or len(data) > self.max_bytes:
+                return False
+            if self.count == self.capacity:
+                self._evict_oldest()
+            while self.count and self.memory_bytes + len(data) > self.max_bytes:
+                self._evict_oldest()
+            slot = (self.start + self.count) % self.capacity
+            self.frames[slot] = data
+            self.timestamps[slot] = timestamp
+            self.count += 1
+            self.memory_bytes += len(data)
+            self.last_timestamp = timestamp
+            return True
+
+    def _evict_oldest(self):
+        self.memory_bytes -= len(self.frames[self.start])
+        self.frames[self.start] = None
+        self.start = (self.start + 1) % self.capacity
+        self.count -= 1
+
+    def snapshot(self) -> List[bytes]:
+        """Buffered frames, oldest first"""
+        with self.lock:
+            return [self.frames[(self.start + i) % self.capacity] for i in range(self.count)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            span = 0.0
+            if self.count > 1:
+                span = self.timestamps[(self.start + self.count - 1) % self.capacity] - self.timestamps[self.start]
+            return {
+                'frames': self.count,
+                'capacity': self.capacity,
+                'seconds_buffered': round(span, 2),
+                'memory_bytes': self.memory_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+class EvidenceWriter:
+    """Encode and write violation screenshots off the capture loop.
+
+    submit() copies the frame (submit_clip() snapshots a ClipBuffer), queues
+    it and returns the final file path immediately; worker threads do the
+    encode and an atomic write. The queue is bounded: with overflow='block' a
+    full queue stalls the caller (for at most put_timeout seconds before
+    dropping), with overflow='drop' the item is dropped at once. Both are
+    counted in stats(). close() drains everything already queued.
+
+    With an EvidenceStore, files are named by the SHA-256 of their encoded
+    bytes, which is only known once a worker has encoded them, so submit()
+    and submit_clip() return a Future instead of a path. It resolves to an
+    EvidencePath carrying that hash (or None if the write failed) and can be
+    awaited with asyncio.wrap_future(). Perceptual dedup also runs on the
+    worker; a reused blob is flagged near_duplicate. Without a store, a name
+    already in use gets a numeric suffix instead of being overwritten.
+    """
+
+    def __init__(self, codec: str = 'jpeg', quality: Optional[int] = None, max_queue: int = 32,
+                 workers: int = 1, overflow: str = 'block', put_timeout: Optional[float] = 2.0,
+                 store: Optional[EvidenceStore] = None):
+        if codec not in EVIDENCE_CODECS:
+            raise ValueError(f"Unsupported evidence codec: {codec} (expected one of {', '.join(EVIDENCE_CODECS)})")
+        if overflow not in ('block', 'drop'):
+            raise ValueError(f"Unsupported overflow policy: {overflow}")
+        self.codec = codec
+        self.extension, quality_flag, default_quality = EVIDENCE_CODECS[codec]
+        self.encode_params = [int(quality_flag), int(default_quality if quality is None else quality)]
+        self.overflow = overflow
+        self.put_timeout = put_timeout
+        self.store = store
+        self.reserved_paths = set()
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.closed = False
+        self.metrics = {
+            'submitted': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'deduplicated': 0,
+            'bytes_written': 0,
+            'max_queue_depth': 0,
+            'blocked_seconds': 0.0,
+            'encode_seconds': 0.0,
+        }
+        self.workers = [threading.Thread(target=self._worker, name=f"evidence-writer-{i}", daemon=True)
+                        for i in range(max(1, workers))]
+        for worker in self.workers:
+            worker.start()
+        atexit.register(self.close)
+
+    def submit(self, frame, name: str, directory: str = "log") -> Union[str, Future, None]:
+        """Queue a screenshot; returns its path (a Future of it with a store), or None if dropped"""
+        if self.closed:
+            raise RuntimeError("Evidence writer is closed")
+        # The capture loop keeps drawing on the frame, so the writer needs its own copy
+        if self.store is not None:
+            return self._enqueue_to_store(self._store_screenshot, frame.copy(), name)
+        path = self._reserve_path(directory, name, self.extension)
+        return self._enqueue((self._write, frame.copy(), path), path)
+
+    def _enqueue_to_store(self, write, payload, name: str) -> Optional[Future]:
+        future = Future()
+        if self._enqueue((write, payload, future), name) is None:
+            return None
+        return future
+
+    def _deduplicated(self, path: EvidencePath) -> EvidencePath:
+        with self.lock:
+            self.metrics['deduplicated'] += 1
+        return path
+
+    def _reserve_path(self, directory: str, name: str, extension: str) -> str:
+        # Names are usually built from whole seconds; never let a second violation overwrite the first
+        with self.lock:
+            path = os.path.join(directory, name + extension)
+            suffix = 1
+            while path in self.reserved_paths or os.path.exists(path):
+                path = os.path.join(directory, f"{name}_{suffix}{extension}")
+                suffix += 1
+            self.reserved_paths.add(path)
+            return path
+
+    def submit_clip(self, clip_buffer: ClipBuffer, name: str, directory: str = "log") -> Union[str, Future, None]:
+        """Queue the clip buffer's current contents as an MJPEG/AVI clip; returns its path as submit() does"""
+        if self.closed:
+            raise RuntimeError("Evidence writer is closed")
+        frames = clip_buffer.snapshot()
+        if not frames:
+            return None
+        if self.store is not None:
+            return self._enqueue_to_store(self._store_clip, (frames, clip_buffer.fps), name)
+        path = self._reserve_path(directory, name, CLIP_EXTENSION)
+        return self._enqueue((self._write_clip, (frames, clip_buffer.fps), path), path)
+
+    def _enqueue(self, item, path: str) -> Optional[str]:
+        start = time.perf_counter()
+        # Stamped with the enqueue time so the worker can observe how long it waited
+        item = item + (start,)
+        try:
+            if self.overflow == 'drop':
+                self.queue.put_nowait(item)
+            else:
+                self.queue.put(item, timeout=self.put_timeout)
+        except queue.Full:
+            with self.lock:
+                self.metrics['dropped'] += 1
+                self.metrics['blocked_seconds'] += time.perf_counter() - start
+            metrics.FRAMES_DROPPED.inc(reason='evidence_queue_full')
+            logger.error(f"Evidence queue full, dropped {path}")
+            with self.lock:
+                self.reserved_paths.discard(path)
+            return None
+        depth = self.queue.qsize()
+        with self.lock:
+            self.metrics['submitted'] += 1
+            self.metrics['blocked_seconds'] += time.perf_counter() - start
+            self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], depth)
+        return path
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _SHUTDOWN:
+                    return
+                write, payload, path, enqueued_at = item
+                metrics.QUEUE_WAIT.observe(time.perf_counter() - enqueued_at, queue='evidence')
+                try:
+                    write(payload, path)
+                finally:
+                    with self.lock:
+                        self.reserved_paths.discard(path)
+            finally:
+                self.queue.task_done()
+
+    def _write(self, frame, path: str):
+        start = time.perf_counter()
+        # Write then rename so a reader never sees a half-written file
+        tmp_path = path + '.tmp'
+        try:
+            ok, buffer = cv2.imencode(self.extension, frame, self.encode_params)
+            if not ok:
+                raise ValueError(f"{self.codec} encoding failed")
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(buffer.tobytes())
+            os.replace(tmp_path, path)
+            self._record_write(len(buffer), start)
+        except Exception as e:
+            self._discard_failed_write(path, tmp_path, e)
+
+    def _write_clip(self, clip, path: str):
+        frames, fps = clip
+        start = time.perf_counter()
+        root, extension = os.path.splitext(path)
+        tmp_path = root + '.tmp' + extension
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._encode_clip(frames, fps, tmp_path)
+            os.replace(tmp_path, path)
+            self._record_write(os.path.getsize(path), start)
+        except Exception as e:
+            self._discard_failed_write(path, tmp_path, e)
+
+    def _encode_clip(self, frames: List[bytes], fps: float, path: str):
+        writer = None
+        try:
+            for data in frames:
+                frame = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+                if writer is None:
+                    size = (frame.shape[1], frame.shape[0])
+                    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*CLIP_FOURCC), fps, size)
+                    if not writer.isOpened():
+                        raise ValueError("could not open video writer")
+                elif (frame.shape[1], frame.shape[0]) != size:
+                    frame = cv2.resize(frame, size)
+                writer.write(frame)
+        finally:
+            if writer is not None:
+                writer.release()
+        if writer is None:
+            raise ValueError("no decodable frames in clip")
+
+    def _store_screenshot(self, frame, future: Future):
+        start = time.perf_counter()
+        tmp_path = os.path.join(self.store.root, f".{uuid.uuid4().hex}.tmp{self.extension}")
+        try:
+            phash = None
+            if self.store.perceptual_dedup:
+                phash = difference_hash(frame)
+                near_duplicate = self.store.find_near_duplicate(phash)
+                if near_duplicate is not None:
+                    self.store.touch(near_duplicate.sha256)
+                    future.set_result(self._deduplicated(
+                        EvidencePath(near_duplicate, near_duplicate.sha256, duplicate=True, near_duplicate=True)))
+                    return
+            ok, buffer = cv2.imencode(self.extension, frame, self.encode_params)
+            if not ok:
+                raise ValueError(f"{self.codec} encoding failed")
+            data = buffer.tobytes()
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            self._commit_to_store(tmp_path, hashlib.sha256(data).hexdigest(), self.extension, 'image', phash,
+                                  future, start)
+        except Exception as e:
+            self._discard_failed_write('screenshot', tmp_path, e)
+        finally:
+            if not future.done():
+                future.set_result(None)
+
+    def _store_clip(self, clip, future: Future):
+        frames, fps = clip
+        start = time.perf_counter()
+        # The AVI is encoded under a temporary name first: its name is the hash of the finished file
+        tmp_path = os.path.join(self.store.root, f".{uuid.uuid4().hex}.tmp{CLIP_EXTENSION}")
+        try:
+            self._encode_clip(frames, fps, tmp_path)
+            digest = hashlib.sha256()
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            self._commit_to_store(tmp_path, digest.hexdigest(), CLIP_EXTENSION, 'clip', None, future, start)
+        except Exception as e:
+            self._discard_failed_write('clip', tmp_path, e)
+        finally:
+            if not future.done():
+                future.set_result(None)
+
+    def _commit_to_store(self, tmp_path: str, sha256: str, extension: str, kind: str, phash: Optional[int],
+                         future: Future, start: float):
+        """Move an encoded file into the store under the hash of its bytes, unless that blob is already stored"""
+        path, new = self.store.reserve(sha256, extension, kind, phash)
+        if not new:
+            os.remove(tmp_path)
+            future.set_result(self._deduplicated(path))
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            os.replace(tmp_path, path)
+            self.store.record_file(sha256, path)
+            self._record_write(os.path.getsize(path), start)
+            future.set_result(path)
+        except Exception as e:
+            self._discard_failed_write(path, tmp_path, e)
+
+    def _discard_failed_write(self, path: str, tmp_path: str, error: Exception):
+        # Leave no partial file behind, and no store reservation pointing at a blob that was never written
+        cleanup = [tmp_path]
+        if isinstance(path, EvidencePath):
+            self.store.release(path.sha256)
+            # An unrecorded blob is no longer indexed, so nothing would ever clean it up
+            cleanup.append(path)
+        for leftover in cleanup:
+            try:
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            except OSError as e:
+                logger.warning(f"Failed to remove partial evidence {leftover}: {e}")
+        self._record_failure(path, error)
+
+    def _record_write(self, size: int, start: float):
+        with self.lock:
+            self.metrics['written'] += 1
+            self.metrics['bytes_written'] += size
+            self.metrics['encode_seconds'] += time.perf_counter() - start
+
+    def _record_failure(self, path: str, error: Exception):
+        with self.lock:
+            self.metrics['failed'] += 1
+        logger.error(f"Failed to write evidence {path}: {error}")
+
+    def flush(self):
+        """Block until every queued screenshot has been written"""
+        self.queue.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.metrics)
+        stats['queue_depth'] = self.queue.qsize()
+        stats['queue_capacity'] = self.queue.maxsize
+        stats['codec'] = self.codec
+        if self.store is not None:
+            stats['store'] = self.store.stats()
+        return stats
+
+    def close(self):
+        """Stop accepting screenshots and drain the queue"""
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.workers:
+            self.queue.put(_SHUTDOWN)
+        for worker in self.workers:
+            worker.join()
+        atexit.unregister(self.close)
+
+evidence_writer = None
+
+def initialize_evidence_writer(codec: str = 'jpeg', quality: Optional[int] = None, max_queue: int = 32,
+                               workers: int = 1, overflow: str = 'block',
+                               store: Optional[EvidenceStore] = None) -> EvidenceWriter:
+    global evidence_writer
+    if evidence_writer is None:
+        evidence_writer = EvidenceWriter(codec=codec, quality=quality, max_queue=max_queue,
+                                         workers=workers, overflow=overflow, store=store)
+    return evidence_writer
+
+def get_evidence_writer() -> EvidenceWriter:
+    # Screenshot helpers may run before anything configured a writer; fall back to the defaults
+    return evidence_writer or initialize_evidence_writer()
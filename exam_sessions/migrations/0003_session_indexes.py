@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('exam_sessions', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examsession',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['user'], name='exam_session_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionevent',
+            index=models.Index(fields=['session', 'timestamp'], name='session_event_session_ts_idx'),
+        ),
+    ]
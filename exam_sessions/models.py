@@ -16,6 +16,10 @@ class ExamSession(models.Model):
     
     class Meta:
         ordering = ['-start_time']
+        indexes = [
+            # Only active sessions are looked up per user on hot paths
+            models.Index(fields=['user'], name='exam_session_active_user_idx', condition=models.Q(is_active=True)),
+        ]
     
     def __str__(self):
         return f"Session {self.session_id} - {self.user.username}"
@@ -41,6 +45,9 @@ class SessionEvent(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['session', 'timestamp'], name='session_event_session_ts_idx'),
+        ]
     
     def __str__(self):
         return f"{self.event_type} - {self.session.session_id}" 
\ No newline at end of file
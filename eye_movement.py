@@ -1,15 +1,9 @@
 import cv2
-import dlib
 import numpy as np
+from model_registry import get_model
+from tracing import get_tracer
 
-# Load dlib's face detector and 68 landmarks model
-try:
-    detector = dlib.get_frontal_face_detector()
-    predictor = dlib.shape_predictor("model/shape_predictor_68_face_landmarks.dat")
-except Exception as e:
-    print(f"Error loading dlib models: {e}")
-    detector = None
-    predictor = None
+tracer = get_tracer(__name__)
 
 def detect_pupil(eye_region):
     try:
@@ -31,16 +25,19 @@ def detect_pupil(eye_region):
         return None, None
 
 def process_eye_movement(frame):
-    print("[DEBUG] process_eye_movement called")
+    tracer.trace("process_eye_movement called")
     
     try:
+        # dlib's face detector and 68 landmarks model, shared with the other detectors and loaded on first use
+        detector = get_model('face_detector')
+        predictor = get_model('shape_predictor')
         if detector is None or predictor is None:
-            print("[DEBUG] Models not loaded, returning 'Models not loaded'")
+            tracer.warning("models not loaded")
             return frame, "Models not loaded"
             
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         faces = detector(gray)
-        print(f"[DEBUG] Found {len(faces)} faces")
+        tracer.debug("faces found", count=len(faces))
         gaze_direction = "No face detected"
 
         for face in faces:
@@ -58,7 +55,7 @@ def process_eye_movement(frame):
                 # Check if eye regions are valid
                 if (left_eye_rect[2] <= 0 or left_eye_rect[3] <= 0 or 
                     right_eye_rect[2] <= 0 or right_eye_rect[3] <= 0):
-                    print("[DEBUG] Invalid eye regions, continuing")
+                    tracer.debug("invalid eye regions")
                     continue
                 
                 # Extract eye regions
@@ -71,7 +68,7 @@ def process_eye_movement(frame):
                 left_pupil, left_bbox = detect_pupil(left_eye)
                 right_pupil, right_bbox = detect_pupil(right_eye)
                 
-                print(f"[DEBUG] Left pupil: {left_pupil}, Right pupil: {right_pupil}")
+                tracer.debug("pupils", left=left_pupil, right=right_pupil)
                 
                 # Draw bounding boxes and pupils
                 cv2.rectangle(frame, (left_eye_rect[0], left_eye_rect[1]), 
@@ -93,7 +90,7 @@ def process_eye_movement(frame):
                     eye_height = left_eye_rect[3]
                     
                     if eye_width <= 0 or eye_height <= 0:
-                        print("[DEBUG] Invalid eye dimensions, continuing")
+                        tracer.debug("invalid eye dimensions")
                         continue
                         
                     norm_ly, norm_ry = ly / eye_height, ry / eye_height
@@ -111,16 +108,16 @@ def process_eye_movement(frame):
                 else:
                     gaze_direction = "Pupils not detected"
                     
-                print(f"[DEBUG] Gaze direction determined: {gaze_direction}")
+                tracer.debug("gaze direction determined", gaze=gaze_direction)
                     
             except Exception as e:
-                print(f"[DEBUG] Error processing face: {e}")
+                tracer.error("error processing face", error=e)
                 gaze_direction = "Face processing error"
                 continue
     
     except Exception as e:
-        print(f"[DEBUG] Error in eye movement detection: {e}")
+        tracer.error("eye movement detection failed", error=e)
         gaze_direction = "Detection error"
     
-    print(f"[DEBUG] Final gaze direction: {gaze_direction}")
+    tracer.debug("final gaze direction", gaze=gaze_direction)
     return frame, gaze_direction
@@ -1,13 +1,12 @@
 import cv2
-import dlib
 import numpy as np
 import math
 from collections import deque
 import time
+from model_registry import get_model
+from tracing import get_tracer
 
-# Load face detector & landmarks predictor
-detector = dlib.get_frontal_face_detector()
-predictor = dlib.shape_predictor("model/shape_predictor_68_face_landmarks.dat")
+tracer = get_tracer(__name__)
 
 # 3D Model Points (Mapped to Facial Landmarks)
 model_points = np.array([
@@ -66,19 +65,25 @@ def smooth_angle(angle_history, new_angle):
     return np.mean(angle_history)
 
 def process_head_pose(frame, calibrated_angles=None):
-    print(f"[DEBUG] process_head_pose called with calibrated_angles: {calibrated_angles}")
+    tracer.trace("process_head_pose called", calibrated_angles=calibrated_angles)
     
+    detector = get_model('face_detector')
+    predictor = get_model('shape_predictor')
+    if detector is None or predictor is None:
+        tracer.warning("models not loaded")
+        return frame, None if calibrated_angles is None else "Models not loaded"
+
     gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
     faces = detector(gray)
     
-    print(f"[DEBUG] Found {len(faces)} faces")
+    tracer.debug("faces found", count=len(faces))
 
     if not faces:
         if calibrated_angles is None:
-            print("[DEBUG] No faces found during calibration, returning None")
+            tracer.debug("no face during calibration")
             return frame, None  # indicate no face for calibration
         else:
-            print("[DEBUG] No faces found, returning 'No face detected'")
+            tracer.debug("no face detected")
             return frame, "No face detected"
 
     # Assume one face
@@ -94,14 +99,14 @@ def process_head_pose(frame, calibrated_angles=None):
     ], dtype=np.float64)
 
     angles = get_head_pose_angles(image_points)
-    print(f"[DEBUG] Head pose angles: {angles}")
+    tracer.debug("head pose angles", angles=angles)
     
     if angles is None:
         if calibrated_angles is None:
-            print("[DEBUG] Failed to get angles during calibration, returning None")
+            tracer.warning("failed to get angles during calibration")
             return frame, None  # indicate failure for calibration
         else:
-            print("[DEBUG] Failed to get angles, returning 'Error getting angles'")
+            tracer.warning("failed to get angles")
             return frame, "Error getting angles"
 
     pitch, yaw, roll = angles
@@ -113,7 +118,7 @@ def process_head_pose(frame, calibrated_angles=None):
 
     if calibrated_angles is None:
         # During calibration, just return the smoothed angles
-        print(f"[DEBUG] Calibration mode, returning angles: ({pitch}, {yaw}, {roll})")
+        tracer.debug("calibration angles", pitch=pitch, yaw=yaw, roll=roll)
         return frame, (pitch, yaw, roll)
 
     # After calibration, determine head direction
@@ -138,5 +143,5 @@ def process_head_pose(frame, calibrated_angles=None):
     else:
         head_direction = "Looking at Screen"  # Default to looking at screen if in between states
 
-    print(f"[DEBUG] Head direction determined: {head_direction}")
+    tracer.debug("head direction determined", direction=head_direction)
     return frame, head_direction
@@ -1,18 +1,13 @@
 import cv2
-import dlib
 import numpy as np
 from collections import deque
 import time
 import os
+from evidence_writer import get_evidence_writer
+from model_registry import get_model
+from tracing import get_tracer
 
-# Load face detector & landmarks predictor
-try:
-    detector = dlib.get_frontal_face_detector()
-    predictor = dlib.shape_predictor("model/shape_predictor_68_face_landmarks.dat")
-except Exception as e:
-    print(f"Error loading dlib models for lip detection: {e}")
-    detector = None
-    predictor = None
+tracer = get_tracer(__name__)
 
 # Lip landmarks indices (based on the 68-point facial landmark model)
 UPPER_LIP_INDICES = [50, 51, 52, 53, 54]  # Upper lip outer contour
@@ -76,11 +71,13 @@ def process_lip_movement(frame, audio_level=0.0):
     """
     global previous_lip_state, lip_movement_start_time
     
-    print(f"[DEBUG] process_lip_movement called with audio_level: {audio_level}")
+    tracer.trace("process_lip_movement called", audio_level=audio_level)
     
     try:
+        detector = get_model('face_detector')
+        predictor = get_model('shape_predictor')
         if detector is None or predictor is None:
-            print("[DEBUG] Models not loaded, returning 'Models not loaded'")
+            tracer.warning("models not loaded")
             return frame, "Models not loaded", False
             
         # Convert to grayscale for face detection
@@ -88,7 +85,7 @@ def process_lip_movement(frame, audio_level=0.0):
         
         # Detect faces
         faces = detector(gray)
-        print(f"[DEBUG] Found {len(faces)} faces")
+        tracer.debug("faces found", count=len(faces))
         
         # Default states
         lip_state = "No Movement"
@@ -96,7 +93,7 @@ def process_lip_movement(frame, audio_level=0.0):
         
         # If no face is detected, return the original frame
         if len(faces) == 0:
-            print("[DEBUG] No faces detected, returning 'No Movement'")
+            tracer.debug("no face detected")
             return frame, lip_state, is_whispering
         
         # Process the first detected face
@@ -105,19 +102,19 @@ def process_lip_movement(frame, audio_level=0.0):
         
         # Calculate current lip distance
         current_lip_distance = calculate_lip_distance(landmarks)
-        print(f"[DEBUG] Current lip distance: {current_lip_distance}")
+        tracer.debug("lip distance", distance=current_lip_distance)
         
         # Get the previous distance from history (or use current if history is empty)
         prev_lip_distance = lip_distance_history[-1] if lip_distance_history else current_lip_distance
         
         # Calculate lip movement (change in distance)
         lip_movement = calculate_lip_movement(current_lip_distance, prev_lip_distance)
-        print(f"[DEBUG] Lip movement: {lip_movement}")
+        tracer.debug("lip movement", movement=lip_movement)
         
         # Apply smoothing
         smoothed_lip_distance = smooth_value(lip_distance_history, current_lip_distance)
         smoothed_lip_movement = smooth_value(lip_movement_history, lip_movement)
-        print(f"[DEBUG] Smoothed lip movement: {smoothed_lip_movement}")
+        tracer.debug("smoothed lip movement", movement=smoothed_lip_movement)
         
         # Determine lip state based on movement
         if smoothed_lip_movement > LIP_MOVEMENT_THRESHOLD:
@@ -137,7 +134,7 @@ def process_lip_movement(frame, audio_level=0.0):
         else:
             lip_state = "No Movement"
         
-        print(f"[DEBUG] Lip state determined: {lip_state}, is_whispering: {is_whispering}")
+        tracer.debug("lip state determined", state=lip_state, whispering=is_whispering)
         
         # Draw lip landmarks and status on the frame
         try:
@@ -145,7 +142,7 @@ def process_lip_movement(frame, audio_level=0.0):
                 pt = (landmarks.part(i).x, landmarks.part(i).y)
                 cv2.circle(frame, pt, 1, (0, 255, 255), -1)
         except Exception as e:
-            print(f"[DEBUG] Error drawing lip landmarks: {e}")
+            tracer.error("error drawing lip landmarks", error=e)
         
         # Draw lip distance value
         cv2.putText(frame, f"Lip Movement: {smoothed_lip_movement:.3f}", 
@@ -176,15 +173,15 @@ def process_lip_movement(frame, audio_level=0.0):
         return frame, lip_state, is_whispering
         
     except Exception as e:
-        print(f"[DEBUG] Error in lip movement detection: {e}")
+        tracer.error("lip movement detection failed", error=e)
         return frame, "Detection error", False
 
 def save_lip_movement_screenshot(frame, lip_state, log_dir="log"):
     """Save a screenshot when lip movement is detected"""
     try:
-        filename = os.path.join(log_dir, f"lip_{lip_state}_{int(time.time())}.png")
-        cv2.imwrite(filename, frame)
-        print(f"Lip movement screenshot saved: {filename}")
+        name = f"lip_{lip_state}_{int(time.time())}"
+        filename = get_evidence_writer().submit(frame, name, log_dir)
+        print(f"Lip movement screenshot queued: {name}")
         return filename
     except Exception as e:
         print(f"Error saving lip movement screenshot: {e}")
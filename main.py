@@ -1,6 +1,7 @@
 import cv2
 import time
 import os
+import signal
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from eye_movement import process_eye_movement
@@ -8,16 +9,23 @@ from head_pose import process_head_pose
 from mobile_detection import process_mobile_detection
 from lip_movement import process_lip_movement, save_lip_movement_screenshot
 from emotion_detection import process_emotion_detection, initialize_emotion_detection, save_emotion_screenshot
+from evidence_writer import initialize_evidence_writer, ClipBuffer
+from evidence_store import EvidenceStore
+from model_registry import warm_up_models
+import metrics
+import profiling
 
 # Import blockchain logging system
 from blockchain_integration import initialize_blockchain_integration, get_blockchain_integration
 
-# Initialize video capture from file
-cap = cv2.VideoCapture(0)
+# Initialize video capture: a camera index, or a recorded file such as 'vdo.mp4'
+# (benchmarks/bench_detection.py replays recordings without the display loop)
+VIDEO_SOURCE = os.environ.get("VIDEO_SOURCE", "0")
+cap = cv2.VideoCapture(int(VIDEO_SOURCE) if VIDEO_SOURCE.isdigit() else VIDEO_SOURCE)
 
-# Check if video file opened successfully
+# Check if the video source opened successfully
 if not cap.isOpened():
-    print("Error: Could not open video file 'vdo.mp4'")
+    print(f"Error: Could not open video source '{VIDEO_SOURCE}'")
     exit()
 
 # Get video properties
@@ -32,11 +40,53 @@ print(f"Video Info: {frame_width}x{frame_height}, {fps_video:.2f} FPS, {total_fr
 log_dir = "log"
 os.makedirs(log_dir, exist_ok=True)
 
+# Screenshots are encoded and written on a background thread so a violation never stalls capture
+EVIDENCE_CODEC = "jpeg"  # jpeg, webp or png (lossless, slowest)
+EVIDENCE_QUALITY = 90
+EVIDENCE_STORE_DIR = "evidence"  # named by the SHA-256 of each file; blockchain events carry the same hashes
+# Opt-in: reuse a stored, nearly identical screenshot instead of this capture (flagged on chain as a near duplicate)
+EVIDENCE_PERCEPTUAL_DEDUP = os.environ.get("EVIDENCE_PERCEPTUAL_DEDUP", "0") == "1"
+evidence_writer = initialize_evidence_writer(
+    codec=EVIDENCE_CODEC,
+    quality=EVIDENCE_QUALITY,
+    store=EvidenceStore(EVIDENCE_STORE_DIR, perceptual_dedup=EVIDENCE_PERCEPTUAL_DEDUP)
+)
+
+# The seconds leading up to each violation are kept as JPEG frames and saved as a clip alongside the screenshot
+CLIP_SECONDS = 5
+CLIP_FPS = 10
+clip_buffer = ClipBuffer(seconds=CLIP_SECONDS, fps=CLIP_FPS)
+
+# Press 'p' in the video window (or send SIGUSR1) to capture a sampling profile of the whole process;
+# the folded stacks in log/profiles open in flamegraph.pl or speedscope
+PROFILE_DIR = os.path.join(log_dir, "profiles")
+PROFILE_SECONDS = 30
+
+def start_profile(*_):
+    try:
+        capture = profiling.start_capture(PROFILE_DIR, PROFILE_SECONDS)
+        print(f"Profiling for {PROFILE_SECONDS}s into {capture.path}")
+    except ValueError as e:
+        print(f"Profile not started: {e}")
+
+if hasattr(signal, "SIGUSR1"):
+    signal.signal(signal.SIGUSR1, start_profile)
+
 # Initialize blockchain logging system
 print("Initializing blockchain logging system...")
 blockchain_integration = initialize_blockchain_integration()
 print("Blockchain logging system initialized successfully!")
 
+# The dashboards are served by the Django process; a shared channel layer carries this process's events to them
+if os.environ.get("CHANNEL_REDIS_URL"):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "surveillance_system.settings")
+    from blockchain.consumers import start_process_publisher
+    blockchain_integration.logger.add_listener(start_process_publisher())
+    print("Publishing blockchain events to the dashboards")
+
+# Load the detector models (dlib, YOLO) in parallel before the first frame instead of on first use
+print(f"Detector models loaded: {warm_up_models(['face_detector', 'shape_predictor', 'mobile_yolo'], parallel=True)}")
+
 # Initialize emotion detection
 emotion_detector = initialize_emotion_detection()
 
@@ -93,7 +143,8 @@ print(f"Emotion detection: every {EMOTION_DETECTION_INTERVAL} frames")
 def process_mobile_async(frame):
     """Process mobile detection asynchronously"""
     try:
-        _, mobile_detected = process_mobile_detection(frame)
+        with metrics.DETECTOR_LATENCY.time(detector='mobile_detection'):
+            _, mobile_detected = process_mobile_detection(frame)
         return mobile_detected
     except Exception as e:
         print(f"Error in mobile detection: {e}")
@@ -102,7 +153,8 @@ def process_mobile_async(frame):
 def process_emotion_async(frame):
     """Process emotion detection asynchronously"""
     try:
-        _, current_emotion, stress_detected, fear_detected, overconfidence_detected = process_emotion_detection(frame, emotion_detector)
+        with metrics.DETECTOR_LATENCY.time(detector='emotion_detection'):
+            _, current_emotion, stress_detected, fear_detected, overconfidence_detected = process_emotion_detection(frame, emotion_detector)
         return current_emotion, stress_detected, fear_detected, overconfidence_detected
     except Exception as e:
         print(f"Error in emotion detection: {e}")
@@ -147,6 +199,7 @@ while True:
         eye_start_time = time.time()
         frame, gaze_direction = process_eye_movement(frame)
         eye_time = time.time() - eye_start_time
+        metrics.DETECTOR_LATENCY.observe(eye_time, detector='eye_movement')
         cv2.putText(frame, f"Gaze Direction: {gaze_direction}", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
     except Exception as e:
         print(f"Error in eye movement detection: {e}")
@@ -171,6 +224,7 @@ while True:
                 head_direction = "Calibration Failed"
                 cv2.putText(frame, f"Head Direction: {head_direction}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
         head_time = time.time() - head_start_time
+        metrics.DETECTOR_LATENCY.observe(head_time, detector='head_pose')
     except Exception as e:
         print(f"Error in head pose detection: {e}")
         head_direction = "Error"
@@ -181,6 +235,7 @@ while True:
         lip_start_time = time.time()
         frame, lip_state, is_whispering = process_lip_movement(frame, 0.0)
         lip_time = time.time() - lip_start_time
+        metrics.DETECTOR_LATENCY.observe(lip_time, detector='lip_movement')
         cv2.putText(frame, f"Lip State: {lip_state}", (20, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
         cv2.putText(frame, f"Whispering: {is_whispering}", (20, 180), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
     except Exception as e:
@@ -241,17 +296,22 @@ while True:
     
     # --- Performance Timers ---
     total_time = time.time() - total_start_time
+    metrics.FRAME_PROCESSING_LATENCY.observe(total_time)
+    metrics.FRAMES_PROCESSED.inc()
     fps = 1 / total_time if total_time > 0 else 0
     print(f"Frame {frame_count} | FPS: {fps:.2f} | Eye: {eye_time:.3f}s | Head: {head_time:.3f}s | Mobile: {mobile_time:.3f}s | Lip: {lip_time:.3f}s | Emotion: {emotion_time:.3f}s")
 
+    clip_buffer.add(frame)
+
     # Check for head misalignment and log to blockchain
     if head_direction != "Looking at Screen" and head_direction != "Calibration Failed" and head_direction != "Error":
         if head_misalignment_start_time is None:
             head_misalignment_start_time = time.time()
         elif time.time() - head_misalignment_start_time >= 3:
-            filename = os.path.join(log_dir, f"head_{head_direction}_{int(time.time())}.png")
-            cv2.imwrite(filename, frame)
-            print(f"Screenshot saved: {filename}")
+            name = f"head_{head_direction}_{int(time.time())}"
+            filename = evidence_writer.submit(frame, name, log_dir)
+            clip_path = evidence_writer.submit_clip(clip_buffer, name, log_dir)
+            print(f"Screenshot queued: {name}")
             
             # Log to blockchain
             try:
@@ -262,6 +322,7 @@ while True:
                     metadata={
                         'frame_count': frame_count,
                         'duration': 3.0,
+                        'clip_path': clip_path,
                         'previous_state': previous_head_state
                     }
                 )
@@ -278,9 +339,10 @@ while True:
         if eye_misalignment_start_time is None:
             eye_misalignment_start_time = time.time()
         elif time.time() - eye_misalignment_start_time >= 3:
-            filename = os.path.join(log_dir, f"eye_{gaze_direction}_{int(time.time())}.png")
-            cv2.imwrite(filename, frame)
-            print(f"Screenshot saved: {filename}")
+            name = f"eye_{gaze_direction}_{int(time.time())}"
+            filename = evidence_writer.submit(frame, name, log_dir)
+            clip_path = evidence_writer.submit_clip(clip_buffer, name, log_dir)
+            print(f"Screenshot queued: {name}")
             
             # Log to blockchain
             try:
@@ -291,6 +353,7 @@ while True:
                     metadata={
                         'frame_count': frame_count,
                         'duration': 3.0,
+                        'clip_path': clip_path,
                         'previous_state': previous_eye_state
                     }
                 )
@@ -307,9 +370,10 @@ while True:
         if mobile_detection_start_time is None:
             mobile_detection_start_time = time.time()
         elif time.time() - mobile_detection_start_time >= 3:
-            filename = os.path.join(log_dir, f"mobile_detected_{int(time.time())}.png")
-            cv2.imwrite(filename, frame)
-            print(f"Screenshot saved: {filename}")
+            name = f"mobile_detected_{int(time.time())}"
+            filename = evidence_writer.submit(frame, name, log_dir)
+            clip_path = evidence_writer.submit_clip(clip_buffer, name, log_dir)
+            print(f"Screenshot queued: {name}")
             
             # Log to blockchain
             try:
@@ -319,6 +383,7 @@ while True:
                     metadata={
                         'frame_count': frame_count,
                         'duration': 3.0,
+                        'clip_path': clip_path,
                         'previous_state': previous_mobile_state
                     }
                 )
@@ -342,6 +407,8 @@ while True:
                 # If lips are moving but no mobile is detected, it might be whispering
                 filename = save_lip_movement_screenshot(frame, "Possible_Whispering", log_dir)
             
+            clip_path = evidence_writer.submit_clip(clip_buffer, f"lip_{lip_state}_{int(time.time())}", log_dir)
+            
             # Log to blockchain
             try:
                 blockchain_integration.log_lip_movement(
@@ -352,6 +419,7 @@ while True:
                     metadata={
                         'frame_count': frame_count,
                         'duration': 3.0,
+                        'clip_path': clip_path,
                         'previous_state': previous_lip_state,
                         'mobile_detected': mobile_detected
                     }
@@ -377,6 +445,8 @@ while True:
             elif overconfidence_detected:
                 filename = save_emotion_screenshot(frame, "Overconfidence", log_dir)
             
+            clip_path = evidence_writer.submit_clip(clip_buffer, f"emotion_{current_emotion}_{int(time.time())}", log_dir)
+            
             # Log to blockchain
             try:
                 blockchain_integration.log_emotion_detection(
@@ -389,6 +459,7 @@ while True:
                     metadata={
                         'frame_count': frame_count,
                         'duration': 3.0,
+                        'clip_path': clip_path,
                         'previous_state': previous_emotion_state
                     }
                 )
@@ -404,14 +475,23 @@ while True:
     cv2.imshow("Optimized Combined Detection with Blockchain Logging", frame)
     
     # Add delay to make video playback visible (adjust as needed)
-    if cv2.waitKey(30) & 0xFF == ord('q'):  # 30ms delay, press 'q' to quit
+    key = cv2.waitKey(30) & 0xFF
+    if key == ord('q'):  # 30ms delay, press 'q' to quit
         break
+    if key == ord('p'):
+        start_profile()
 
 # Cleanup
+profiling.stop_capture()
 executor.shutdown(wait=True)
 cap.release()
 cv2.destroyAllWindows()
 
+# Write out any screenshots still queued
+evidence_writer.close()
+print(f"Evidence writer drained: {evidence_writer.stats()}")
+print(f"Clip buffer memory: {clip_buffer.stats()}")
+
 # Flush any pending blockchain events before exit
 try:
     blockchain_integration.flush_pending_events()
@@ -419,5 +499,10 @@ try:
 except Exception as e:
     print(f"Error flushing pending events: {e}")
 
+# Latency histograms for the run, in Prometheus text format (node_exporter textfile collector can pick this up)
+with open(os.path.join(log_dir, "metrics.prom"), "w") as f:
+    f.write(metrics.render_prometheus())
+print(f"Metrics written to {os.path.join(log_dir, 'metrics.prom')}")
+
 print("Optimized video processing with blockchain logging completed!")
 print("Blockchain logs saved to database. Use the dashboard to view detailed statistics.")
@@ -0,0 +1,133 @@
+"""
+Shared, lazily loaded model handles.
+
+Detector modules ask for models by name instead of loading them at import:
+
+    predictor = get_model('shape_predictor')
+
+Each model is loaded once per process on first use (concurrent callers wait
+for the same load) and shared by every detector, so the 68-landmark predictor
+is read once rather than by each of eye_movement, head_pose and lip_movement,
+and processes that never run inference (manage.py commands, Celery workers)
+never import dlib, torch or mediapipe. warm_up_models() loads them ahead of
+the first frame, in parallel threads by default.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SHAPE_PREDICTOR_PATH = "model/shape_predictor_68_face_landmarks.dat"
+MOBILE_MODEL_PATH = "model/best.pt"
+
+class ModelRegistry:
+    def __init__(self):
+        self.loaders: Dict[str, Callable[[], Any]] = {}
+        self.models: Dict[str, Any] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.locks: Dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        with self.lock:
+            self.loaders[name] = loader
+            self.locks.setdefault(name, threading.Lock())
+            self.models.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """The loaded model, loading it on first use; None if loading failed"""
+        try:
+            return self.models[name]
+        except KeyError:
+            pass
+        if name not in self.loaders:
+            raise KeyError(f"Unknown model '{name}'")
+        with self.locks[name]:
+            if name not in self.models:
+                start = time.perf_counter()
+                try:
+                    model = self.loaders[name]()
+                except Exception as e:
+                    # Cached as None like the old import-time loaders, so a missing file is not retried every frame
+                    logger.error(f"Error loading model {name}: {e}")
+                    self.errors[name] = str(e)
+                    model = None
+                self.load_seconds[name] = time.perf_counter() - start
+                self.models[name] = model
+        return self.models[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self.models
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, parallel: bool = True,
+                max_workers: Optional[int] = None) -> Dict[str, float]:
+        """Load models ahead of first use and return each one's load time in seconds"""
+        names = list(names or self.loaders)
+        start = time.perf_counter()
+        if parallel and len(names) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers or len(names), thread_name_prefix='model-warmup') as executor:
+                list(executor.map(self.get, names))
+        else:
+            for name in names:
+                self.get(name)
+        logger.info(f"Warmed up {len(names)} models in {time.perf_counter() - start:.2f}s")
+        return {name: round(self.load_seconds.get(name, 0.0), 3) for name in names}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'registered': sorted(self.loaders),
+            'loaded': sorted(name for name, model in self.models.items() if model is not None),
+            'load_seconds': {name: round(seconds, 3) for name, seconds in self.load_seconds.items()},
+            'errors': dict(self.errors),
+        }
+
+def _load_face_detector():
+    import dlib
+    return dlib.get_frontal_face_detector()
+
+def _load_shape_predictor():
+    import dlib
+    return dlib.shape_predictor(SHAPE_PREDICTOR_PATH)
+
+def _load_mobile_model():
+    if not os.path.exists(MOBILE_MODEL_PATH):
+        print(f"Warning: Model file {MOBILE_MODEL_PATH} not found. Mobile detection will be disabled.")
+        return None
+    import torch
+    from ultralytics import YOLO
+    model = YOLO(MOBILE_MODEL_PATH)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print(f"Mobile detection model loaded on {device}")
+    model.to(device)
+    return model
+
+def _load_face_mesh():
+    import mediapipe as mp
+    return mp.solutions.face_mesh
+
+_registry = ModelRegistry()
+_registry.register('face_detector', _load_face_detector)
+_registry.register('shape_predictor', _load_shape_predictor)
+_registry.register('mobile_yolo', _load_mobile_model)
+# The mediapipe solution module; FaceMesh instances keep tracking state, so each session builds its own
+_registry.register('face_mesh', _load_face_mesh)
+
+def get_model_registry() -> ModelRegistry:
+    return _registry
+
+def get_model(name: str) -> Any:
+    return _registry.get(name)
+
+def warm_up_models(names: Optional[Iterable[str]] = None, parallel: bool = True,
+                   background: bool = False) -> Optional[Dict[str, float]]:
+    """Load models before the first frame; with background=True, return at once and load on a thread"""
+    if background:
+        threading.Thread(target=_registry.warm_up, args=(names, parallel), name='model-warmup', daemon=True).start()
+        return None
+    return _registry.warm_up(names, parallel)
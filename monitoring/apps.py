@@ -3,4 +3,13 @@ from django.apps import AppConfig
 
 class MonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'monitoring' 
\ No newline at end of file
+    name = 'monitoring'
+
+    def ready(self):
+        from django.conf import settings
+        from evidence_store import EvidenceStore
+        from evidence_writer import initialize_evidence_writer
+        initialize_evidence_writer(store=EvidenceStore(
+            str(settings.EVIDENCE_DIR),
+            perceptual_dedup=getattr(settings, 'EVIDENCE_PERCEPTUAL_DEDUP', False)
+        ))
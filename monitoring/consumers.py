@@ -1,19 +1,24 @@
 import json
+import re
 import cv2
 import base64
 import numpy as np
 import time
 from channels.generic.websocket import AsyncWebsocketConsumer
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 from django.contrib.auth.models import AnonymousUser
 from violations.models import Violation
 from exam_sessions.models import ExamSession, SessionEvent
 from django.utils import timezone
 import asyncio
 from asgiref.sync import sync_to_async
-import mediapipe as mp
-import dlib
-from scipy.spatial import distance as dist
+from django.conf import settings
+from .stats import SessionStats
+from evidence_writer import ClipBuffer, get_evidence_writer
+from tracing import get_tracer
+import metrics
+import profiling
+from model_registry import get_model
 
 # Import your detection functions
 from eye_movement import process_eye_movement
@@ -22,11 +27,42 @@ from mobile_detection import process_mobile_detection
 from lip_movement import process_lip_movement
 from emotion_detection import process_emotion_detection, initialize_emotion_detection
 
+tracer = get_tracer(__name__)
+
+# Session ids become part of channel group names, which only allow these characters
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_.-]{1,64}')
+
+# Tile state a proctor wall receives per candidate; everything else in a frame response stays local
+TILE_FIELDS = ('gaze_direction', 'head_direction', 'lip_state', 'mobile_detected', 'emotion', 'confidence')
+
+def candidate_group(session_id):
+    """Group the candidate's own MonitoringConsumer listens on for proctor watch leases"""
+    return f"monitoring_session_{session_id}"
+
+def proctor_group(session_id):
+    """Group proctor walls join to receive a candidate's tiles"""
+    return f"proctor_session_{session_id}"
+
+def encode_thumbnail(frame, width):
+    """Downscale a frame to a small JPEG data URL for a proctor tile"""
+    h, w = frame.shape[:2]
+    if w > width:
+        frame = cv2.resize(frame, (width, int(h * width / w)), interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 60])
+    if not ok:
+        return None
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer).decode('ascii')
+
 class MonitoringConsumer(AsyncWebsocketConsumer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.user = None
         self.active_session = None
+        self.session_stats = None
+        self.clip_buffer = None
+        self.watched_until = 0
+        self.last_tile_time = 0
+        self.last_thumbnail_time = 0
         self.calibrated_angles = None
         self.calibration_start_time = None
         self.calibration_duration = 3.0
@@ -47,9 +83,7 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
         self.executor = ThreadPoolExecutor(max_workers=4)
         self.emotion_detector = None
         
-        # Initialize MediaPipe and dlib components
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_drawing = mp.solutions.drawing_utils
+        # MediaPipe and dlib components; the models come from the shared registry in connect()
         self.face_mesh = None
         self.predictor = None
         self.detector = None
@@ -60,22 +94,19 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
         print("WebSocket connection accepted.")
 
         try:
-            # Initialize MediaPipe Face Mesh
-            self.face_mesh = self.mp_face_mesh.FaceMesh(
+            # Initialize MediaPipe Face Mesh (per session: it tracks the face between frames)
+            self.face_mesh = get_model('face_mesh').FaceMesh(
                 max_num_faces=1,
                 refine_landmarks=True,
                 min_detection_confidence=0.5,
                 min_tracking_confidence=0.5
             )
             
-            # Initialize dlib face detector and predictor
-            self.detector = dlib.get_frontal_face_detector()
-            # Make sure you have the shape predictor file
-            try:
-                self.predictor = dlib.shape_predictor('shape_predictor_68_face_landmarks.dat')
-            except:
+            # dlib face detector and predictor, loaded once per process and shared by every session
+            self.detector = get_model('face_detector')
+            self.predictor = get_model('shape_predictor')
+            if self.predictor is None:
                 print("Warning: dlib shape predictor not found. Some features may be limited.")
-                self.predictor = None
             
             self.executor = ThreadPoolExecutor(max_workers=4)
             self.emotion_detector = initialize_emotion_detection()
@@ -117,9 +148,22 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
                 self.active_session, created = await self.get_or_create_session()
                 if created:
                     print(f"Created new session: {self.active_session.session_id}")
+                await self.load_session_stats()
+                # Bounded per session: at most EVIDENCE_CLIP_MAX_BYTES of recent JPEG frames
+                self.clip_buffer = ClipBuffer(
+                    seconds=settings.EVIDENCE_CLIP_SECONDS,
+                    fps=settings.EVIDENCE_CLIP_FPS,
+                    max_bytes=settings.EVIDENCE_CLIP_MAX_BYTES
+                )
+                if self.active_session:
+                    await self.channel_layer.group_add(candidate_group(self.active_session.session_id), self.channel_name)
 
             print("WebSocket resources initialized successfully.")
+            metrics.ACTIVE_SESSIONS.inc()
+            self.session_counted = True
             await self.send(text_data=json.dumps({'status': 'connected'}))
+            if self.session_stats is not None:
+                await self.send(text_data=json.dumps({'type': 'session_stats', **self.session_stats.snapshot()}))
 
         except Exception as e:
             print(f"Error during WebSocket initialization: {e}")
@@ -240,12 +284,12 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
                 
                 # Calculate mouth aspect ratio (MAR)
                 # Vertical distances
-                A = dist.euclidean(lip_points[13], lip_points[19])  # 61, 67
-                B = dist.euclidean(lip_points[14], lip_points[18])  # 62, 66
-                C = dist.euclidean(lip_points[15], lip_points[17])  # 63, 65
+                A = np.linalg.norm(lip_points[13] - lip_points[19])  # 61, 67
+                B = np.linalg.norm(lip_points[14] - lip_points[18])  # 62, 66
+                C = np.linalg.norm(lip_points[15] - lip_points[17])  # 63, 65
                 
                 # Horizontal distance
-                D = dist.euclidean(lip_points[0], lip_points[12])   # 48, 60
+                D = np.linalg.norm(lip_points[0] - lip_points[12])   # 48, 60
                 
                 # Calculate MAR
                 mar = (A + B + C) / (3.0 * D)
@@ -363,6 +407,16 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
             print(f"Error getting active session: {e}")
             return None
 
+    async def load_session_stats(self):
+        """Seed the in-memory counters pushed to the client as violations are logged"""
+        try:
+            stats = SessionStats(self.user.id)
+            await sync_to_async(stats.load)(self.user, self.active_session)
+            self.session_stats = stats
+        except Exception as e:
+            print(f"Error loading session stats: {e}")
+            self.session_stats = None
+
     async def save_session(self, session):
         """Save session to database"""
         try:
@@ -371,6 +425,20 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
             print(f"Error saving session: {e}")
 
     async def disconnect(self, close_code):
+        profiling.stop_capture(target=self, wait=False)
+        if getattr(self, 'session_counted', False):
+            metrics.ACTIVE_SESSIONS.dec()
+            self.session_counted = False
+        if self.active_session:
+            await self.channel_layer.group_discard(candidate_group(self.active_session.session_id), self.channel_name)
+            if time.time() < self.watched_until:
+                await self.channel_layer.group_send(proctor_group(self.active_session.session_id), {
+                    'type': 'proctor.tile',
+                    'session_id': self.active_session.session_id,
+                    'tile': {'online': False}
+                })
+        if self.clip_buffer is not None:
+            print(f"Clip buffer memory at disconnect: {self.clip_buffer.stats()}")
         if hasattr(self, 'executor'):
             self.executor.shutdown(wait=False, cancel_futures=True)
         if hasattr(self, 'face_mesh'):
@@ -402,16 +470,22 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
 
             # Decode the image
             try:
+                decode_start = time.perf_counter()
                 header, encoded = image_data.split(",", 1)
                 decoded_image = base64.b64decode(encoded)
                 image = np.frombuffer(decoded_image, np.uint8)
                 frame = cv2.imdecode(image, cv2.IMREAD_COLOR)
+                metrics.FRAME_DECODE_LATENCY.observe(time.perf_counter() - decode_start)
                 
                 if frame is None:
                     raise ValueError("Failed to decode frame")
+                if self.clip_buffer is not None:
+                    # The browser already sends JPEG, so the clip buffer keeps those bytes as they are
+                    self.clip_buffer.add_encoded(decoded_image)
                     
             except Exception as e:
                 print(f"Error decoding image: {e}")
+                metrics.FRAMES_DROPPED.inc(reason='decode_error')
                 await self.send(text_data=json.dumps({'status': 'error', 'message': 'Image decode error'}))
                 return
             
@@ -452,14 +526,19 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
             
             try:
                 # Real-time detections - run every frame for responsiveness
-                results['gaze_direction'] = self.detect_eye_movement_realtime(frame)
-                results['head_direction'] = self.detect_head_pose_realtime(frame)
-                results['lip_state'] = self.detect_lip_movement_realtime(frame)
-                results['emotion'] = self.detect_emotion_realtime(frame)
+                with metrics.DETECTOR_LATENCY.time(detector='eye_movement'):
+                    results['gaze_direction'] = self.detect_eye_movement_realtime(frame)
+                with metrics.DETECTOR_LATENCY.time(detector='head_pose'):
+                    results['head_direction'] = self.detect_head_pose_realtime(frame)
+                with metrics.DETECTOR_LATENCY.time(detector='lip_movement'):
+                    results['lip_state'] = self.detect_lip_movement_realtime(frame)
+                with metrics.DETECTOR_LATENCY.time(detector='emotion_detection'):
+                    results['emotion'] = self.detect_emotion_realtime(frame)
 
                 # Mobile detection: run every N frames for performance
                 if self.frame_count % self.mobile_detected_interval == 0:
-                    results['mobile_detected'] = self.detect_mobile_phone_realtime(frame)
+                    with metrics.DETECTOR_LATENCY.time(detector='mobile_detection'):
+                        results['mobile_detected'] = self.detect_mobile_phone_realtime(frame)
                     self.mobile_detected_cache = results['mobile_detected']
                 else:
                     results['mobile_detected'] = self.mobile_detected_cache
@@ -469,7 +548,7 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
                     if value is not None:
                         self.last_results[key] = value
 
-                print(f"[REAL-TIME DEBUG] Detection results: {results}")
+                tracer.debug("detection results", frame=self.frame_count, results=results)
 
             except Exception as e:
                 print(f"Detection Error: {e}")
@@ -482,6 +561,8 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
 
             # --- Calculate Processing Time ---
             processing_time = (time.time() - processing_start_time) * 1000
+            metrics.FRAME_PROCESSING_LATENCY.observe(processing_time / 1000)
+            metrics.FRAMES_PROCESSED.inc()
             
             # --- Calculate Confidence ---
             confidence = self.calculate_confidence(results)
@@ -505,13 +586,56 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
             if detection_errors:
                 response['detection_errors'] = detection_errors
             
-            print(f"[REAL-TIME MONITORING] Frame {self.frame_count}: {response}")
+            tracer.debug("frame processed", frame=self.frame_count, response=response)
             await self.send(text_data=json.dumps(response))
+            await self.publish_tile(frame, response)
             
         except Exception as e:
             print(f"Critical error in receive: {e}")
             await self.send(text_data=json.dumps({'status': 'error', 'message': str(e)}))
 
+    async def proctor_watch(self, event):
+        """A proctor wall is displaying this candidate; publish tiles until the lease lapses"""
+        if time.time() >= self.watched_until:
+            # New watcher: send state and a thumbnail on the next frame
+            self.last_tile_time = 0
+            self.last_thumbnail_time = 0
+        self.watched_until = max(self.watched_until, time.time() + event['ttl'])
+
+    async def profile_start(self, event):
+        """An admin asked for a sampling profile of this session; it is written when the time box ends"""
+        try:
+            capture = profiling.start_capture(str(settings.PROFILE_DIR), event['seconds'], settings.PROFILE_INTERVAL,
+                                              target=self, name=event['name'])
+            print(f"Profiling session {self.active_session.session_id} for {event['seconds']}s into {capture.path}")
+        except ValueError as e:
+            print(f"Profile not started: {e}")
+
+    async def publish_tile(self, frame, response):
+        """Send compact state (and occasionally a thumbnail) to proctor walls watching this session.
+        
+        Nothing is encoded or sent unless a proctor holds a watch lease, and
+        then only at the tile rates, never at the candidate's frame rate.
+        """
+        if not self.active_session:
+            return
+        now = time.time()
+        if now >= self.watched_until or now - self.last_tile_time < settings.PROCTOR_TILE_INTERVAL:
+            return
+        self.last_tile_time = now
+        tile = {field: response[field] for field in TILE_FIELDS}
+        tile['online'] = True
+        tile['violations_detected'] = len(response.get('violations_detected', []))
+        tile['timestamp'] = now
+        if now - self.last_thumbnail_time >= settings.PROCTOR_THUMBNAIL_INTERVAL:
+            self.last_thumbnail_time = now
+            tile['thumbnail'] = encode_thumbnail(frame, settings.PROCTOR_THUMBNAIL_WIDTH)
+        await self.channel_layer.group_send(proctor_group(self.active_session.session_id), {
+            'type': 'proctor.tile',
+            'session_id': self.active_session.session_id,
+            'tile': tile
+        })
+
     async def check_and_log_violations(self, results, frame):
         """Check for violations and log them to database"""
         if isinstance(self.user, AnonymousUser):
@@ -598,16 +722,31 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
     async def log_violation_to_database(self, violation_type, description, confidence):
         """Log violation to database"""
         try:
+            clip_path = None
+            if self.clip_buffer is not None:
+                # A full evidence queue may block for a moment, so submit off the event loop
+                clip_path = await sync_to_async(get_evidence_writer().submit_clip, thread_sensitive=False)(
+                    self.clip_buffer,
+                    f"{violation_type}_{self.user.id}_{int(time.time())}",
+                    str(settings.EVIDENCE_DIR)
+                )
+                if isinstance(clip_path, Future):
+                    # Named by the hash of the encoded file, so its path is known once a writer has encoded it
+                    clip_path = await asyncio.wrap_future(clip_path)
+            
             def create_violation():
+                write_start = time.perf_counter()
                 violation = Violation(
                     user=self.user,
                     violation_type=violation_type,
                     confidence=confidence,
                     description=description,
+                    clip_path=clip_path or '',
                     timestamp=timezone.now()
                 )
                 violation.save()
                 
+                session_event = None
                 if hasattr(self, 'active_session') and self.active_session:
                     session_event = SessionEvent(
                         session=self.active_session,
@@ -616,11 +755,19 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
                         metadata={'description': description}
                     )
                     session_event.save()
+                metrics.DB_WRITE_LATENCY.observe(time.perf_counter() - write_start, operation='violation')
                 
-                return violation
+                return violation, session_event
             
-            await sync_to_async(create_violation)()
+            violation, session_event = await sync_to_async(create_violation)()
             print(f"Logged violation to database: {violation_type} - {description}")
+            metrics.VIOLATIONS.inc(violation_type=violation_type)
+
+            if self.session_stats is not None:
+                delta = self.session_stats.record_violation(violation, session_event)
+                await self.send(text_data=json.dumps(delta))
+                if self.session_stats.cache is not None:
+                    await sync_to_async(self.session_stats.publish)()
             
         except Exception as e:
             print(f"Error logging violation to database: {e}")
@@ -652,4 +799,110 @@ class MonitoringConsumer(AsyncWebsocketConsumer):
         elif results.get('emotion') in ['Neutral', 'Happy']:
             score += 5
         
-        return max(0, min(100, score))
\ No newline at end of file
+        return max(0, min(100, score))
+
+class ProctorConsumer(AsyncWebsocketConsumer):
+    """Proctor wall: one connection receiving batched tiles for many candidate sessions.
+    
+    The client sends {'type': 'subscribe', 'sessions': [...]} with the session
+    ids of the tiles it is displaying. Each subscribed candidate is asked to
+    publish tiles through a watch lease that this consumer keeps renewing, and
+    incoming tiles are merged per session and flushed as one 'tiles' message
+    per batch interval.
+    """
+    async def connect(self):
+        self.user = self.scope.get('user', AnonymousUser())
+        if isinstance(self.user, AnonymousUser) or not self.user.can_view_violations():
+            await self.close(code=4003)
+            return
+        await self.accept()
+        print(f"Proctor WebSocket connection accepted for {self.user.username}.")
+
+        self.sessions = set()
+        self.pending_tiles = {}
+        self.flush_task = asyncio.ensure_future(self.flush_loop())
+        self.lease_task = asyncio.ensure_future(self.lease_loop())
+
+    async def disconnect(self, close_code):
+        for task_name in ('flush_task', 'lease_task'):
+            if hasattr(self, task_name):
+                getattr(self, task_name).cancel()
+        for session_id in getattr(self, 'sessions', ()):
+            await self.channel_layer.group_discard(proctor_group(session_id), self.channel_name)
+        print(f"Proctor WebSocket disconnected with code: {close_code}")
+
+    async def receive(self, text_data):
+        try:
+            data = json.loads(text_data)
+            if not isinstance(data, dict):
+                raise ValueError('Message must be a JSON object')
+            message_type = data.get('type')
+            session_ids = data.get('sessions', [])
+            if not isinstance(session_ids, list) or not all(
+                    isinstance(session_id, str) and SESSION_ID_PATTERN.fullmatch(session_id) for session_id in session_ids):
+                raise ValueError('sessions must be a list of session ids')
+
+            if message_type == 'subscribe':
+                await self.subscribe(session_ids)
+            elif message_type == 'unsubscribe':
+                await self.unsubscribe(session_ids)
+            else:
+                await self.send(text_data=json.dumps({'type': 'error', 'message': f'Unknown message type: {message_type}'}))
+
+        except json.JSONDecodeError:
+            await self.send(text_data=json.dumps({'type': 'error', 'message': 'Invalid JSON format'}))
+        except ValueError as e:
+            await self.send(text_data=json.dumps({'type': 'error', 'message': str(e)}))
+
+    async def subscribe(self, session_ids):
+        new_sessions = [s for s in session_ids if s not in self.sessions]
+        room = settings.PROCTOR_MAX_TILES - len(self.sessions)
+        if len(new_sessions) > room:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'message': f'A proctor wall can display at most {settings.PROCTOR_MAX_TILES} sessions'
+            }))
+            new_sessions = new_sessions[:max(room, 0)]
+        for session_id in new_sessions:
+            self.sessions.add(session_id)
+            await self.channel_layer.group_add(proctor_group(session_id), self.channel_name)
+            await self.send_watch(session_id)
+        await self.send(text_data=json.dumps({'type': 'subscribed', 'sessions': sorted(self.sessions)}))
+
+    async def unsubscribe(self, session_ids):
+        for session_id in session_ids:
+            if session_id in self.sessions:
+                self.sessions.discard(session_id)
+                self.pending_tiles.pop(session_id, None)
+                await self.channel_layer.group_discard(proctor_group(session_id), self.channel_name)
+        await self.send(text_data=json.dumps({'type': 'subscribed', 'sessions': sorted(self.sessions)}))
+
+    async def send_watch(self, session_id):
+        await self.channel_layer.group_send(candidate_group(session_id), {
+            'type': 'proctor.watch',
+            'ttl': settings.PROCTOR_WATCH_TTL
+        })
+
+    async def lease_loop(self):
+        # Renew well before the candidates' leases lapse
+        while True:
+            await asyncio.sleep(settings.PROCTOR_WATCH_TTL / 3)
+            for session_id in list(self.sessions):
+                await self.send_watch(session_id)
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(settings.PROCTOR_BATCH_INTERVAL)
+            if not self.pending_tiles:
+                continue
+            tiles, self.pending_tiles = self.pending_tiles, {}
+            await self.send(text_data=json.dumps({
+                'type': 'tiles',
+                'tiles': [{'session_id': session_id, **tile} for session_id, tile in tiles.items()]
+            }))
+
+    async def proctor_tile(self, event):
+        """Merge into the pending tile so a thumbnail is not lost behind a later state-only update"""
+        session_id = event['session_id']
+        if session_id in self.sessions:
+            self.pending_tiles.setdefault(session_id, {}).update(event['tile'])
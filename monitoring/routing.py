@@ -4,5 +4,6 @@ from blockchain import consumers as blockchain_consumers
 
 websocket_urlpatterns = [
     path('ws/monitoring/', consumers.MonitoringConsumer.as_asgi()),
+    path('ws/proctor/', consumers.ProctorConsumer.as_asgi()),
     path('ws/blockchain/', blockchain_consumers.BlockchainConsumer.as_asgi()),
 ] 
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Per-user real-time monitoring counters.
+
+MonitoringConsumer keeps one SessionStats per connection, seeded once from the
+database and updated in memory as violations are logged, so deltas can be
+pushed over /ws/monitoring/ instead of clients polling real_time_stats. When
+MONITORING_STATS_CACHE names a cache alias the snapshot is mirrored there and
+the HTTP endpoint serves it as a fallback.
+"""
+from collections import deque
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from datetime import timedelta
+
+RECENT_VIOLATION_WINDOW = timedelta(minutes=10)
+
+def get_stats_cache():
+    """Shared cache for monitoring snapshots, or None when not configured"""
+    alias = getattr(settings, 'MONITORING_STATS_CACHE', None)
+    return caches[alias] if alias else None
+
+def stats_cache_key(user_id, day):
+    return f'monitoring_stats:{user_id}:{day}'
+
+def get_cached_stats(user_id):
+    cache = get_stats_cache()
+    if cache is None:
+        return None
+    snapshot = cache.get(stats_cache_key(user_id, timezone.localdate()))
+    if snapshot is not None:
+        cutoff = (timezone.now() - RECENT_VIOLATION_WINDOW).timestamp()
+        snapshot['recent_violations'] = [v for v in snapshot['recent_violations'] if v['created_at'] >= cutoff]
+    return snapshot
+
+def format_violation(violation):
+    return {
+        'id': violation.id,
+        'type': violation.violation_type,
+        'description': violation.description,
+        'confidence': violation.confidence,
+        'timestamp': violation.timestamp.strftime('%H:%M:%S'),
+        'created_at': violation.timestamp.timestamp(),
+        'is_resolved': violation.is_resolved
+    }
+
+def format_session_event(event):
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'confidence': event.confidence,
+        'timestamp': event.timestamp.strftime('%H:%M:%S'),
+        'metadata': event.metadata
+    }
+
+class SessionStats:
+    """Today's violation counters plus recent violations and session events for one user"""
+    def __init__(self, user_id, max_recent_violations=10, max_session_events=20):
+        self.user_id = user_id
+        self.day = timezone.localdate()
+        self.violations_by_type = {}
+        self.recent_violations = deque(maxlen=max_recent_violations)
+        self.session_events = deque(maxlen=max_session_events)
+        self.cache = get_stats_cache()
+
+    def load(self, user, active_session=None):
+        """Seed the counters from the database (runs once per connection, synchronously)"""
+        from violations.models import Violation
+        from exam_sessions.models import SessionEvent
+
+        cached = self.cache.get(stats_cache_key(self.user_id, self.day)) if self.cache is not None else None
+        if cached is not None:
+            self.violations_by_type = dict(cached['stats']['violations_by_type'])
+            self.recent_violations.extend(reversed(cached['recent_violations']))
+            self.session_events.extend(reversed(cached['session_events']))
+            return
+        violations = Violation.objects.filter(user=user)
+        self.violations_by_type = violations.since_day(self.day).counts_by_type()
+        recent = violations.filter(timestamp__gte=timezone.now() - RECENT_VIOLATION_WINDOW)
+        self.recent_violations.extend(format_violation(v) for v in reversed(recent[:self.recent_violations.maxlen]))
+        if active_session is not None:
+            events = SessionEvent.objects.filter(session=active_session)[:self.session_events.maxlen]
+            self.session_events.extend(format_session_event(e) for e in reversed(events))
+        self.publish()
+
+    @property
+    def total_violations_today(self):
+        return sum(self.violations_by_type.values())
+
+    def record_violation(self, violation, session_event=None):
+        """Apply a newly logged violation and return the delta to push to the client"""
+        today = timezone.localdate()
+        if today != self.day:
+            self.day = today
+            self.violations_by_type = {}
+        self.violations_by_type[violation.violation_type] = self.violations_by_type.get(violation.violation_type, 0) + 1
+        delta = {
+            'type': 'stats_delta',
+            'violation': format_violation(violation),
+            'event': format_session_event(session_event) if session_event is not None else None,
+            'stats': self.counters()
+        }
+        self.recent_violations.append(delta['violation'])
+        if delta['event'] is not None:
+            self.session_events.append(delta['event'])
+        return delta
+
+    def counters(self):
+        return {
+            'total_violations_today': self.total_violations_today,
+            'violations_by_type': dict(self.violations_by_type)
+        }
+
+    def snapshot(self):
+        """Same shape as the recent_violations/session_events/stats parts of real_time_stats"""
+        cutoff = (timezone.now() - RECENT_VIOLATION_WINDOW).timestamp()
+        return {
+            'recent_violations': [v for v in reversed(self.recent_violations) if v['created_at'] >= cutoff],
+            'session_events': list(reversed(self.session_events)),
+            'stats': self.counters()
+        }
+
+    def publish(self):
+        """Mirror the snapshot to the shared cache, if one is configured"""
+        if self.cache is not None:
+            self.cache.set(stats_cache_key(self.user_id, self.day), self.snapshot(), timeout=600)
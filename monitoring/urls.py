@@ -1,7 +1,11 @@
 from django.urls import path
 
+from . import views
+
 app_name = 'monitoring'
 
 urlpatterns = [
-    # Monitoring URLs will be added here
-] 
\ No newline at end of file
+    path('metrics', views.metrics_view, name='metrics'),
+    path('profiles/', views.ProfilesView.as_view(), name='profiles'),
+    path('profiles/<str:name>', views.ProfileDownloadView.as_view(), name='profile-download'),
+]
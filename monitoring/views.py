@@ -1,6 +1,87 @@
 """
 Views for the monitoring app.
 """
+import hmac
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
+from django.views import View
+
+import metrics
+import profiling
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint: per-stage latency histograms, counters and gauges.
+
+    Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`; without a
+    configured token, only staff sessions may read it.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        provided = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(provided, token):
+            return JsonResponse({'error': 'Invalid metrics token'}, status=403)
+    elif not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({'error': 'Staff access required'}, status=403)
+    return HttpResponse(metrics.render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@method_decorator(staff_member_required, name='dispatch')
+class ProfilesView(View):
+    """List saved profiles, or start a time-boxed capture of the process or one candidate session"""
+
+    def get(self, request):
+        return JsonResponse({'results': profiling.list_profiles(str(settings.PROFILE_DIR))})
+
+    def post(self, request):
+        scope = request.POST.get('scope', 'process')
+        session_id = request.POST.get('session_id')
+        try:
+            seconds = float(request.POST.get('seconds', 30))
+            if not 0 < seconds <= settings.PROFILE_MAX_SECONDS:
+                raise ValueError(f'seconds must be between 0 and {settings.PROFILE_MAX_SECONDS}')
+            if scope not in ('process', 'session'):
+                raise ValueError(f'Unsupported scope: {scope}')
+            if scope == 'session' and not session_id:
+                raise ValueError('session_id is required for a session profile')
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        if scope == 'process':
+            try:
+                capture = profiling.start_capture(str(settings.PROFILE_DIR), seconds, settings.PROFILE_INTERVAL)
+            except ValueError as e:
+                return JsonResponse({'error': str(e)}, status=409)
+            name = capture.name
+        else:
+            # The candidate may be connected to any worker, so the request goes through its group
+            from .consumers import candidate_group
+            name = profiling.capture_name('session', session_id)
+            async_to_sync(get_channel_layer().group_send)(candidate_group(session_id), {
+                'type': 'profile.start',
+                'name': name,
+                'seconds': seconds
+            })
+        return JsonResponse({
+            'name': name + profiling.PROFILE_EXTENSION,
+            'scope': scope,
+            'session_id': session_id,
+            'seconds': seconds
+        }, status=202)
+
 
-# Create your views here. 
\ No newline at end of file
+@method_decorator(staff_member_required, name='dispatch')
+class ProfileDownloadView(View):
+    def get(self, request, name):
+        path = profiling.profile_path(str(settings.PROFILE_DIR), name)
+        if path is None:
+            return JsonResponse({'error': 'Profile not found'}, status=404)
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=name, content_type='text/plain')
@@ -0,0 +1,175 @@
+"""
+On-demand sampling profiler for live sessions.
+
+A capture runs a background thread that samples the Python stacks of the
+other threads every `interval` seconds for a fixed duration, then writes them
+in the collapsed ("folded") stack format read by flamegraph.pl, speedscope
+and inferno:
+
+    MainThread;receive (consumers.py:443);detect_head_pose_realtime (consumers.py:212) 57
+
+A capture for the whole process samples every thread. A capture bound to a
+target object (one MonitoringConsumer) keeps only the samples whose stack
+passes through a method or closure of that object, so one candidate can be
+profiled while other sessions share the event loop. Nothing is hooked while
+no capture is running, so profiling costs nothing when it is off.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+PROFILE_EXTENSION = '.folded'
+PROFILE_NAME_PATTERN = re.compile(r'^[A-Za-z0-9_.-]+\.folded$')
+
+class ProfileCapture:
+    def __init__(self, name: str, directory: str, seconds: float = 30.0, interval: float = 0.005,
+                 target: Any = None, max_depth: int = 128):
+        self.name = name
+        self.path = os.path.join(directory, name + PROFILE_EXTENSION)
+        self.seconds = seconds
+        self.interval = interval
+        self.target = target
+        # Only frames from the target's own module are checked for it, which keeps scoped sampling cheap
+        self.target_file = getattr(sys.modules.get(type(target).__module__), '__file__', None) if target is not None else None
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def scope(self) -> str:
+        return 'process' if self.target is None else 'session'
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'ProfileCapture':
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name=f'profiler-{self.name}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait: bool = True):
+        self._stop.set()
+        if wait and self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        deadline = time.perf_counter() + self.seconds
+        try:
+            while not self._stop.is_set() and time.perf_counter() < deadline:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    stack = self._fold(frame)
+                    if stack is not None:
+                        self.stacks[thread_names.get(thread_id, f'thread-{thread_id}') + ';' + stack] += 1
+                        self.samples += 1
+                self._stop.wait(self.interval)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished_at = time.time()
+            self._write()
+            _finished(self)
+
+    def _fold(self, frame) -> Optional[str]:
+        names = []
+        matched = self.target is None
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            if not matched and code.co_filename == self.target_file and frame.f_locals.get('self') is self.target:
+                matched = True
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if not matched:
+            return None
+        return ';'.join(reversed(names))
+
+    def _write(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp_path, self.path)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'scope': self.scope,
+            'path': self.path,
+            'seconds': self.seconds,
+            'interval': self.interval,
+            'samples': self.samples,
+            'running': self.running,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error,
+        }
+
+_lock = threading.Lock()
+_process_capture: Optional[ProfileCapture] = None
+_target_captures: Dict[int, ProfileCapture] = {}
+
+def capture_name(scope: str, label: Optional[str] = None) -> str:
+    suffix = re.sub(r'[^A-Za-z0-9_-]', '_', str(label))[:64] if label else ''
+    return '_'.join(filter(None, [time.strftime('%Y%m%d-%H%M%S'), scope, suffix]))
+
+def start_capture(directory: str, seconds: float = 30.0, interval: float = 0.005, target: Any = None,
+                  name: Optional[str] = None) -> ProfileCapture:
+    """Start a time-boxed capture of the process, or of one target object; one at a time for each"""
+    global _process_capture
+    if seconds <= 0 or interval <= 0:
+        raise ValueError("seconds and interval must be positive")
+    with _lock:
+        running = _process_capture if target is None else _target_captures.get(id(target))
+        if running is not None and running.running:
+            raise ValueError(f"A profile is already being captured: {running.name}")
+        capture = ProfileCapture(name or capture_name('process' if target is None else 'session'),
+                                 directory, seconds, interval, target)
+        if target is None:
+            _process_capture = capture
+        else:
+            _target_captures[id(target)] = capture
+    return capture.start()
+
+def stop_capture(target: Any = None, wait: bool = True):
+    with _lock:
+        capture = _process_capture if target is None else _target_captures.get(id(target))
+    if capture is not None:
+        capture.stop(wait)
+
+def _finished(capture: ProfileCapture):
+    with _lock:
+        if capture.target is not None and _target_captures.get(id(capture.target)) is capture:
+            del _target_captures[id(capture.target)]
+
+def list_profiles(directory: str) -> List[Dict[str, Any]]:
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and PROFILE_NAME_PATTERN.match(entry.name):
+            stat = entry.stat()
+            profiles.append({'name': entry.name, 'size': stat.st_size, 'modified': stat.st_mtime})
+    return sorted(profiles, key=lambda profile: profile['modified'], reverse=True)
+
+def profile_path(directory: str, name: str) -> Optional[str]:
+    """Path of a saved profile, or None for names that are not a profile file in directory"""
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = os.path.join(directory, name)
+    return path if os.path.isfile(path) else None
@@ -13,11 +13,17 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'surveillance_system.settings')
 django.setup()
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
+from model_registry import warm_up_models
 from monitoring.routing import websocket_urlpatterns
 
+if settings.MODEL_WARMUP:
+    # Only the serving process loads detector models up front, in the background so startup is not blocked
+    warm_up_models(parallel=settings.MODEL_WARMUP_PARALLEL, background=True)
+
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
     "websocket": AuthMiddlewareStack(
@@ -240,9 +240,14 @@ CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS', default=[
 
 CORS_ALLOW_CREDENTIALS = True
 
-# Channels (WebSocket) - Using in-memory for development
+# Channels (WebSocket) - in-memory for development; set CHANNEL_REDIS_URL so events logged by
+# main.py, which runs in its own process, reach the blockchain dashboards
+CHANNEL_REDIS_URL = env('CHANNEL_REDIS_URL', default=None)
 CHANNEL_LAYERS = {
     'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {'hosts': [CHANNEL_REDIS_URL]},
+    } if CHANNEL_REDIS_URL else {
         'BACKEND': 'channels.layers.InMemoryChannelLayer',
     },
 }
@@ -264,16 +269,63 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 16 * 1024 * 1024  # 16MB
 
 # Blockchain settings
 BLOCKCHAIN_DB_PATH = env('BLOCKCHAIN_DB_PATH', default='blockchain_logs.db')
+BLOCKCHAIN_SEALING_POLICY = {
+    'max_events': env.int('BLOCKCHAIN_SEAL_MAX_EVENTS', default=10),  # seal once this many events are pending
+    'max_latency': env.float('BLOCKCHAIN_SEAL_MAX_LATENCY', default=None),  # seconds; None disables time-based sealing
+    'difficulty': env.int('BLOCKCHAIN_DIFFICULTY', default=4),  # 0 disables proof-of-work (signature-only integrity)
+    'signature_algorithm': env('BLOCKCHAIN_SIGNATURE_ALGORITHM', default='rsa-pss'),  # 'rsa-pss' or 'ed25519'
+}
+# Seconds between fsyncs of the pending-event journal; 0 fsyncs every event. Each process journals to
+# <db>_pending.journal.<pid> and adopts journals left behind by processes that exited before sealing
+BLOCKCHAIN_JOURNAL_FSYNC_INTERVAL = env.float('BLOCKCHAIN_JOURNAL_FSYNC_INTERVAL', default=0.05)
+# Seconds between coalesced WebSocket frames sent to blockchain dashboards
+BLOCKCHAIN_BROADCAST_INTERVAL = env.float('BLOCKCHAIN_BROADCAST_INTERVAL', default=0.25)
+# Blockchain statistics are cached until the next block is sealed or the TTL expires;
+# set BLOCKCHAIN_STATS_CACHE to a CACHES alias to share the cache between worker processes
+BLOCKCHAIN_STATS_CACHE = env('BLOCKCHAIN_STATS_CACHE', default=None)
+BLOCKCHAIN_STATS_CACHE_TTL = env.float('BLOCKCHAIN_STATS_CACHE_TTL', default=60)
 
 # Monitoring settings
 MONITORING_INTERVAL = env.int('MONITORING_INTERVAL', default=1)  # seconds
 ALERT_THRESHOLD = env.int('ALERT_THRESHOLD', default=3)  # seconds for sustained violations
+# Per-user counters pushed over /ws/monitoring/ are mirrored to this CACHES alias (if set)
+# so real_time_stats can serve them instead of querying
+MONITORING_STATS_CACHE = env('MONITORING_STATS_CACHE', default=None)
+
+# Proctor wall (/ws/proctor/): candidates publish tiles only while a proctor holds a watch lease
+PROCTOR_TILE_INTERVAL = env.float('PROCTOR_TILE_INTERVAL', default=1.0)  # seconds between detection-state updates
+PROCTOR_THUMBNAIL_INTERVAL = env.float('PROCTOR_THUMBNAIL_INTERVAL', default=3.0)  # seconds between thumbnails
+PROCTOR_THUMBNAIL_WIDTH = env.int('PROCTOR_THUMBNAIL_WIDTH', default=160)  # pixels
+PROCTOR_BATCH_INTERVAL = env.float('PROCTOR_BATCH_INTERVAL', default=0.5)  # seconds between batched frames to a proctor
+PROCTOR_WATCH_TTL = env.float('PROCTOR_WATCH_TTL', default=30)  # seconds a watch lease lasts without renewal
+PROCTOR_MAX_TILES = env.int('PROCTOR_MAX_TILES', default=64)  # sessions one proctor connection may subscribe to
+
+# Evidence is stored under EVIDENCE_DIR named by the SHA-256 of each file, the hash recorded on chain;
+# opt-in perceptual dedup reuses near-identical screenshots and flags the event as a near duplicate
+EVIDENCE_DIR = MEDIA_ROOT / 'evidence'
+EVIDENCE_PERCEPTUAL_DEDUP = env.bool('EVIDENCE_PERCEPTUAL_DEDUP', default=False)
+# Pre-violation clips: each monitoring session buffers recent frames and saves them when a violation fires
+EVIDENCE_CLIP_SECONDS = env.float('EVIDENCE_CLIP_SECONDS', default=5)
+EVIDENCE_CLIP_FPS = env.float('EVIDENCE_CLIP_FPS', default=5)
+EVIDENCE_CLIP_MAX_BYTES = env.int('EVIDENCE_CLIP_MAX_BYTES', default=4 * 1024 * 1024)  # per session
+
+# Detector models load lazily on first use; the ASGI server warms them up at startup (in parallel threads)
+MODEL_WARMUP = env.bool('MODEL_WARMUP', default=True)
+MODEL_WARMUP_PARALLEL = env.bool('MODEL_WARMUP_PARALLEL', default=True)
+
+# Prometheus scrape endpoint at /api/monitoring/metrics; scrapers send this as a bearer token, otherwise staff only
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
 
 # Logging
 # Ensure logs directory exists
 LOGS_DIR = BASE_DIR / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)
 
+# Admin-triggered sampling profiles (folded stacks for flamegraph tools) are saved here
+PROFILE_DIR = LOGS_DIR / 'profiles'
+PROFILE_INTERVAL = env.float('PROFILE_INTERVAL', default=0.005)  # seconds between stack samples
+PROFILE_MAX_SECONDS = env.float('PROFILE_MAX_SECONDS', default=120)  # longest capture an admin may request
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
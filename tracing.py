@@ -0,0 +1,143 @@
+"""
+Structured tracing for the detector hot paths.
+
+Each module gets a tracer:
+
+    tracer = get_tracer(__name__)
+    tracer.debug("faces found", count=len(faces))
+
+Fields are formatted only when a line is actually emitted, so a disabled
+call costs one method call and an integer comparison; guard loops or costly
+field values with `if tracer.debug_enabled:`. Levels and sampling come from
+SURVEILLANCE_TRACE, a comma-separated list of module=level[:sample_every]:
+
+    SURVEILLANCE_TRACE="*=info,mobile_detection=debug:10"
+
+traces everything at info and one in ten debug lines from mobile_detection.
+SURVEILLANCE_TRACE_FORMAT=json emits one JSON object per line instead of text.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, TextIO
+
+TRACE = 5
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {'trace': TRACE, 'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'error': ERROR, 'off': OFF}
+LEVEL_NAMES = {value: name.upper() for name, value in LEVELS.items()}
+
+_DEFAULT_SPEC = '*=info'
+
+class Tracer:
+    __slots__ = ('name', 'level', 'sample_every', 'calls', 'debug_enabled', '_registry')
+
+    def __init__(self, name: str, registry: 'TracerRegistry'):
+        self.name = name
+        self._registry = registry
+        self.calls = 0
+        self.configure(OFF, 1)
+
+    def configure(self, level: int, sample_every: int = 1):
+        self.level = level
+        self.sample_every = max(1, sample_every)
+        self.debug_enabled = level <= DEBUG
+
+    def enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def trace(self, message: str, **fields):
+        if self.level <= TRACE:
+            self._emit(TRACE, message, fields)
+
+    def debug(self, message: str, **fields):
+        if self.level <= DEBUG:
+            self._emit(DEBUG, message, fields)
+
+    def info(self, message: str, **fields):
+        if self.level <= INFO:
+            self._emit(INFO, message, fields)
+
+    def warning(self, message: str, **fields):
+        if self.level <= WARNING:
+            self._emit(WARNING, message, fields)
+
+    def error(self, message: str, **fields):
+        if self.level <= ERROR:
+            # Errors are never sampled away
+            self._registry.write(ERROR, self.name, message, fields)
+
+    def _emit(self, level: int, message: str, fields: Dict[str, Any]):
+        if self.sample_every > 1:
+            self.calls += 1
+            if self.calls % self.sample_every:
+                return
+        self._registry.write(level, self.name, message, fields)
+
+class TracerRegistry:
+    def __init__(self, spec: Optional[str] = None, output_format: str = 'text', stream: Optional[TextIO] = None):
+        self.tracers: Dict[str, Tracer] = {}
+        self.rules: Dict[str, tuple] = {}
+        self.output_format = output_format
+        self.stream = stream
+        self.configure(spec or _DEFAULT_SPEC, output_format)
+
+    def configure(self, spec: str, output_format: Optional[str] = None):
+        rules = {}
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            module, _, setting = item.partition('=')
+            level_name, _, sample = setting.partition(':')
+            if level_name.lower() not in LEVELS:
+                raise ValueError(f"Unknown trace level '{level_name}' for {module}")
+            rules[module.strip()] = (LEVELS[level_name.lower()], int(sample) if sample else 1)
+        self.rules = rules
+        if output_format is not None:
+            self.output_format = output_format
+        for tracer in self.tracers.values():
+            tracer.configure(*self._rule_for(tracer.name))
+
+    def _rule_for(self, name: str) -> tuple:
+        # Most specific dotted prefix wins, then the '*' default
+        parts = name.split('.')
+        for i in range(len(parts), 0, -1):
+            rule = self.rules.get('.'.join(parts[:i]))
+            if rule is not None:
+                return rule
+        return self.rules.get('*', (INFO, 1))
+
+    def get(self, name: str) -> Tracer:
+        tracer = self.tracers.get(name)
+        if tracer is None:
+            tracer = Tracer(name, self)
+            tracer.configure(*self._rule_for(name))
+            self.tracers[name] = tracer
+        return tracer
+
+    def write(self, level: int, name: str, message: str, fields: Dict[str, Any]):
+        if self.output_format == 'json':
+            record = {'ts': round(time.time(), 6), 'level': LEVEL_NAMES[level], 'module': name, 'message': message}
+            record.update(fields)
+            line = json.dumps(record, default=str)
+        elif fields:
+            line = f"[{LEVEL_NAMES[level]}] {name}: {message} " + ' '.join([f"{key}={value}" for key, value in fields.items()])
+        else:
+            line = f"[{LEVEL_NAMES[level]}] {name}: {message}"
+        # One write call per line, so lines from different threads do not interleave
+        (self.stream or sys.stderr).write(line + '\n')
+
+_registry = TracerRegistry(os.environ.get('SURVEILLANCE_TRACE'), os.environ.get('SURVEILLANCE_TRACE_FORMAT', 'text'))
+
+def get_tracer(name: str) -> Tracer:
+    return _registry.get(name)
+
+def configure_tracing(spec: str, output_format: Optional[str] = None, stream: Optional[TextIO] = None):
+    """Reconfigure every tracer, e.g. configure_tracing('*=warning,head_pose=debug:5')"""
+    if stream is not None:
+        _registry.stream = stream
+    _registry.configure(spec, output_format)
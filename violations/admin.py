@@ -1,8 +1,14 @@
 from django.contrib import admin
-from .models import Violation
+from .models import Violation, ViolationRollup
 
 @admin.register(Violation)
 class ViolationAdmin(admin.ModelAdmin):
     list_display = ('user', 'violation_type', 'timestamp', 'confidence', 'is_resolved')
     list_filter = ('violation_type', 'is_resolved', 'timestamp')
-    search_fields = ('user__username', 'description') 
\ No newline at end of file
+    search_fields = ('user__username', 'description') 
+
+@admin.register(ViolationRollup)
+class ViolationRollupAdmin(admin.ModelAdmin):
+    list_display = ('granularity', 'bucket_start', 'user', 'violation_type', 'count')
+    list_filter = ('granularity', 'violation_type')
+    search_fields = ('user__username',)
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth
+from violations.models import Violation, ViolationRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the day and month violation rollups from the violations table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rollup rows inserted per batch')
+
+    def handle(self, *args, **options):
+        truncations = {'day': TruncDay('timestamp'), 'month': TruncMonth('timestamp')}
+        total = 0
+        with transaction.atomic():
+            ViolationRollup.objects.all().delete()
+            for granularity, truncation in truncations.items():
+                buckets = (
+                    Violation.objects.order_by()
+                    .annotate(bucket_start=truncation)
+                    .values('bucket_start', 'user_id', 'violation_type')
+                    .annotate(count=Count('id'))
+                )
+                batch = []
+                for bucket in buckets.iterator(chunk_size=options['batch_size']):
+                    batch.append(ViolationRollup(granularity=granularity, **bucket))
+                    if len(batch) >= options['batch_size']:
+                        total += len(ViolationRollup.objects.bulk_create(batch))
+                        batch = []
+                total += len(ViolationRollup.objects.bulk_create(batch))
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {total} violation rollup buckets'))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('violations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='violation',
+            index=models.Index(fields=['user', 'timestamp'], name='violation_user_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='violation',
+            index=models.Index(fields=['violation_type', 'timestamp'], name='violation_type_ts_idx'),
+        ),
+    ]
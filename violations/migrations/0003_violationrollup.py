@@ -0,0 +1,35 @@
+# Generated by Django 4.2.11 on 2026-10-19 09:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('violations', '0002_violation_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViolationRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=10)),
+                ('bucket_start', models.DateTimeField()),
+                ('violation_type', models.CharField(choices=[('head_misalignment', 'Head Misalignment'), ('eye_misalignment', 'Eye Misalignment'), ('mobile_detection', 'Mobile Detection'), ('lip_movement', 'Lip Movement'), ('emotion_detection', 'Emotion Detection')], max_length=30)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='violationrollup',
+            index=models.Index(fields=['granularity', 'bucket_start'], name='violation_rollup_bucket_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='violationrollup',
+            constraint=models.UniqueConstraint(fields=('granularity', 'bucket_start', 'user', 'violation_type'), name='unique_violation_rollup_bucket'),
+        ),
+    ]
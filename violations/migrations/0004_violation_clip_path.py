@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('violations', '0003_violationrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='violation',
+            name='clip_path',
+            field=models.CharField(blank=True, max_length=500),
+        ),
+    ]
@@ -1,9 +1,75 @@
-from django.db import models
+from collections import Counter
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Greatest, TruncDate
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from datetime import datetime, time, timedelta
 
 User = get_user_model()
 
+# Day windows offered by the analytics and dashboard endpoints
+VIOLATION_WINDOWS = (7, 30, 90)
+
+# Fields that decide which rollup buckets a violation is counted in
+ROLLUP_FIELDS = ('user', 'violation_type', 'timestamp')
+
+class ViolationQuerySet(models.QuerySet):
+    def since_day(self, day):
+        # Compare against the start of the day so the timestamp index can be used
+        return self.filter(timestamp__gte=timezone.make_aware(datetime.combine(day, time.min)))
+
+    def daily_counts(self, days=7):
+        """Counts per day for the last `days` days including today, zero-filled, in one query"""
+        start = timezone.localdate() - timedelta(days=days - 1)
+        counts = dict(
+            self.since_day(start)
+            .annotate(day=TruncDate('timestamp'))
+            .order_by()
+            .values('day')
+            .annotate(count=Count('id'))
+            .values_list('day', 'count')
+        )
+        return [
+            {'date': str(start + timedelta(days=i)), 'count': counts.get(start + timedelta(days=i), 0)}
+            for i in range(days)
+        ]
+
+    def counts_by_type(self):
+        return dict(
+            self.order_by()
+            .values('violation_type')
+            .annotate(count=Count('id'))
+            .values_list('violation_type', 'count')
+        )
+
+    def bulk_create(self, objs, *args, **kwargs):
+        if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+            # The returned objects do not say which rows were actually inserted, so they cannot be counted
+            raise ValueError("Violation.objects.bulk_create does not support ignore_conflicts or update_conflicts; "
+                             "insert without them, or run the backfill_violation_rollups command afterwards")
+        # Keep the rollups in step within the same transaction as the batch insert
+        with transaction.atomic(using=self.db):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            ViolationRollup.record(objs)
+        return objs
+
+    def update(self, **kwargs):
+        # bulk_update() goes through here too
+        if not _moves_buckets(kwargs):
+            return super().update(**kwargs)
+        # Take the rows out of their old buckets and count them again wherever the update puts them
+        with transaction.atomic(using=self.db):
+            before = list(self.only(*ROLLUP_FIELDS))
+            ViolationRollup.record(before, delta=-1)
+            updated = super().update(**kwargs)
+            ViolationRollup.record(Violation.objects.using(self.db).filter(pk__in=[v.pk for v in before])
+                                   .only(*ROLLUP_FIELDS))
+        return updated
+
+def _moves_buckets(fields):
+    return any(field in ROLLUP_FIELDS or field == 'user_id' for field in fields)
+
 class Violation(models.Model):
     VIOLATION_TYPES = [
         ('head_misalignment', 'Head Misalignment'),
@@ -18,10 +84,113 @@ class Violation(models.Model):
     confidence = models.FloatField(default=0.0)
     description = models.TextField(blank=True)
     screenshot_path = models.CharField(max_length=500, blank=True)
+    clip_path = models.CharField(max_length=500, blank=True)
     is_resolved = models.BooleanField(default=False)
 
+    objects = ViolationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user', 'timestamp'], name='violation_user_ts_idx'),
+            models.Index(fields=['violation_type', 'timestamp'], name='violation_type_ts_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The blockchain hook on post_save runs on commit (see signals.py), so it is not inside this transaction
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        with transaction.atomic():
+            previous = None
+            if not adding and (update_fields is None or _moves_buckets(update_fields)):
+                # An edit (e.g. in the admin) may move the violation to another user, type or day
+                previous = Violation.objects.filter(pk=self.pk).only(*ROLLUP_FIELDS).first()
+            super().save(*args, **kwargs)
+            if adding or (previous is None and update_fields is None):
+                ViolationRollup.record([self])
+            elif previous is not None and previous.rollup_key() != self.rollup_key():
+                ViolationRollup.record([previous], delta=-1)
+                ViolationRollup.record([self])
+
+    def rollup_key(self):
+        return self.user_id, self.violation_type, rollup_bucket(self.timestamp, 'day')
 
     def __str__(self):
-        return f"{self.violation_type} - {self.user.username} - {self.timestamp}" 
\ No newline at end of file
+        return f"{self.violation_type} - {self.user.username} - {self.timestamp}"
+
+def rollup_bucket(timestamp, granularity):
+    """Start of the day or month containing `timestamp`, in the current time zone"""
+    bucket = timezone.localtime(timestamp).replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == 'month':
+        bucket = bucket.replace(day=1)
+    return bucket
+
+class ViolationRollupQuerySet(models.QuerySet):
+    def daily_counts(self, days=7):
+        """Same shape as ViolationQuerySet.daily_counts, read from the day rollups"""
+        start = timezone.localdate() - timedelta(days=days - 1)
+        counts = {
+            timezone.localtime(bucket_start).date(): count
+            for bucket_start, count in self.filter(
+                granularity='day',
+                bucket_start__gte=timezone.make_aware(datetime.combine(start, time.min))
+            ).order_by().values('bucket_start').annotate(count=Sum('count')).values_list('bucket_start', 'count')
+        }
+        return [
+            {'date': str(start + timedelta(days=i)), 'count': counts.get(start + timedelta(days=i), 0)}
+            for i in range(days)
+        ]
+
+class ViolationRollup(models.Model):
+    """Violation counts per user and type, pre-aggregated by day and by month"""
+    GRANULARITIES = [
+        ('day', 'Day'),
+        ('month', 'Month'),
+    ]
+    granularity = models.CharField(max_length=10, choices=GRANULARITIES)
+    bucket_start = models.DateTimeField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    violation_type = models.CharField(max_length=30, choices=Violation.VIOLATION_TYPES)
+    count = models.IntegerField(default=0)
+
+    objects = ViolationRollupQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'bucket_start', 'user', 'violation_type'],
+                                    name='unique_violation_rollup_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['granularity', 'bucket_start'], name='violation_rollup_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket_start:%Y-%m-%d} - {self.violation_type}: {self.count}"
+
+    @classmethod
+    def record(cls, violations, delta=1):
+        """Add `delta` per violation to every bucket the violations fall in"""
+        counts = Counter()
+        for violation in violations:
+            for granularity, _ in cls.GRANULARITIES:
+                key = (granularity, rollup_bucket(violation.timestamp, granularity),
+                       violation.user_id, violation.violation_type)
+                counts[key] += delta
+        with transaction.atomic():
+            for (granularity, bucket_start, user_id, violation_type), count in counts.items():
+                bucket = cls.objects.filter(granularity=granularity, bucket_start=bucket_start,
+                                            user_id=user_id, violation_type=violation_type)
+                if count < 0:
+                    # Deletions never create a bucket or take one below zero; emptied buckets are dropped
+                    bucket.update(count=Greatest(F('count') + count, 0))
+                    bucket.filter(count=0).delete()
+                    continue
+                if bucket.update(count=F('count') + count):
+                    continue
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(granularity=granularity, bucket_start=bucket_start,
+                                           user_id=user_id, violation_type=violation_type, count=count)
+                except IntegrityError:
+                    # Another writer created the bucket first
+                    bucket.update(count=F('count') + count) 
\ No newline at end of file
@@ -1,12 +1,24 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Violation
+from .models import Violation, ViolationRollup
 from blockchain_integration import get_blockchain_integration
 
+def _event_metadata(violation):
+    metadata = {'user_id': violation.user.id}
+    # Kept in metadata rather than a new CheatingEvent field so existing event hashes stay valid
+    if violation.clip_path:
+        metadata['clip_path'] = violation.clip_path
+    return metadata
+
 @receiver(post_save, sender=Violation)
 def log_violation_to_blockchain(sender, instance, created, **kwargs):
     if not created:
         return
+    # Logging may mine a block and fsync the journal; do it after the insert commits so no write lock is held
+    transaction.on_commit(lambda: _log_to_blockchain(instance))
+
+def _log_to_blockchain(instance):
     blockchain = get_blockchain_integration()
     violation_type = instance.violation_type
     # Map violation type to blockchain method
@@ -15,20 +27,20 @@ def log_violation_to_blockchain(sender, instance, created, **kwargs):
             direction=instance.description or 'unknown',
             confidence=instance.confidence,
             screenshot_path=instance.screenshot_path,
-            metadata={'user_id': instance.user.id}
+            metadata=_event_metadata(instance)
         )
     elif violation_type == 'eye_misalignment':
         blockchain.log_eye_misalignment(
             direction=instance.description or 'unknown',
             confidence=instance.confidence,
             screenshot_path=instance.screenshot_path,
-            metadata={'user_id': instance.user.id}
+            metadata=_event_metadata(instance)
         )
     elif violation_type == 'mobile_detection':
         blockchain.log_mobile_detection(
             confidence=instance.confidence,
             screenshot_path=instance.screenshot_path,
-            metadata={'user_id': instance.user.id}
+            metadata=_event_metadata(instance)
         )
     elif violation_type == 'lip_movement':
         blockchain.log_lip_movement(
@@ -36,7 +48,7 @@ def log_violation_to_blockchain(sender, instance, created, **kwargs):
             is_whispering='whisper' in (instance.description or '').lower(),
             confidence=instance.confidence,
             screenshot_path=instance.screenshot_path,
-            metadata={'user_id': instance.user.id}
+            metadata=_event_metadata(instance)
         )
     elif violation_type == 'emotion_detection':
         # For demo, assume description contains emotion info
@@ -47,7 +59,7 @@ def log_violation_to_blockchain(sender, instance, created, **kwargs):
             overconfidence_detected='overconfident' in (instance.description or '').lower(),
             confidence=instance.confidence,
             screenshot_path=instance.screenshot_path,
-            metadata={'user_id': instance.user.id}
+            metadata=_event_metadata(instance)
         )
     else:
         blockchain.log_custom_event(
@@ -56,5 +68,9 @@ def log_violation_to_blockchain(sender, instance, created, **kwargs):
             severity='medium',
             confidence=instance.confidence,
             screenshot_path=instance.screenshot_path,
-            metadata={'user_id': instance.user.id}
-        ) 
\ No newline at end of file
+            metadata=_event_metadata(instance)
+        ) 
+
+@receiver(post_delete, sender=Violation)
+def remove_violation_from_rollups(sender, instance, **kwargs):
+    ViolationRollup.record([instance], delta=-1)
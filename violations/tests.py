@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Violation, ViolationRollup
+
+User = get_user_model()
+
+class ViolationRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='candidate', email='candidate@example.com', password='secret')
+
+    def make_violations(self, count):
+        return Violation.objects.bulk_create([
+            Violation(user=self.user, violation_type='mobile_detection', timestamp=timezone.now())
+            for _ in range(count)
+        ])
+
+    def test_delete_decrements_buckets(self):
+        violations = self.make_violations(3)
+        violations[0].delete()
+        self.assertEqual(
+            sorted(ViolationRollup.objects.values_list('granularity', 'count')),
+            [('day', 2), ('month', 2)]
+        )
+
+    def test_delete_drops_emptied_buckets(self):
+        self.make_violations(1)[0].delete()
+        self.assertFalse(ViolationRollup.objects.exists())
+
+    def test_negative_delta_never_creates_buckets(self):
+        violation = Violation(user=self.user, violation_type='lip_movement', timestamp=timezone.now())
+        ViolationRollup.record([violation], delta=-1)
+        self.assertFalse(ViolationRollup.objects.exists())
+
+    def test_negative_delta_clamps_at_zero(self):
+        violations = self.make_violations(1)
+        ViolationRollup.record(violations * 3, delta=-1)
+        self.assertFalse(ViolationRollup.objects.filter(count__lt=0).exists())
+        self.assertFalse(ViolationRollup.objects.exists())
+
+    def test_edit_moves_violation_between_buckets(self):
+        violation = self.make_violations(1)[0]
+        violation = Violation.objects.get(pk=violation.pk)
+        violation.violation_type = 'lip_movement'
+        violation.save()
+        self.assertEqual(
+            sorted(ViolationRollup.objects.values_list('violation_type', 'granularity', 'count')),
+            [('lip_movement', 'day', 1), ('lip_movement', 'month', 1)]
+        )
+
+    def test_edit_of_other_fields_keeps_buckets(self):
+        violation = self.make_violations(1)[0]
+        violation.is_resolved = True
+        violation.save()
+        self.assertEqual(sorted(ViolationRollup.objects.values_list('granularity', 'count')),
+                         [('day', 1), ('month', 1)])
+
+    def test_queryset_update_moves_violations_between_buckets(self):
+        self.make_violations(3)
+        Violation.objects.update(timestamp=timezone.now() - timedelta(days=40))
+        self.assertEqual(ViolationRollup.objects.filter(granularity='day').get().count, 3)
+        self.assertEqual(ViolationRollup.objects.filter(granularity='day').get().bucket_start.date(),
+                         timezone.localdate() - timedelta(days=40))
+
+    def test_bulk_create_rejects_ignore_conflicts(self):
+        with self.assertRaises(ValueError):
+            Violation.objects.bulk_create([Violation(user=self.user, violation_type='lip_movement')],
+                                          ignore_conflicts=True)
+        self.assertFalse(ViolationRollup.objects.exists())